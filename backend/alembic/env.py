@@ -18,10 +18,16 @@ from app.models.symptom import Symptom
 from app.models.task import Task
 from app.models.reminder import Reminder
 from app.models.rag import EmbeddedFile
+from app.models.data_version import DataVersion, SharedDataVersion
+from app.models.evaluation import EvaluationCache
+from app.models.rollup import DailyWellnessRollup
+from app.models.task_parse import TaskParseCache
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
@@ -0,0 +1,66 @@
+"""add daily wellness rollup
+
+Revision ID: 8b21e4c0d953
+Revises: 3f9c2d7a1b64
+Create Date: 2026-10-19 11:40:05.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b21e4c0d953'
+down_revision: Union[str, Sequence[str], None] = '3f9c2d7a1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MOOD_TYPES = ['happy', 'sad', 'anxious', 'angry', 'neutral', 'tired', 'stressed', 'depressed']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_wellness_rollup',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('mood_count', sa.Integer(), nullable=False),
+    *[sa.Column(f'{t}_count', sa.Integer(), nullable=False) for t in MOOD_TYPES],
+    sa.Column('intensity_count', sa.Integer(), nullable=False),
+    sa.Column('intensity_sum', sa.Integer(), nullable=False),
+    sa.Column('intensity_min', sa.Integer(), nullable=True),
+    sa.Column('intensity_max', sa.Integer(), nullable=True),
+    sa.Column('symptom_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Backfill from existing moods and symptoms (days are UTC)
+    type_columns = ", ".join(f"{t}_count" for t in MOOD_TYPES)
+    type_sums = ", ".join(f"SUM({t}_count)" for t in MOOD_TYPES)
+    type_flags = ", ".join(f"COALESCE((mood_type = '{t}')::int, 0) AS {t}_count" for t in MOOD_TYPES)
+    type_zeros = ", ".join(f"0 AS {t}_count" for t in MOOD_TYPES)
+    op.execute(f"""
+        INSERT INTO daily_wellness_rollup (
+            user_id, day, mood_count, {type_columns},
+            intensity_count, intensity_sum, intensity_min, intensity_max, symptom_count
+        )
+        SELECT user_id, day, SUM(mood_count), {type_sums},
+               COUNT(intensity), COALESCE(SUM(intensity), 0), MIN(intensity), MAX(intensity), SUM(symptom_count)
+        FROM (
+            SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day, 1 AS mood_count, {type_flags},
+                   intensity, 0 AS symptom_count
+            FROM moods
+            UNION ALL
+            SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day, 0 AS mood_count, {type_zeros},
+                   NULL AS intensity, 1 AS symptom_count
+            FROM symptoms
+        ) AS entries
+        GROUP BY user_id, day
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_wellness_rollup')
@@ -0,0 +1,43 @@
+"""add reminder delivery state
+
+Revision ID: c47d0a9e5f12
+Revises: 8b21e4c0d953
+Create Date: 2026-10-19 13:05:47.730215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d0a9e5f12'
+down_revision: Union[str, Sequence[str], None] = '8b21e4c0d953'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+delivery_status = sa.Enum('pending', 'delivered', 'failed', name='reminderdeliverystatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    delivery_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('reminders', sa.Column('delivery_status', delivery_status, server_default='pending', nullable=False))
+    op.add_column('reminders', sa.Column('delivery_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('reminders', sa.Column('delivered_at', sa.DateTime(), nullable=True))
+    # Reminders that were already due before the dispatcher existed are not sent retroactively
+    op.execute("UPDATE reminders SET delivery_status = 'delivered' WHERE remind_at < (now() AT TIME ZONE 'UTC')")
+    op.create_index(
+        'ix_reminders_pending_remind_at', 'reminders', ['remind_at'], unique=False,
+        postgresql_where=sa.text("delivery_status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reminders_pending_remind_at', table_name='reminders', postgresql_where=sa.text("delivery_status = 'pending'"))
+    op.drop_column('reminders', 'delivered_at')
+    op.drop_column('reminders', 'delivery_attempts')
+    op.drop_column('reminders', 'delivery_status')
+    delivery_status.drop(op.get_bind(), checkfirst=True)
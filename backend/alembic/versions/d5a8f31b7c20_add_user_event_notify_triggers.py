@@ -0,0 +1,66 @@
+"""add user event notify triggers
+
+Revision ID: d5a8f31b7c20
+Revises: c47d0a9e5f12
+Create Date: 2026-10-19 14:22:10.581446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8f31b7c20'
+down_revision: Union[str, Sequence[str], None] = 'c47d0a9e5f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOTIFIED_TABLES = ['tasks', 'reminders']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Small payload (ids + a few scheduling fields) to stay well under NOTIFY's 8000 byte limit;
+    # consumed by app/services/event_stream.py
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_user_event() RETURNS trigger AS $$
+        DECLARE
+            rec jsonb;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                rec := to_jsonb(OLD);
+            ELSE
+                rec := to_jsonb(NEW);
+            END IF;
+            PERFORM pg_notify('user_events', jsonb_build_object(
+                'resource', TG_TABLE_NAME,
+                'op', lower(TG_OP),
+                'id', rec->'id',
+                'user_id', rec->'user_id',
+                'data', jsonb_strip_nulls(jsonb_build_object(
+                    'status', rec->'status',
+                    'due_date', rec->'due_date',
+                    'remind_at', rec->'remind_at',
+                    'delivery_status', rec->'delivery_status',
+                    'task_id', rec->'task_id'
+                ))
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in NOTIFIED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_user_event
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_user_event();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in NOTIFIED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_user_event ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS notify_user_event();")
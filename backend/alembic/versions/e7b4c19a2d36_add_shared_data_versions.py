@@ -0,0 +1,33 @@
+"""add shared data versions
+
+Revision ID: e7b4c19a2d36
+Revises: d5a8f31b7c20
+Create Date: 2026-10-19 16:05:47.219384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4c19a2d36'
+down_revision: Union[str, Sequence[str], None] = 'd5a8f31b7c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shared_data_versions',
+    sa.Column('resource', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('resource')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('shared_data_versions')
@@ -0,0 +1,36 @@
+"""add task parse cache
+
+Revision ID: f2c86e1d4a97
+Revises: e7b4c19a2d36
+Create Date: 2026-10-19 16:41:08.112547
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c86e1d4a97'
+down_revision: Union[str, Sequence[str], None] = 'e7b4c19a2d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_parse_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('reference_date', sa.Date(), nullable=False),
+    sa.Column('analysis', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_task_parse_cache_reference_date'), 'task_parse_cache', ['reference_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_parse_cache_reference_date'), table_name='task_parse_cache')
+    op.drop_table('task_parse_cache')
@@ -1,19 +1,18 @@
 # for LLM prompt templates and chains
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from app.ai.llm_client import json_schema_format
+from app.ai.output_schemas import WellnessSummary
 
 
-def mood_symptom_analysis_chain(llm):
-    prompt = ChatPromptTemplate.from_template("""
+ANALYSIS_PROMPT = ChatPromptTemplate.from_template("""
 You are a wellness analysis assistant.
 
-User's mood and symptom history from {start_date} to {end_date}:
-
-Moods:
-{mood_data}
+Statistical summary of the user's mood and symptom history from {start_date} to {end_date}
+(pre-aggregated: counts, intensity mean/variance on a 1-10 scale, rolling and per-period trends,
+symptom keyword frequencies, and keyword/mood co-occurrence with lift over the user's baseline):
 
-Symptoms:
-{symptom_data}
+{stats}
 
 Analyze the data and:
 1. Identify patterns and trends in mood and symptoms.
@@ -21,19 +20,15 @@ Analyze the data and:
 3. Suggest possible causes (e.g. work stress, sleep, diet).
 4. Provide clear, practical advice.
 
-Return in this JSON format:
-{
-  "patterns": "...",
-  "correlations": "...",
-  "possible_causes": "...",
-  "recommendations": [
-    "Try reducing caffeine after 3pm",
-    "Establish a consistent sleep routine",
-    "Practice breathing exercises when feeling anxious"
-  ]
-}
+Put the patterns, correlations and possible causes in their fields as short paragraphs, and
+the advice as a list of concrete recommendations (e.g. "Try reducing caffeine after 3pm").
 """)
-    return LLMChain(llm=llm, prompt=prompt)
+
+
+def mood_symptom_analysis_chain(llm):
+    # Strict WellnessSummary JSON, streamed: yields the partial object as it grows, so
+    # callers validate the last one themselves
+    return ANALYSIS_PROMPT | llm.bind(response_format=json_schema_format(WellnessSummary)) | JsonOutputParser()
 
 
 
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from app.models.mood import Mood
 from app.models.symptom import Symptom
+from app.ai.mood_symptom_stats import summarize_mood_symptom_history
 
 @tool
 def get_recent_moods(user_id: str, db: Session, days: int = 7) -> list:
@@ -39,38 +40,8 @@ def get_recent_symptoms(user_id: str, db: Session, days: int = 14) -> list:
 @tool
 def get_mood_and_symptom_history(user_id: str, start_date: str, end_date: str, db: Session) -> dict:
     """
-    Fetches mood and symptom history for the user within the date range.
+    Fetches a statistical summary of the user's mood and symptom history within the date range.
     Dates must be ISO format strings: YYYY-MM-DD
     """
-    start = datetime.fromisoformat(start_date)
-    end = datetime.fromisoformat(end_date)
-
-    moods = db.query(Mood).filter(
-        Mood.user_id == user_id,
-        Mood.created_at >= start,
-        Mood.created_at <= end
-    ).order_by(Mood.created_at).all()
-
-    symptoms = db.query(Symptom).filter(
-        Symptom.user_id == user_id,
-        Symptom.created_at >= start,
-        Symptom.created_at <= end
-    ).order_by(Symptom.created_at).all()
-
-    return {
-        "moods": [
-            {
-                "date": m.created_at.isoformat(),
-                "type": m.mood_type.value if m.mood_type else "unknown",
-                "description": m.description,
-                "intensity": m.intensity
-            } for m in moods
-        ],
-        "symptoms": [
-            {
-                "date": s.created_at.isoformat(),
-                "description": s.description,
-                "intensity": s.intensity
-            } for s in symptoms
-        ]
-    }
\ No newline at end of file
+    # Aggregated in SQL/NumPy so the result size doesn't grow with the range length
+    return summarize_mood_symptom_history(db, user_id, start_date, end_date)
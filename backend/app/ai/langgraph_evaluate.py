@@ -1,46 +1,115 @@
 # orchestrates the workflow for evaluation (fetch, analyze, summarize)
+#
+# Async: run it with evaluate_graph.ainvoke(state), or astream(state, stream_mode=["custom",
+# "values"]) to also get the analysis as it is generated. fetch_history reads the history
+# in a worker thread with its own short-lived session, so no database connection is held
+# during the LLM call. run_summary_analysis streams the model's JSON and writes an
+# {"event", "data"} item as soon as a field is complete: "patterns", "correlations",
+# "possible_causes", then one "recommendation" per list item.
+import asyncio
+import json
+from typing import TypedDict, Optional
+
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import ToolNode
-from app.ai.langchain_tools import get_mood_and_symptom_history
+from pydantic import ValidationError
+
+from app.ai.mood_symptom_stats import summarize_mood_symptom_history
 from app.ai.langchain_chains import mood_symptom_analysis_chain
-from langchain_openai import ChatOpenAI
-import json
-from typing import TypedDict, List, Optional
+from app.ai.llm_client import create_chat_model, astream_llm, record_parse_failure
+from app.ai.output_schemas import WellnessSummary
+from app.core.tracing import traced
+from app.db.session import SessionLocal
+
 
+llm = create_chat_model(model="gpt-4o-mini", temperature=0.4)
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.4)
+SUMMARY_FIELDS = ("patterns", "correlations", "possible_causes")
 
 
 class GraphState(TypedDict):
     user_id: str
     start_date: str
     end_date: str
-    db: object
-    mood_data: List[dict]
-    symptom_data: List[dict]
+    stats: dict
     summary: dict
     error: Optional[str]
 
 
-# Step 1: Fetch history
-fetch_history = ToolNode(tools=[get_mood_and_symptom_history])
+def _load_stats(user_id, start_date: str, end_date: str) -> dict:
+    with SessionLocal() as db:
+        return summarize_mood_symptom_history(db, user_id, start_date, end_date)
+
+
+# Step 1: Fetch history as a compact statistical summary (not raw rows)
+@traced("evaluate.fetch_history")
+async def fetch_history(state):
+    try:
+        stats = await asyncio.to_thread(_load_stats, state["user_id"], state["start_date"], state["end_date"])
+    except Exception as e:
+        return {"error": str(e)}
+    return {"stats": stats}
+
+
+class _FieldEmitter:
+    # Turns the growing JSON object into one event per completed field. Strict JSON schema
+    # output follows the schema's key order, so a field is complete once a later key
+    # (or list item) has started, or the stream has ended.
+    def __init__(self, write):
+        self.write = write
+        self.sent = set()
+        self.recommendations = 0
+
+    def feed(self, partial: dict, final: bool = False) -> None:
+        keys = list(partial)
+        for i, key in enumerate(keys):
+            done = final or i < len(keys) - 1
+            value = partial[key]
+            if key in SUMMARY_FIELDS and done and key not in self.sent and isinstance(value, str):
+                self.sent.add(key)
+                self.write({"event": key, "data": value})
+            elif key == "recommendations" and isinstance(value, list):
+                complete = len(value) if done else len(value) - 1
+                for item in value[self.recommendations:complete]:
+                    self.write({"event": "recommendation", "data": item})
+                self.recommendations = max(self.recommendations, complete)
+
+
+def summary_events(summary: dict) -> list[dict]:
+    """The events the analysis would have streamed for a finished (e.g. cached) summary."""
+    events = []
+    _FieldEmitter(events.append).feed(summary, final=True)
+    return events
+
 
 # Step 2: Run analysis
 analysis_chain = mood_symptom_analysis_chain(llm)
 
-def run_summary_analysis(state):
+@traced("evaluate.analyze")
+async def run_summary_analysis(state):
+    if state.get("error"):
+        return {}
+    inputs = {
+        "start_date": state["start_date"],
+        "end_date": state["end_date"],
+        "stats": json.dumps(state["stats"], indent=1),
+    }
+    emitter = _FieldEmitter(get_stream_writer())
+    partial = None
     try:
-        inputs = {
-            "start_date": state["start_date"],
-            "end_date": state["end_date"],
-            "mood_data": state["mood_data"],
-            "symptom_data": state["symptom_data"]
-        }
-        result = analysis_chain.invoke(inputs)
-        state["summary"] = json.loads(result)
+        async for partial in astream_llm(analysis_chain, inputs, "evaluate.analysis", state["user_id"]):
+            if isinstance(partial, dict):
+                emitter.feed(partial)
     except Exception as e:
-        state["error"] = str(e)
-    return state
+        return {"error": str(e)}
+
+    try:
+        summary = WellnessSummary.model_validate(partial if isinstance(partial, dict) else {})
+    except ValidationError as e:
+        record_parse_failure("evaluate.analysis", e, state["user_id"])
+        return {"error": "The analysis could not be generated, please try again"}
+    emitter.feed(summary.model_dump(), final=True)
+    return {"summary": summary.model_dump()}
 
 # Build graph
 workflow = StateGraph(GraphState)
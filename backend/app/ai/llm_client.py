@@ -0,0 +1,281 @@
+# Shared LLM client for every AI helper (moods/symptoms, task parsing, evaluation, RAG).
+#
+# create_chat_model() builds a ChatOpenAI with the call handler attached, and invoke_llm()
+# runs a model or chain for a named call site ("task.parse", "mood.pep_talk", ...) with
+# retries and the caller's token budget. Every call is recorded in the Prometheus metrics
+# (latency, prompt/completion tokens, estimated cost, retries per call site) and written
+# to the "llm" logger as one JSON line.
+#
+# Call sites that need fields back use structured_model(): OpenAI's strict JSON schema
+# mode, validated against a Pydantic model, via invoke_structured(). Responses that still
+# don't validate are counted in llm_parse_failures_total rather than raised. Streamed
+# calls (astream_llm) get the same schema as a plain response_format (json_schema_format)
+# and validate once the stream ends.
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.utils.function_calling import convert_to_openai_function
+from langchain_openai import ChatOpenAI
+
+from app.core.tracing import tracer
+from app.core.metrics import (
+    llm_calls_total, llm_call_duration_seconds, llm_tokens_total, llm_cost_usd_total,
+    llm_retries_total, llm_budget_rejections_total, llm_parse_failures_total,
+)
+
+logger = logging.getLogger("llm")
+
+# 0 disables the budget
+LLM_USER_DAILY_TOKEN_BUDGET = int(os.getenv("LLM_USER_DAILY_TOKEN_BUDGET", "0"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_RETRY_DELAY = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
+
+# USD per 1M (prompt, completion) tokens; dated model names match by prefix
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class LLMBudgetExceeded(Exception):
+    pass
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            prompt_price, completion_price = MODEL_PRICES[name]
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    return 0.0
+
+
+class TokenBudget:
+    """
+    Tokens used per user per (UTC) day. Counted per process, so with several workers the
+    effective limit is up to workers x daily_limit.
+    """
+
+    def __init__(self, daily_limit: int):
+        self.daily_limit = daily_limit
+        self._day = datetime.utcnow().date()
+        self._used: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        today = datetime.utcnow().date()
+        if today != self._day:
+            self._day = today
+            self._used.clear()
+
+    def used(self, user_id) -> int:
+        with self._lock:
+            self._roll()
+            return self._used.get(str(user_id), 0)
+
+    def check(self, user_id) -> None:
+        if not self.daily_limit or user_id is None:
+            return
+        if self.used(user_id) >= self.daily_limit:
+            llm_budget_rejections_total.inc()
+            raise LLMBudgetExceeded(f"Daily AI token budget of {self.daily_limit} tokens used up")
+
+    def charge(self, user_id, tokens: int) -> None:
+        if user_id is None or not tokens:
+            return
+        with self._lock:
+            self._roll()
+            self._used[str(user_id)] = self._used.get(str(user_id), 0) + tokens
+
+
+token_budget = TokenBudget(LLM_USER_DAILY_TOKEN_BUDGET)
+
+
+def check_llm_budget(user_id) -> None:
+    token_budget.check(user_id)
+
+
+def _token_usage(response) -> tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    prompt, completion = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    if prompt or completion:
+        return prompt, completion
+    # newer clients only report usage on the message itself
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += metadata.get("input_tokens", 0)
+            completion += metadata.get("output_tokens", 0)
+    return prompt, completion
+
+
+class LLMCallHandler(BaseCallbackHandler):
+    # call_site / user_id / attempt arrive as run metadata (see invoke_llm); calls made
+    # without it are recorded under call_site "unknown"
+    def __init__(self):
+        self._runs = {}  # run_id -> (call_site, user_id, attempt, model, start time)
+
+    def _start(self, serialized, run_id, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or (serialized or {}).get("kwargs", {}).get("model_name") or "unknown"
+        metadata = kwargs.get("metadata") or {}
+        self._runs[run_id] = (
+            metadata.get("call_site", "unknown"), metadata.get("user_id"), metadata.get("attempt", 1),
+            model, time.perf_counter(),
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(serialized, run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(serialized, run_id, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        call_site, user_id, attempt, model, start = run
+        latency = time.perf_counter() - start
+        prompt_tokens, completion_tokens = _token_usage(response)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+        llm_calls_total.labels(call_site, model, "success").inc()
+        llm_call_duration_seconds.labels(call_site, model).observe(latency)
+        llm_tokens_total.labels(call_site, model, "prompt").inc(prompt_tokens)
+        llm_tokens_total.labels(call_site, model, "completion").inc(completion_tokens)
+        llm_cost_usd_total.labels(call_site, model).inc(cost)
+        token_budget.charge(user_id, prompt_tokens + completion_tokens)
+        self._log(call_site, model, user_id, attempt, latency, "success",
+                  prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=round(cost, 6))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        call_site, user_id, attempt, model, start = run
+        latency = time.perf_counter() - start
+        llm_calls_total.labels(call_site, model, "error").inc()
+        llm_call_duration_seconds.labels(call_site, model).observe(latency)
+        self._log(call_site, model, user_id, attempt, latency, "error", error=type(error).__name__)
+
+    def _log(self, call_site, model, user_id, attempt, latency, outcome, **fields):
+        logger.info(json.dumps({
+            "event": "llm_call",
+            "call_site": call_site,
+            "model": model,
+            "user_id": user_id,
+            "attempt": attempt,
+            "latency_ms": round(latency * 1000, 1),
+            "outcome": outcome,
+            **fields,
+        }))
+
+
+llm_call_handler = LLMCallHandler()
+
+
+def create_chat_model(**kwargs) -> ChatOpenAI:
+    # The OpenAI client's own retries are invisible to callbacks, so invoke_llm retries instead.
+    # stream_usage: streamed calls (astream_llm) report token usage too, so they are metered
+    # and charged to the user's budget like invoked ones
+    kwargs.setdefault("stream_usage", True)
+    return ChatOpenAI(max_retries=0, callbacks=[llm_call_handler], **kwargs)
+
+
+def invoke_llm(runnable, inputs: Any, call_site: str, user_id=None, max_attempts: Optional[int] = None):
+    """
+    Invokes a chat model or chain built on one, retrying rate-limit, connection and 5xx
+    errors with exponential backoff. Raises LLMBudgetExceeded if user_id is out of tokens.
+    """
+    check_llm_budget(user_id)
+    max_attempts = max_attempts or LLM_MAX_ATTEMPTS
+    user_id = str(user_id) if user_id is not None else None
+    with tracer.start_as_current_span(f"llm.{call_site}") as span:
+        span.set_attribute("llm.call_site", call_site)
+        for attempt in range(1, max_attempts + 1):
+            span.set_attribute("llm.attempts", attempt)
+            config = {"metadata": {"call_site": call_site, "user_id": user_id, "attempt": attempt}}
+            try:
+                return runnable.invoke(inputs, config=config)
+            except RETRYABLE_ERRORS:
+                if attempt == max_attempts:
+                    raise
+                llm_retries_total.labels(call_site).inc()
+                time.sleep(LLM_RETRY_DELAY * 2 ** (attempt - 1))
+
+
+
+async def astream_llm(runnable, inputs: Any, call_site: str, user_id=None, max_attempts: Optional[int] = None):
+    """
+    invoke_llm for streaming: an async generator of the runnable's chunks. Transient errors
+    are retried only until the first chunk arrives; after that a retry would repeat output.
+    """
+    check_llm_budget(user_id)
+    max_attempts = max_attempts or LLM_MAX_ATTEMPTS
+    user_id = str(user_id) if user_id is not None else None
+    with tracer.start_as_current_span(f"llm.{call_site}") as span:
+        span.set_attribute("llm.call_site", call_site)
+        for attempt in range(1, max_attempts + 1):
+            span.set_attribute("llm.attempts", attempt)
+            config = {"metadata": {"call_site": call_site, "user_id": user_id, "attempt": attempt}}
+            started = False
+            try:
+                async for chunk in runnable.astream(inputs, config=config):
+                    started = True
+                    yield chunk
+                return
+            except RETRYABLE_ERRORS:
+                if started or attempt == max_attempts:
+                    raise
+                llm_retries_total.labels(call_site).inc()
+                await asyncio.sleep(LLM_RETRY_DELAY * 2 ** (attempt - 1))
+
+
+def structured_model(llm: ChatOpenAI, schema: Type[BaseModel]):
+    """llm constrained to schema's JSON schema (strict); run it with invoke_structured()."""
+    return llm.with_structured_output(schema, method="json_schema", strict=True, include_raw=True)
+
+
+def invoke_structured(runnable, inputs: Any, call_site: str, user_id=None, max_attempts: Optional[int] = None):
+    """
+    invoke_llm for a runnable ending in structured_model(). Returns (parsed, raw): the
+    validated model, or None if the response didn't validate (or was a refusal), and the
+    raw AIMessage (None if the response didn't validate).
+    """
+    try:
+        result = invoke_llm(runnable, inputs, call_site, user_id, max_attempts)
+    except ValidationError as e:
+        # the OpenAI SDK validates Pydantic response formats itself and raises
+        result = {"raw": None, "parsed": None, "parsing_error": e}
+    if result["parsed"] is None:
+        record_parse_failure(call_site, result.get("parsing_error"), user_id)
+    return result["parsed"], result["raw"]
+
+
+def json_schema_format(schema: Type[BaseModel]) -> dict:
+    """response_format for strict JSON schema output that is streamed and parsed as raw JSON."""
+    function = convert_to_openai_function(schema, strict=True)
+    return {"type": "json_schema", "json_schema": {"name": function["name"], "schema": function["parameters"], "strict": True}}
+
+
+def record_parse_failure(call_site: str, error, user_id=None) -> None:
+    llm_parse_failures_total.labels(call_site).inc()
+    logger.warning(json.dumps({
+        "event": "llm_parse_failure",
+        "call_site": call_site,
+        "user_id": str(user_id) if user_id is not None else None,
+        "error": str(error or "refusal or empty response"),
+    }))
@@ -1,14 +1,22 @@
 import os
-import json
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+from app.ai.llm_client import create_chat_model, structured_model, invoke_structured
+from app.ai.output_schemas import SupportMessage
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, temperature=0.2, model="gpt-4o-mini")
+llm = create_chat_model(openai_api_key=OPENAI_API_KEY, temperature=0.2, model="gpt-4o-mini")
+# the message comes back in its own field, so there's no "Pep talk:" label to strip
+support_llm = structured_model(llm, SupportMessage)
 
 
-def generate_pep_talk(mood_type: str = None, description: str = "", intensity: int = None) -> str:
+def _support_message(prompt: str, call_site: str, user_id=None) -> str:
+    parsed, raw = invoke_structured(support_llm, prompt, call_site, user_id)
+    if parsed is None:
+        return (raw.content if raw is not None and isinstance(raw.content, str) else "").strip()
+    return parsed.text.strip()
+
+
+def generate_pep_talk(mood_type: str = None, description: str = "", intensity: int = None, user_id=None) -> str:
     if mood_type:
         prompt = (
             f"The user is feeling {mood_type}."
@@ -24,16 +32,10 @@ def generate_pep_talk(mood_type: str = None, description: str = "", intensity: i
             f"Remind the user that they already have everything within them needed to succeed, no matter what they are going through."
         )
     
-    response = llm.invoke(prompt)
-    # Try to extract the pep talk from the response
-    text = response.content if hasattr(response, "content") else str(response)
-    # If the model returns "Pep talk: ...", extract after the colon
-    if "pep talk" in text.lower():
-        return text.split(":", 1)[-1].strip()
-    return text.strip()
+    return _support_message(prompt, "mood.pep_talk", user_id)
 
 
-def generate_affirmation(mood_type: str = None, description: str = "") -> str:
+def generate_affirmation(mood_type: str = None, description: str = "", user_id=None) -> str:
     if mood_type:
         prompt = (
             f"The user is feeling {mood_type}."
@@ -46,26 +48,15 @@ def generate_affirmation(mood_type: str = None, description: str = "") -> str:
             f"Write a short positive, encouraging, optimistic, motivational and uplifting affirmation for the user."
         )
     
-    response = llm.invoke(prompt)
-    # Try to extract the affirmation from the response
-    text = response.content if hasattr(response, "content") else str(response)
-    # If the model returns "Affirmation: ...", extract after the colon
-    if "affirmation" in text.lower():
-        return text.split(":", 1)[-1].strip()
-    return text.strip()
+    return _support_message(prompt, "mood.affirmation", user_id)
 
 
-def generate_symptom_advice(description: str) -> str:
+def generate_symptom_advice(description: str, user_id=None) -> str:
     prompt = (
         f"The user reported following symptoms: '{description}'. "
         f"Provide short practical advice for the user to manage or cope with these symptoms."
     )
-    response = llm.invoke(prompt)
-    text = response.content if hasattr(response, "content") else str(response)
-    # If the model returns "Advice: ...", extract after the colon
-    if "advice" in text.lower():
-        return text.split(":", 1)[-1].strip()
-    return text.strip()
+    return _support_message(prompt, "symptom.advice", user_id)
 
 
 def generate_daily_quote() -> str:
@@ -76,9 +67,7 @@ def generate_daily_quote() -> str:
         "Make it feel personal and direct to the reader."
     )
     
-    response = llm.invoke(prompt)
-    text = response.content if hasattr(response, "content") else str(response)
-    return text.strip()
+    return _support_message(prompt, "mood.daily_quote")
 
 # def analyze_moods_and_symptoms(moods: list, symptoms: list, period: str = "the past month") -> str:
 #     mood_summary = "\n".join([
@@ -0,0 +1,280 @@
+# pre-analysis of mood and symptom history (SQL aggregation + NumPy statistics)
+# The evaluate graph sends this compact summary to the LLM instead of raw rows,
+# so the prompt stays roughly the same size no matter how long the date range is.
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.mood import Mood, MoodType
+from app.models.symptom import Symptom
+
+MOOD_TYPES = [m.value for m in MoodType]
+MAX_TREND_BUCKETS = 12  # upper bound on trend points sent to the LLM
+ROLLING_WINDOW_DAYS = 7
+TOP_KEYWORDS = 10
+TOP_COOCCURRENCES = 8
+
+_WORD_RE = re.compile(r"[a-z][a-z'-]{2,}")
+_STOPWORDS = {
+    "the", "and", "but", "for", "with", "have", "had", "has", "was", "were", "been", "being",
+    "this", "that", "these", "those", "from", "after", "before", "into", "about", "very",
+    "really", "some", "feel", "feeling", "felt", "today", "yesterday", "day", "all", "not",
+    "any", "bit", "little", "lot", "also", "just", "still", "again", "like", "got", "get",
+    "when", "then", "than", "too", "much", "more", "less", "its", "it's", "i'm", "i've",
+    "my", "me", "you", "she", "him", "her", "they", "them", "what", "which", "who", "did",
+    "does", "doing", "out", "off", "over", "under", "can", "could", "would", "should",
+}
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def extract_keywords(text: str | None) -> set[str]:
+    """Lowercased content words of a free-text symptom description."""
+    if not text:
+        return set()
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _round(value, digits: int = 2):
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def _corr(a: np.ndarray, b: np.ndarray, mask: np.ndarray):
+    # Pearson correlation over days where both series are defined
+    if mask.sum() < 3:
+        return None
+    x, y = a[mask], b[mask]
+    if x.std() == 0 or y.std() == 0:
+        return None
+    return _round(np.corrcoef(x, y)[0, 1])
+
+
+def summarize_mood_symptom_history(db: Session, user_id: UUID | str, start_date, end_date) -> dict:
+    """
+    Builds a fixed-size statistical summary of the user's moods and symptoms
+    between start_date and end_date (both inclusive, ISO dates or date objects).
+    """
+    start = _to_date(start_date)
+    end = _to_date(end_date)
+    if end < start:
+        start, end = end, start
+    n_days = (end - start).days + 1
+    range_start = datetime.combine(start, datetime.min.time())
+    range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+    # --- Moods: aggregated per day and type in SQL ---
+    mood_day = func.date(Mood.created_at).label("day")
+    mood_rows = db.query(
+        mood_day,
+        Mood.mood_type,
+        func.count(Mood.id),
+        func.count(Mood.intensity),
+        func.coalesce(func.sum(Mood.intensity), 0),
+        func.coalesce(func.sum(Mood.intensity * Mood.intensity), 0),
+        func.min(Mood.intensity),
+        func.max(Mood.intensity),
+    ).filter(
+        Mood.user_id == user_id,
+        Mood.created_at >= range_start,
+        Mood.created_at < range_end,
+    ).group_by(mood_day, Mood.mood_type).all()
+
+    type_index = {t: i for i, t in enumerate(MOOD_TYPES)}
+    type_counts = np.zeros((n_days, len(MOOD_TYPES) + 1))  # last column = untyped
+    intensity_n = np.zeros(n_days)
+    intensity_sum = np.zeros(n_days)
+    intensity_sq = np.zeros(n_days)
+    intensity_min, intensity_max = None, None
+
+    for day, mood_type, count, n_int, s_int, sq_int, lo, hi in mood_rows:
+        d = (_to_date(day) - start).days
+        if not 0 <= d < n_days:
+            continue
+        col = type_index.get(mood_type.value, len(MOOD_TYPES)) if mood_type else len(MOOD_TYPES)
+        type_counts[d, col] += count
+        intensity_n[d] += n_int
+        intensity_sum[d] += float(s_int)
+        intensity_sq[d] += float(sq_int)
+        if lo is not None:
+            intensity_min = lo if intensity_min is None else min(intensity_min, lo)
+        if hi is not None:
+            intensity_max = hi if intensity_max is None else max(intensity_max, hi)
+
+    # --- Symptoms: only (day, description) columns, keywords counted in Python ---
+    symptom_day = func.date(Symptom.created_at).label("day")
+    symptom_rows = db.query(symptom_day, Symptom.description).filter(
+        Symptom.user_id == user_id,
+        Symptom.created_at >= range_start,
+        Symptom.created_at < range_end,
+    ).yield_per(1000)
+
+    symptom_counts = np.zeros(n_days)
+    keyword_totals = Counter()
+    keyword_days: dict[str, np.ndarray] = {}
+    for day, description in symptom_rows:
+        d = (_to_date(day) - start).days
+        if not 0 <= d < n_days:
+            continue
+        symptom_counts[d] += 1
+        for word in extract_keywords(description):
+            keyword_totals[word] += 1
+            keyword_days.setdefault(word, np.zeros(n_days, dtype=bool))[d] = True
+
+    return {
+        "range": {"start": start.isoformat(), "end": end.isoformat(), "days": n_days},
+        "moods": _mood_summary(type_counts, intensity_n, intensity_sum, intensity_sq, intensity_min, intensity_max),
+        "symptoms": _symptom_summary(symptom_counts, keyword_totals),
+        "trend": _trend_summary(start, type_counts, intensity_n, intensity_sum, symptom_counts),
+        "correlations": _correlation_summary(type_counts, intensity_n, intensity_sum, symptom_counts, keyword_totals, keyword_days),
+    }
+
+
+def _mood_summary(type_counts, intensity_n, intensity_sum, intensity_sq, intensity_min, intensity_max) -> dict:
+    totals = type_counts.sum(axis=0)
+    total = int(totals.sum())
+    n = intensity_n.sum()
+    mean = intensity_sum.sum() / n if n else None
+    variance = intensity_sq.sum() / n - mean ** 2 if n else None
+
+    labels = MOOD_TYPES + ["unspecified"]
+    distribution = {
+        labels[i]: {"count": int(c), "share": _round(c / total)}
+        for i, c in enumerate(totals) if c
+    }
+    days_logged = int((type_counts.sum(axis=1) > 0).sum())
+    return {
+        "total_entries": total,
+        "days_logged": days_logged,
+        "entries_per_logged_day": _round(total / days_logged) if days_logged else None,
+        "type_distribution": distribution,
+        "most_common_type": labels[int(totals.argmax())] if total else None,
+        "intensity": {
+            "mean": _round(mean),
+            "variance": _round(max(variance, 0.0)) if variance is not None else None,
+            "min": intensity_min,
+            "max": intensity_max,
+        },
+    }
+
+
+def _symptom_summary(symptom_counts, keyword_totals: Counter) -> dict:
+    total = int(symptom_counts.sum())
+    days_with = int((symptom_counts > 0).sum())
+    return {
+        "total_entries": total,
+        "days_with_symptoms": days_with,
+        "top_keywords": [
+            {"keyword": word, "count": count} for word, count in keyword_totals.most_common(TOP_KEYWORDS)
+        ],
+    }
+
+
+def _trend_summary(start: date, type_counts, intensity_n, intensity_sum, symptom_counts) -> dict:
+    n_days = len(intensity_n)
+    labels = MOOD_TYPES + ["unspecified"]
+
+    # Rolling mean intensity over ROLLING_WINDOW_DAYS, ignoring days without entries
+    window = np.ones(min(ROLLING_WINDOW_DAYS, n_days))
+    rolling_sum = np.convolve(intensity_sum, window, mode="valid")
+    rolling_n = np.convolve(intensity_n, window, mode="valid")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rolling_mean = np.where(rolling_n > 0, rolling_sum / rolling_n, np.nan)
+        daily_mean = np.where(intensity_n > 0, intensity_sum / intensity_n, np.nan)
+
+    # Linear slope of daily mean intensity (points per week)
+    has_data = ~np.isnan(daily_mean)
+    slope = None
+    if has_data.sum() >= 3:
+        days_idx = np.arange(n_days)[has_data]
+        slope = _round(np.polyfit(days_idx, daily_mean[has_data], 1)[0] * 7, 3)
+
+    rolling = {}
+    if np.isfinite(rolling_mean).any():
+        rolling = {
+            "window_days": len(window),
+            "latest": _round(rolling_mean[-1]),
+            "highest": _round(np.nanmax(rolling_mean)),
+            "lowest": _round(np.nanmin(rolling_mean)),
+        }
+
+    # Downsample the whole range into at most MAX_TREND_BUCKETS periods
+    buckets = []
+    for idx in np.array_split(np.arange(n_days), min(MAX_TREND_BUCKETS, n_days)):
+        b_counts = type_counts[idx].sum(axis=0)
+        b_n = intensity_n[idx].sum()
+        buckets.append({
+            "from": (start + timedelta(days=int(idx[0]))).isoformat(),
+            "to": (start + timedelta(days=int(idx[-1]))).isoformat(),
+            "mood_entries": int(b_counts.sum()),
+            "dominant_mood": labels[int(b_counts.argmax())] if b_counts.sum() else None,
+            "mean_intensity": _round(intensity_sum[idx].sum() / b_n) if b_n else None,
+            "symptom_entries": int(symptom_counts[idx].sum()),
+        })
+
+    return {
+        "intensity_slope_per_week": slope,
+        "rolling_intensity": rolling,
+        "periods": buckets,
+    }
+
+
+def _correlation_summary(type_counts, intensity_n, intensity_sum, symptom_counts, keyword_totals, keyword_days) -> dict:
+    n_days = len(intensity_n)
+    labels = MOOD_TYPES + ["unspecified"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_mean = np.where(intensity_n > 0, intensity_sum / intensity_n, np.nan)
+    has_mood = ~np.isnan(daily_mean)
+
+    # Symptom load vs. mood intensity on the same day and the following day
+    intensity_vs_symptoms = {
+        "same_day": _corr(symptom_counts, np.nan_to_num(daily_mean), has_mood),
+        "next_day": _corr(symptom_counts[:-1], np.nan_to_num(daily_mean[1:]), has_mood[1:]) if n_days > 1 else None,
+    }
+
+    # Keyword x mood-type co-occurrence, same day and mood on the day after the symptom.
+    # lift = P(mood | keyword day) / P(mood on any logged day)
+    mood_present = type_counts[:, :len(MOOD_TYPES)] > 0
+    logged_days = max(int((type_counts.sum(axis=1) > 0).sum()), 1)
+    base_rate = mood_present.sum(axis=0) / logged_days
+
+    pairs = []
+    for word, _ in keyword_totals.most_common(TOP_KEYWORDS):
+        k_days = keyword_days[word]
+        for lag, label in ((0, "same_day"), (1, "next_day")):
+            k = k_days[:n_days - lag] if lag else k_days
+            m = mood_present[lag:]
+            n_k = int(k.sum())
+            if n_k < 2:
+                continue
+            hits = (m & k[:, None]).sum(axis=0)
+            for t, count in enumerate(hits):
+                if count < 2 or base_rate[t] == 0:
+                    continue
+                rate = count / n_k
+                pairs.append({
+                    "keyword": word,
+                    "mood": labels[t],
+                    "lag": label,
+                    "days": int(count),
+                    "rate": _round(rate),
+                    "lift": _round(rate / base_rate[t]),
+                })
+
+    pairs.sort(key=lambda p: (p["lift"] or 0, p["days"]), reverse=True)
+    return {
+        "intensity_vs_symptom_count": intensity_vs_symptoms,
+        "keyword_mood_cooccurrence": pairs[:TOP_COOCCURRENCES],
+    }
@@ -0,0 +1,47 @@
+# Output schemas for the structured LLM calls (see structured_model() in llm_client).
+#
+# OpenAI's strict mode requires every field, so optional values are nullable fields
+# without defaults. The field descriptions are part of the schema the model sees.
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class TaskAnalysis(BaseModel):
+    title: str = Field(description="Clear task title")
+    description: str = Field(description="Task description if provided, otherwise empty")
+    due_date: Optional[str] = Field(description="YYYY-MM-DD, or null")
+    preferred_time: Optional[str] = Field(description="HH:MM (24h), or null")
+    timezone: Optional[str] = Field(description="IANA timezone name if the user mentioned one, or null")
+    duration_minutes: int = Field(description="Estimated duration in minutes")
+    is_recurring: bool
+    recurrence_pattern: Optional[Literal["daily", "weekly", "monthly"]]
+    recurrence_interval: Optional[int] = Field(description="Every N days/weeks/months, or null")
+    recurrence_end_date: Optional[str] = Field(description="YYYY-MM-DD, or null")
+
+    @field_validator("due_date", "recurrence_end_date")
+    @classmethod
+    def _iso_date(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            date.fromisoformat(value)
+        return value
+
+    @field_validator("preferred_time")
+    @classmethod
+    def _hh_mm(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            datetime.strptime(value, "%H:%M")
+        return value
+
+
+class WellnessSummary(BaseModel):
+    patterns: str
+    correlations: str
+    possible_causes: str
+    recommendations: List[str]
+
+
+class SupportMessage(BaseModel):
+    # pep talks, affirmations, advice, quotes: the text alone, no "Affirmation:" label
+    text: str = Field(description="The message itself, addressed to the user, without a heading or label")
@@ -5,7 +5,9 @@ from typing_extensions import TypedDict
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from app.ai.llm_client import create_chat_model, invoke_llm
+from app.core.tracing import tracer, traced
+from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain.prompts import ChatPromptTemplate
 from pinecone import Pinecone, ServerlessSpec
@@ -39,11 +41,12 @@ if index_name not in pc.list_indexes().names():
 index = pc.Index(index_name)
 
 # === LLM & Embeddings ===
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+llm = create_chat_model(model="gpt-4o-mini", temperature=0)
 embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
 vector_store = PineconeVectorStore(embedding=embedding_model, index=index)
 
 # === Ingest Pipeline ===
+@traced("rag.ingest_pdfs")
 def ingest_pdfs(filenames: Optional[List[str]] = None):
     print("Ingesting PDFs...")
     all_docs = []
@@ -53,15 +56,19 @@ def ingest_pdfs(filenames: Optional[List[str]] = None):
     # If filenames is given → process only those.
     # If filenames is None → process all .pdf files in pdfs/ folder.
 
-    for filename in files_to_process:
-        if filename.endswith(".pdf"):
-            pdf_path = os.path.join(folder_path, filename)
-            loader = PyPDFLoader(pdf_path)
-            docs = loader.load()
-            all_docs.extend(docs)
+    with tracer.start_as_current_span("rag.ingest.load") as span:
+        for filename in files_to_process:
+            if filename.endswith(".pdf"):
+                pdf_path = os.path.join(folder_path, filename)
+                loader = PyPDFLoader(pdf_path)
+                docs = loader.load()
+                all_docs.extend(docs)
+        span.set_attribute("rag.pages", len(all_docs))
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=4000, chunk_overlap=300)
-    chunks = splitter.split_documents(all_docs)
+    with tracer.start_as_current_span("rag.ingest.split") as span:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=4000, chunk_overlap=300)
+        chunks = splitter.split_documents(all_docs)
+        span.set_attribute("rag.chunks", len(chunks))
 
     # Generate deterministic, file-specific IDs for chunks
     from collections import defaultdict
@@ -75,11 +82,12 @@ def ingest_pdfs(filenames: Optional[List[str]] = None):
         chunk_counters[(filename, page)] += 1
 
     existing_ids = set()
-    for i in range(0, len(unique_ids), batch_size):
-        batch_ids = unique_ids[i:i + batch_size]
-        result = index.fetch(ids=batch_ids)
-        existing_ids.update(result.vectors.keys())
-        # Skips chunks whose IDs already exist in the Pinecone vector index.
+    with tracer.start_as_current_span("rag.ingest.fetch_existing"):
+        for i in range(0, len(unique_ids), batch_size):
+            batch_ids = unique_ids[i:i + batch_size]
+            result = index.fetch(ids=batch_ids)
+            existing_ids.update(result.vectors.keys())
+            # Skips chunks whose IDs already exist in the Pinecone vector index.
 
     filtered_chunks = []
     filtered_ids = []
@@ -94,7 +102,9 @@ def ingest_pdfs(filenames: Optional[List[str]] = None):
     print(f"New chunks to embed: {len(filtered_chunks)}")
 
     chunk_texts = [chunk.page_content for chunk in filtered_chunks]
-    embeddings = embedding_model.embed_documents(chunk_texts)
+    with tracer.start_as_current_span("rag.ingest.embed") as span:
+        span.set_attribute("rag.chunks", len(chunk_texts))
+        embeddings = embedding_model.embed_documents(chunk_texts)
 
     to_upsert = []
     for uid, chunk, vector in zip(filtered_ids, filtered_chunks, embeddings):
@@ -110,9 +120,10 @@ def ingest_pdfs(filenames: Optional[List[str]] = None):
             }
         ))
 
-    for i in range(0, len(to_upsert), batch_size):
-        batch = to_upsert[i:i + batch_size]
-        index.upsert(vectors=batch)
+    with tracer.start_as_current_span("rag.ingest.upsert"):
+        for i in range(0, len(to_upsert), batch_size):
+            batch = to_upsert[i:i + batch_size]
+            index.upsert(vectors=batch)
 
     newly_added_files = [fname for fname, count in file_to_new_chunk.items() if count > 0]
     print(f"PDF Ingest complete. {len(newly_added_files)} files added to Pinecone.")
@@ -145,14 +156,16 @@ class State(TypedDict):
     context: List[Document]
     answer: str
 
+@traced("rag.retrieve")
 def retrieve(state: State):
     docs = vector_store.similarity_search(state["question"], k=5)
     return {"context": docs}
 
+@traced("rag.generate")
 def generate(state: State):
     docs_content = "\n\n".join(doc.page_content for doc in state["context"])
     messages = prompt.invoke({"question": state["question"], "context": docs_content})
-    response = llm.invoke(messages)
+    response = invoke_llm(llm, messages, "rag.answer")
     return {"answer": response.content}
 
 graph_builder = StateGraph(State).add_sequence([retrieve, generate])
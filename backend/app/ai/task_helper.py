@@ -1,35 +1,44 @@
+import logging
 import os
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-import json 
-from langchain.chains import LLMChain
-from datetime import datetime
+import re
+import hashlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from app.ai.llm_client import create_chat_model, structured_model, invoke_structured
+from app.ai.output_schemas import TaskAnalysis
+from langchain_core.prompts import ChatPromptTemplate
+from datetime import datetime, timedelta
 import pytz
+from app.core.tracing import traced
+from app.core.cache import TTLCache
+from app.core.metrics import llm_cache_lookups_total
+from app.db.session import SessionLocal
+import app.crud.task_parse
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+TASK_PARSE_CONCURRENCY = int(os.getenv("TASK_PARSE_CONCURRENCY", "8"))  # parallel LLM calls per batch
 
-llm = ChatOpenAI(openai_api_key=OPENAI_API_KEY, temperature=0.2, model="gpt-4o-mini")
+logger = logging.getLogger("tasks.parse")
 
+llm = create_chat_model(openai_api_key=OPENAI_API_KEY, temperature=0.2, model="gpt-4o-mini")
+
+# Parse cache: the same phrase on the same day (in the same timezone) parses the same, so
+# results are kept per normalized input + reference date + timezone, in memory and in
+# task_parse_cache so they survive restarts and are shared between workers. Inputs that
+# depend on the time of day ("in 2 hours", "in 30m", "tonight", "later") always go to the
+# LLM, as do failed parses.
+parse_cache = TTLCache(maxsize=10_000, ttl=24 * 3600)  # key -> analysis
+_NUMBER_WORDS = (r"one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|fifteen|twenty|thirty|"
+                 r"forty[- ]five|forty|ninety")
+_TIME_RELATIVE = re.compile(
+    r"\b(now|asap|right away|immediately|soon|later|tonight|this (morning|afternoon|evening)"
+    rf"|in (a|an|half an|a few|a couple( of)?|\d+|{_NUMBER_WORDS}) ?(min|mins|minutes?|hours?|hrs?|h|m)"
+    r"|\d+ ?(m|h|min|mins|hr|hrs))\b"
+)
+_last_purge = None  # reference date of the last purge of old task_parse_cache rows
 
-def analyze_task_input(user_input: str, current_datetime: datetime = None) -> dict:
-    """
-    Analyzes user input to determine task timing, and scheduling details.
-    
-    Args:
-        user_input: Natural language task description
-        current_datetime: Current date and time (defaults to now in EST)
-    """
-    # Use current datetime or default to now in EST
-    if current_datetime is None:
-        est_tz = pytz.timezone('America/New_York')
-        current_datetime = datetime.now(est_tz)
-    
-    # Format current datetime for the AI
-    current_date_str = current_datetime.strftime("%Y-%m-%d")
-    current_time_str = current_datetime.strftime("%H:%M")
-    current_timezone = str(current_datetime.tzinfo)
-    
-    system_message = """You are a task analysis and task scheduling assistant. Your job is to convert user input into structured task metadata.
+
+SYSTEM_MESSAGE = """You are a task analysis and task scheduling assistant. Your job is to convert user input into structured task metadata.
 
 Your responsibilities:
 1. Parse natural language task descriptions
@@ -37,7 +46,7 @@ Your responsibilities:
 3. Estimate missing appropriate task durations and preferred times
 4. Identify recurring patterns and end dates
 5. Categorize tasks by type (work, personal, health)
-6. Always return valid JSON format
+6. Fill in every field of the output schema (null where nothing applies)
 
 Task categorization guidelines:
 - Work: work related activities, meetings, deadlines, projects, tasks, tickets, etc.
@@ -51,29 +60,15 @@ Duration estimation guidelines:
 
 IMPORTANT: You have access to the current date and time context. Use this to interpret relative dates like "today", "tomorrow", "next week", etc."""
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_message),
-        ("user", """Current context:
+TASK_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_MESSAGE),
+    ("user", """Current context:
 - Date: {current_date}
 - Time: {current_time}
 - Timezone: {current_timezone}
 
 Analyze this task input: {user_input}
 
-Return JSON with this structure:
-{{
-    "title": "Clear task title",
-    "description": "Task description if provided",
-    "due_date": "YYYY-MM-DD or null",
-    "preferred_time": "HH:MM or null",
-    "timezone": "timezone string (e.g., 'Asia/Bishkek', 'America/New_York') or null",
-    "duration_minutes": number,
-    "is_recurring": true/false,
-    "recurrence_pattern": "daily|weekly|monthly or null",
-    "recurrence_interval": number or null,
-    "recurrence_end_date": "YYYY-MM-DD or null"
-}}
-
 Timezone guidelines:
 - If user mentions a specific timezone (e.g., "Bishkek time", "EST", "PST"), extract it
 - Use IANA timezone names (e.g., 'Asia/Bishkek', 'America/New_York', 'Europe/London')
@@ -86,38 +81,49 @@ Date interpretation guidelines:
 - Day names (e.g., "monday", "tuesday", "sunday") should be interpreted as the NEXT occurrence of that day from {current_date}
 - If today is Sunday and user says "sunday", schedule for next Sunday (7 days from today)
 - If today is Monday and user says "sunday", schedule for this Sunday (6 days from today)
-- Always convert relative dates to absolute YYYY-MM-DD format
+- Always convert relative dates to absolute YYYY-MM-DD format""")
+])
+
+# built once: the prompt and chain are stateless, so all calls share them
+task_chain = TASK_PROMPT | structured_model(llm, TaskAnalysis)
 
-Only return valid JSON, no additional text.""")
-    ])
+
+@traced("task.analyze_task_input")
+def analyze_task_input(user_input: str, current_datetime: datetime = None, user_id=None) -> dict:
+    """
+    Analyzes user input to determine task timing, and scheduling details.
+    
+    Args:
+        user_input: Natural language task description
+        current_datetime: Current date and time (defaults to now in EST)
+        user_id: Charged for the tokens used (per-user budget)
+    """
+    # Use current datetime or default to now in EST
+    if current_datetime is None:
+        est_tz = pytz.timezone('America/New_York')
+        current_datetime = datetime.now(est_tz)
     
-    chain = LLMChain(llm=llm, prompt=prompt)
-    response = chain.invoke({
+    # Format current datetime for the AI
+    current_date_str = current_datetime.strftime("%Y-%m-%d")
+    current_time_str = current_datetime.strftime("%H:%M")
+    current_timezone = str(current_datetime.tzinfo)
+
+    key = parse_cache_key(user_input, current_date_str, current_timezone)
+    if key is None:
+        llm_cache_lookups_total.labels("task.parse", "bypass").inc()
+    else:
+        cached = _cached_analysis(key)
+        if cached is not None:
+            return dict(cached)
+
+    parsed, _ = invoke_structured(task_chain, {
         "user_input": user_input,
         "current_date": current_date_str,
         "current_time": current_time_str,
         "current_timezone": current_timezone
-    })
-    
-    try:
-        # Handle different response formats
-        if hasattr(response, 'content'):
-            # Response is an AIMessage object
-            content = response.content
-        elif isinstance(response, dict):
-            # Response is a dictionary
-            content = response.get('text', str(response))
-        else:
-            # Response is something else, convert to string
-            content = str(response)
-        
-        return json.loads(content)
-    except (json.JSONDecodeError, AttributeError) as e:
-        print(f"Error parsing AI response: {e}")
-        print(f"Response type: {type(response)}")
-        print(f"Response content: {response}")
-        
-        # Fallback parsing
+    }, "task.parse", user_id)
+    if parsed is None:
+        # counted in llm_parse_failures_total; the input becomes an unscheduled task
         return {
             "title": user_input,
             "description": "",
@@ -129,4 +135,67 @@ Only return valid JSON, no additional text.""")
             "recurrence_pattern": None,
             "recurrence_interval": None,
             "recurrence_end_date": None
-        }
\ No newline at end of file
+        }
+
+    analysis = parsed.model_dump()
+    if key is not None:
+        _store_analysis(key, current_datetime.date(), analysis)
+    return analysis
+
+
+def parse_cache_key(user_input: str, current_date: str, current_timezone: str) -> str | None:
+    """Cache key for an input on a reference date, or None if the input must not be cached."""
+    normalized = " ".join(user_input.split()).casefold()
+    if not normalized or _TIME_RELATIVE.search(normalized):
+        return None
+    return hashlib.sha256(f"{current_date}|{current_timezone}|{normalized}".encode()).hexdigest()
+
+
+def _cached_analysis(key: str) -> dict | None:
+    analysis = parse_cache.get(key)
+    if analysis is not None:
+        llm_cache_lookups_total.labels("task.parse", "memory").inc()
+        return analysis
+    try:
+        with SessionLocal() as db:
+            analysis = app.crud.task_parse.get_cached_analysis(db, key)
+    except Exception as e:
+        # the cache is an optimization; a database hiccup just means an LLM call
+        logger.warning("Task parse cache lookup failed: %s", e)
+        analysis = None
+    if analysis is None:
+        llm_cache_lookups_total.labels("task.parse", "miss").inc()
+        return None
+    llm_cache_lookups_total.labels("task.parse", "db").inc()
+    parse_cache.set(key, analysis)
+    return analysis
+
+
+def _store_analysis(key: str, reference_date, analysis: dict) -> None:
+    global _last_purge
+    parse_cache.set(key, dict(analysis))
+    try:
+        with SessionLocal() as db:
+            app.crud.task_parse.save_analysis(db, key, reference_date, analysis)
+            if _last_purge != reference_date:
+                # once a day per process; a day of slack for users behind UTC
+                _last_purge = reference_date
+                app.crud.task_parse.purge_analyses(db, reference_date - timedelta(days=1))
+    except Exception as e:
+        logger.warning("Task parse cache write failed: %s", e)
+
+
+def analyze_task_inputs(user_inputs: list[str], current_datetime: datetime = None, user_id=None) -> list[dict]:
+    """
+    analyze_task_input for several inputs, run concurrently (one LLM call each, at most
+    TASK_PARSE_CONCURRENCY at a time). Results are in input order.
+    """
+    if not user_inputs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(TASK_PARSE_CONCURRENCY, len(user_inputs))) as pool:
+        # each call runs in a copy of the caller's context so its span nests under the request's
+        futures = [
+            pool.submit(contextvars.copy_context().run, analyze_task_input, user_input, current_datetime, user_id)
+            for user_input in user_inputs
+        ]
+        return [future.result() for future in futures]
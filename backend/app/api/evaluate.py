@@ -1,11 +1,20 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 from datetime import date
+from typing import Optional
+from uuid import UUID
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.ai.langgraph_evaluate import evaluate_graph
+from app.db.session import get_db, SessionLocal
+from app.ai.langgraph_evaluate import evaluate_graph, summary_events
 from app.core.dependencies import get_current_user
 from app.models.user import User
+import app.crud.evaluation
+from app.crud.data_version import get_data_version, WELLNESS
+from app.ai.llm_client import check_llm_budget
+from app.ai.output_schemas import WellnessSummary
 
 
 router = APIRouter(prefix="/evaluate", tags=["evaluate"])
@@ -15,26 +24,103 @@ class EvaluateRequest(BaseModel):
     end_date: date
 
 class EvaluateResponse(BaseModel):
-    summary: str
+    summary: WellnessSummary
+
+
+def _cached_summary(db: Session, user_id: UUID, req: EvaluateRequest) -> tuple[int, Optional[WellnessSummary]]:
+    # Reuse the stored result if the user's moods/symptoms haven't changed since
+    data_version = get_data_version(db, user_id, WELLNESS)
+    cached = app.crud.evaluation.get_cached_evaluation(db, user_id, req.start_date, req.end_date, data_version)
+    if cached is not None:
+        try:
+            return data_version, WellnessSummary.model_validate(cached)
+        except ValidationError:
+            pass  # stored before summaries were schema-validated; regenerate
+    return data_version, None
+
+
+def _save_summary(user_id: UUID, req: EvaluateRequest, data_version: int, summary: dict) -> None:
+    with SessionLocal() as db:
+        app.crud.evaluation.save_evaluation(db, user_id, req.start_date, req.end_date, data_version, summary)
+
+
+async def _prepare(req: EvaluateRequest, db: Session, user: User) -> tuple[UUID, int, Optional[WellnessSummary]]:
+    user_id = user.id
+    data_version, cached = await run_in_threadpool(_cached_summary, db, user_id, req)
+    # The graph reads with its own short session; don't hold this connection during the LLM call
+    db.close()
+    if cached is None:
+        # Fail before fetching anything if the user is out of tokens for today (429)
+        check_llm_budget(user_id)
+    return user_id, data_version, cached
+
+
+def _initial_state(user_id: UUID, req: EvaluateRequest) -> dict:
+    return {
+        "user_id": user_id,
+        "start_date": str(req.start_date),
+        "end_date": str(req.end_date),
+        "stats": {},
+        "summary": {},
+        "error": None,
+    }
+
 
 @router.post("/", response_model=EvaluateResponse)
-def evaluate_moods_symptoms(
+async def evaluate_moods_symptoms(
     req: EvaluateRequest,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user), 
 ):
+    user_id, data_version, cached = await _prepare(req, db, user)
+    if cached is not None:
+        return EvaluateResponse(summary=cached)
+
     # Run the analysis workflow
-    state = {
-        "user_id": user.id,
-        "start_date": str(req.start_date),
-        "end_date": str(req.end_date),
-        "db": db,
-        "mood_data": [],
-        "symptom_data": [],
-        "summary": {},
-        "error": None,
-    }
-    result = evaluate_graph.invoke(state)
+    result = await evaluate_graph.ainvoke(_initial_state(user_id, req))
     if result.get("error"):
         raise HTTPException(status_code=500, detail=result["error"])
-    return EvaluateResponse(summary=result["summary"])
\ No newline at end of file
+
+    await run_in_threadpool(_save_summary, user_id, req, data_version, result["summary"])
+    return EvaluateResponse(summary=result["summary"])
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Server-Sent Events version of POST /evaluate/: "patterns", "correlations" and
+# "possible_causes" as soon as each is generated, one "recommendation" per item, then
+# "done" with the whole summary (or "error"). A cached summary is replayed at once.
+@router.post("/stream")
+async def stream_evaluation(
+    req: EvaluateRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    user_id, data_version, cached = await _prepare(req, db, user)
+
+    async def event_source():
+        if cached is not None:
+            for event in summary_events(cached.model_dump()):
+                yield _sse(event["event"], event["data"])
+            yield _sse("done", {"summary": cached.model_dump()})
+            return
+
+        result = {}
+        async for mode, chunk in evaluate_graph.astream(_initial_state(user_id, req), stream_mode=["custom", "values"]):
+            if mode == "custom":
+                yield _sse(chunk["event"], chunk["data"])
+            else:
+                result = chunk
+        if result.get("error"):
+            yield _sse("error", {"detail": result["error"]})
+            return
+        await run_in_threadpool(_save_summary, user_id, req, data_version, result["summary"])
+        yield _sse("done", {"summary": result["summary"]})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,43 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.core.dependencies import get_user_from_token
+from app.services.event_stream import broker
+
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE_SECONDS = 15
+
+
+# Server-Sent Events stream of the user's task and reminder changes (including reminders
+# marked delivered by the dispatcher). EventSource can't set headers, so the JWT is
+# passed as ?token=...
+@router.get("/stream")
+def stream_events(request: Request, token: str = Query(...), db: Session = Depends(get_db)):
+    user = get_user_from_token(token, db)
+    user_id = user.id
+    db.close()  # don't hold a pooled connection for the lifetime of the stream
+
+    async def event_source():
+        queue = broker.subscribe(user_id)
+        try:
+            yield "event: ready\ndata: {}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event.get('resource')}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
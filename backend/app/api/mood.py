@@ -3,11 +3,13 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List
 import app.crud.mood
-from app.schemas.mood import MoodCreate, MoodUpdate, MoodOut
+from app.schemas.mood import MoodCreate, MoodUpdate, MoodOut, MoodBatchCreate, MoodBatchOut
 from app.db.session import get_db
 from app.ai.mood_symptom_helper import generate_pep_talk, generate_affirmation, generate_daily_quote
+from app.ai.llm_client import LLMBudgetExceeded
 from app.core.dependencies import get_current_user
 from app.models.user import User
+from app.core.responses import rows_response
 
 
 router = APIRouter(prefix="/moods", tags=["moods"])
@@ -22,15 +24,21 @@ def create_mood_and_generate(mood_in: MoodCreate, db: Session = Depends(get_db),
     mood = app.crud.mood.create_mood(db, mood_in, user_id=user.id)
 
     # 2. Immediately generate pep talk and affirmation based on the input (no DB lookup)
-    pep_talk = generate_pep_talk(
-        mood_in.mood_type.value if mood_in.mood_type else None, 
-        mood_in.description or "", 
-        mood_in.intensity
-    )
-    affirmation = generate_affirmation(
-        mood_in.mood_type.value if mood_in.mood_type else None, 
-        mood_in.description or ""
-    )
+    try:
+        pep_talk = generate_pep_talk(
+            mood_in.mood_type.value if mood_in.mood_type else None, 
+            mood_in.description or "", 
+            mood_in.intensity,
+            user_id=user.id,
+        )
+        affirmation = generate_affirmation(
+            mood_in.mood_type.value if mood_in.mood_type else None, 
+            mood_in.description or "",
+            user_id=user.id,
+        )
+    except LLMBudgetExceeded:
+        # the mood is saved either way; no feedback once today's AI budget is used up
+        pep_talk = affirmation = None
 
     # 3. Return mood ID + generated messages
     return {
@@ -40,9 +48,30 @@ def create_mood_and_generate(mood_in: MoodCreate, db: Session = Depends(get_db),
     }
 
 
+# Bulk create for offline sync: one INSERT for the batch, feedback only if asked for
+@router.post("/batch", response_model=MoodBatchOut, status_code=status.HTTP_201_CREATED)
+def create_moods_batch(batch: MoodBatchCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    ids = app.crud.mood.create_moods(db, batch.items, user_id=user.id)
+
+    if not batch.generate_feedback:
+        return MoodBatchOut(ids=ids)
+
+    # Feedback for the most recent entry only, not one pair of LLM calls per synced mood
+    latest = max(batch.items, key=lambda m: m.date.timestamp() if m.date else float("inf"))
+    mood_type = latest.mood_type.value if latest.mood_type else None
+    try:
+        return MoodBatchOut(
+            ids=ids,
+            pep_talk=generate_pep_talk(mood_type, latest.description or "", latest.intensity, user_id=user.id),
+            affirmation=generate_affirmation(mood_type, latest.description or "", user_id=user.id),
+        )
+    except LLMBudgetExceeded:
+        return MoodBatchOut(ids=ids)
+
+
 @router.get("/", response_model=List[MoodOut])
 def get_all_moods(db: Session = Depends(get_db)):
-    return app.crud.mood.get_all_moods(db)
+    return rows_response(app.crud.mood.get_all_moods(db))
 
 @router.get("/{mood_id}", response_model=MoodOut)
 def get_mood(mood_id: UUID, db: Session = Depends(get_db)):
@@ -0,0 +1,38 @@
+import hmac
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from app.core.profiler import profiler, ProfilerBusy, PROFILER_TOKEN, to_collapsed, to_speedscope
+
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+# Profiles this worker for `seconds` while it keeps serving traffic. Disabled (404) unless
+# PROFILER_TOKEN is set; the token doubles as the admin check.
+@router.get("/profile", include_in_schema=False)
+async def capture_profile(
+    seconds: float = Query(10, gt=0, le=120),
+    interval_ms: float = Query(5, ge=1, le=100),
+    mode: str = Query("wall", enum=["wall", "cpu"]),
+    format: str = Query("speedscope", enum=["speedscope", "collapsed"]),
+    x_profiler_token: Optional[str] = Header(None),
+):
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_profiler_token or not hmac.compare_digest(x_profiler_token, PROFILER_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiler token")
+
+    try:
+        profile = await run_in_threadpool(profiler.capture, seconds, interval_ms / 1000, mode)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "collapsed":
+        return Response(to_collapsed(profile), media_type="text/plain")
+    return Response(
+        json.dumps(to_speedscope(profile)),
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+    )
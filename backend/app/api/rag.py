@@ -1,5 +1,5 @@
 import os
-from fastapi import APIRouter, UploadFile, File, Body, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Body, Form, HTTPException, Request
 from app.ai.rag import ingest_pdfs, graph, delete_embeddings_by_filename, index
 from typing import Optional, List
 from sqlalchemy.orm import Session
@@ -7,6 +7,9 @@ from fastapi import Depends
 from app.db.session import get_db
 from app.models.rag import EmbeddedFile
 from app.schemas.rag import EmbeddedFileOut
+from app.crud.data_version import bump_shared_data_version, get_shared_data_stamp, RAG_FILES
+from app.core.conditional import validator_headers, is_not_modified, not_modified
+from app.core.responses import rows_response, schema_columns
 
 
 folder_path = os.path.join(os.path.dirname(__file__), "../ai/pdfs")
@@ -26,6 +29,7 @@ async def upload_pdf(file: UploadFile = File(...), db: Session = Depends(get_db)
     # 2. If file name is not in DB, add it to embedded_files table first
     new_file = EmbeddedFile(filename=file.filename)
     db.add(new_file)
+    bump_shared_data_version(db, RAG_FILES)
     db.commit()
     
     try:
@@ -43,6 +47,7 @@ async def upload_pdf(file: UploadFile = File(...), db: Session = Depends(get_db)
     except Exception as e:
         # If something goes wrong, remove the DB entry
         db.delete(new_file)
+        bump_shared_data_version(db, RAG_FILES)
         db.commit()
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
 
@@ -61,6 +66,7 @@ async def delete_by_filename(filename: str = Body(..., embed=True), db: Session
     result = delete_embeddings_by_filename(filename)
     # Delete the record from the "embedded_files" table
     db.query(EmbeddedFile).filter_by(filename=filename).delete()
+    bump_shared_data_version(db, RAG_FILES)
     db.commit()
     return {"status": "deleted", "filename": filename, "result": result}
 
@@ -70,5 +76,9 @@ async def ask_endpoint(question: str = Body(..., embed=True)):
     return {"answer": response["answer"]}
 
 @router.get("/list_files/", response_model=List[EmbeddedFileOut])
-async def list_files(db: Session = Depends(get_db)):
-    return db.query(EmbeddedFile).all()
\ No newline at end of file
+async def list_files(request: Request, db: Session = Depends(get_db)):
+    headers = validator_headers(request, *get_shared_data_stamp(db, RAG_FILES))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    rows = db.query(*schema_columns(EmbeddedFile, EmbeddedFileOut)).all()
+    return rows_response(rows, headers=headers)
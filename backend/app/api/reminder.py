@@ -9,6 +9,7 @@ from app.core.dependencies import get_current_user
 from app.models.user import User
 from datetime import datetime
 from app.models.reminder import Reminder
+from app.core.responses import rows_response
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
 
@@ -35,7 +36,7 @@ def get_reminders_due(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    return app.crud.reminder.get_reminders_due_by_date(db, user_id=user.id, due_by=due_by)
+    return rows_response(app.crud.reminder.get_reminders_due_by_date(db, user_id=user.id, due_by=due_by))
 
 # Delete a reminder
 @router.delete("/{reminder_id}", status_code=204)
@@ -4,11 +4,13 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 import app.crud.symptom
-from app.schemas.symptom import SymptomCreate, SymptomUpdate, SymptomOut
+from app.schemas.symptom import SymptomCreate, SymptomUpdate, SymptomOut, SymptomBatchCreate, SymptomBatchOut
 from app.models.symptom import Symptom
 from app.ai.mood_symptom_helper import generate_symptom_advice
+from app.ai.llm_client import LLMBudgetExceeded
 from app.core.dependencies import get_current_user
 from app.models.user import User
+from app.core.responses import rows_response
 
 
 router = APIRouter(prefix="/symptoms", tags=["symptoms"])
@@ -23,7 +25,11 @@ def create_symptom_and_generate_advice(symptom: SymptomCreate, db: Session = Dep
     created_symptom = app.crud.symptom.create_symptom(db, symptom, user_id=user.id)
 
     # 2. Generate advice based on the saved symptom's description
-    advice = generate_symptom_advice(description=symptom.description)
+    try:
+        advice = generate_symptom_advice(description=symptom.description, user_id=user.id)
+    except LLMBudgetExceeded:
+        # the symptom is saved either way; no advice once today's AI budget is used up
+        advice = None
 
     # 3. Return both DB object and advice
     return {
@@ -35,9 +41,24 @@ def create_symptom_and_generate_advice(symptom: SymptomCreate, db: Session = Dep
     }
 
 
+# Bulk create for offline sync: one INSERT for the batch, advice only if asked for
+@router.post("/batch", response_model=SymptomBatchOut, status_code=status.HTTP_201_CREATED)
+def create_symptoms_batch(batch: SymptomBatchCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    ids = app.crud.symptom.create_symptoms(db, batch.items, user_id=user.id)
+
+    if not batch.generate_advice:
+        return SymptomBatchOut(ids=ids)
+
+    latest = max(batch.items, key=lambda s: s.date.timestamp() if s.date else float("inf"))
+    try:
+        return SymptomBatchOut(ids=ids, advice=generate_symptom_advice(description=latest.description, user_id=user.id))
+    except LLMBudgetExceeded:
+        return SymptomBatchOut(ids=ids)
+
+
 @router.get("/", response_model=List[SymptomOut])
 def get_all_symptoms(db: Session = Depends(get_db)):
-    return app.crud.symptom.get_all_symptoms(db)
+    return rows_response(app.crud.symptom.get_all_symptoms(db))
 
 @router.get("/{symptom_id}", response_model=SymptomOut)
 def get_symptom(symptom_id: UUID, db: Session = Depends(get_db)):
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List, Optional
 import app.crud.task
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskOccurrenceOut, TaskBatchCreate, TaskBatchOut, TaskCalendarOut
 from app.db.session import get_db
 from app.models.task import Task, TaskStatus
 from app.core.dependencies import get_current_user
 from app.models.user import User
-from datetime import datetime, timedelta
+from app.core.responses import rows_response, ORJSONResponse
+from app.services.recurrence import next_occurrence, occurrences_between, to_rrule
+from app.core.conditional import validator_headers, is_not_modified, not_modified
+from app.crud.data_version import bump_data_version, get_data_stamp, TASKS
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from sqlalchemy import or_, and_
-from app.ai.task_helper import analyze_task_input
+from app.ai.task_helper import analyze_task_input, analyze_task_inputs
+from app.ai.llm_client import check_llm_budget
+from app.ai.llm_client import LLMBudgetExceeded
 from app.services.google_calendar import GoogleCalendarService
+from app.services.slot_planner import SlotRequest, plan_slots, MAX_DAYS_AHEAD
+import logging
 import pytz
+import re
 
 
+logger = logging.getLogger("tasks")
+
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 # TaskOut is the Pydantic model used for output serialization.
@@ -97,14 +109,7 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db), user: User = De
             # Create recurrence rule if needed
             recurrence_rule = None
             if task.is_recurring and task.recurrence_pattern:
-                if task.recurrence_pattern == "daily":
-                    recurrence_rule = f"RRULE:FREQ=DAILY;INTERVAL={task.recurrence_interval or 1}"
-                    if task.recurrence_end_date:
-                        recurrence_rule += f";UNTIL={task.recurrence_end_date.strftime('%Y%m%d')}"
-                elif task.recurrence_pattern == "weekly":
-                    recurrence_rule = f"RRULE:FREQ=WEEKLY;INTERVAL={task.recurrence_interval or 1}"
-                elif task.recurrence_pattern == "monthly":
-                    recurrence_rule = f"RRULE:FREQ=MONTHLY;INTERVAL={task.recurrence_interval or 1}"
+                recurrence_rule = to_rrule(task.recurrence_pattern, task.recurrence_interval, task.recurrence_end_date)
             
             # Create calendar event
             calendar_service.create_event(
@@ -122,16 +127,17 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db), user: User = De
         raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}")
 
 
-def get_next_due_date(current_due_date, pattern, interval):
-    if pattern == "daily":
-        return current_due_date + timedelta(days=interval)
-    elif pattern == "weekly":
-        return current_due_date + timedelta(weeks=interval)
-    elif pattern == "monthly":
-        # For simplicity, add 30 days per month
-        return current_due_date + timedelta(days=30 * interval)
-    else:
-        return None
+# Bulk create for offline sync: one INSERT for the batch.
+# Tasks are not scheduled in Google Calendar here; use POST /tasks/ for that.
+@router.post("/batch", response_model=TaskBatchOut, status_code=status.HTTP_201_CREATED)
+def create_tasks_batch(batch: TaskBatchCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    try:
+        ids = app.crud.task.create_tasks(db, batch.items, user_id=user.id)
+        return TaskBatchOut(ids=ids)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to create tasks: {str(e)}")
+
 
 @router.post("/{task_id}/complete", response_model=dict)
 def complete_task(
@@ -144,6 +150,7 @@ def complete_task(
         raise HTTPException(status_code=404, detail="Task not found")
     task.status = TaskStatus.completed
     task.completed_at = datetime.utcnow()  # Set completion timestamp
+    bump_data_version(db, user.id, TASKS)
     db.commit()
     db.refresh(task)
 
@@ -154,12 +161,13 @@ def complete_task(
         and task.due_date
         and task.recurrence_pattern
     ):
-        next_due_date = get_next_due_date(
+        next_due_date = next_occurrence(
             task.due_date,
             task.recurrence_pattern,
-            task.recurrence_interval or 1
+            task.recurrence_interval or 1,
+            task.recurrence_end_date,
         )
-        if next_due_date and (not task.recurrence_end_date or next_due_date <= task.recurrence_end_date):
+        if next_due_date:
             new_task = Task(
                 user_id=task.user_id,
                 title=task.title,
@@ -172,6 +180,7 @@ def complete_task(
                 recurrence_end_date=task.recurrence_end_date,
             )
             db.add(new_task)
+            bump_data_version(db, user.id, TASKS)
             db.commit()
             db.refresh(new_task)
             created_new = True
@@ -181,23 +190,48 @@ def complete_task(
         "created_next_occurrence": created_new
     }
 
-# Get tasks due by date/range and completed tasks within the same period
-@router.get("/due", response_model=List[TaskOut])
+def with_occurrences(rows, window_start: datetime, window_end: datetime) -> list[dict]:
+    # The rows plus the future occurrences of their pending recurring tasks inside the
+    # window (computed, not stored), ordered by due date; "occurrence" is 0 for stored rows
+    heads = {row.id: row for row in rows if row.is_recurring and row.status == TaskStatus.pending}
+    items = [{**row._asdict(), "occurrence": 0} for row in rows]
+    for occurrence in occurrences_between(heads.values(), window_start, window_end):
+        items.append({**heads[occurrence.task_id]._asdict(), "due_date": occurrence.due_date, "occurrence": occurrence.index})
+    items.sort(key=lambda item: (item["due_date"] is None, item["due_date"] or datetime.min))
+    return items
+
+
+# Get tasks due by date/range and completed tasks within the same period.
+# With expand_recurring=true, recurring tasks also appear once per upcoming occurrence in
+# the period (same id, "occurrence" >= 1) without those rows being created.
+@router.get("/due", response_model=List[TaskOccurrenceOut])
 def get_tasks_due(
+    request: Request,
     due_by: Optional[datetime] = Query(None),
     period: Optional[str] = Query(None, description="Filter period: today, week, month"),
+    expand_recurring: bool = Query(False),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
+    # Without a period, occurrences are expanded from the start of today (UTC) to due_by
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+    # 304 from the tasks version alone when the client's copy is current
+    headers = validator_headers(request, *get_data_stamp(db, user.id, TASKS), user.id, expand_recurring and today)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+
     try:
         # Then proceed with normal task fetching
-        query = db.query(Task).filter(Task.user_id == user.id)
+        query = db.query(*app.crud.task.TASK_OUT_COLUMNS).filter(Task.user_id == user.id)
+        window = (today, due_by) if due_by else None
         
         if due_by and period:
             # For completed tasks, filter by completion date within the period
             if period == "today":
                 start_of_day = datetime.combine(due_by.date(), datetime.min.time())
                 end_of_day = datetime.combine(due_by.date(), datetime.max.time())
+                window = (start_of_day, end_of_day)
                 query = query.filter(
                     or_(
                         # Pending tasks due by the end of day
@@ -213,6 +247,7 @@ def get_tasks_due(
                 start_of_week = due_by - timedelta(days=due_by.weekday())
                 start_of_week = datetime.combine(start_of_week.date(), datetime.min.time())
                 end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
+                window = (start_of_week, end_of_week)
                 
                 query = query.filter(
                     or_(
@@ -230,6 +265,7 @@ def get_tasks_due(
                 start_of_month = datetime.combine(start_of_month.date(), datetime.min.time())
                 end_of_month = due_by + timedelta(days=30)
                 end_of_month = datetime.combine(end_of_month.date(), datetime.max.time())
+                window = (start_of_month, end_of_month)
                 
                 query = query.filter(
                     or_(
@@ -245,7 +281,10 @@ def get_tasks_due(
             # Legacy behavior - only filter by due date
             query = query.filter(Task.due_date <= due_by)
         
-        return query.order_by(Task.due_date).all()
+        rows = query.order_by(Task.due_date).all()
+        if expand_recurring and window:
+            return ORJSONResponse(with_occurrences(rows, *window), headers=headers)
+        return rows_response(rows, headers=headers)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tasks: {str(e)}")
@@ -253,12 +292,83 @@ def get_tasks_due(
 
 
 
+MAX_CALENDAR_DAYS = 62  # a month view with the neighbouring weeks
+
+
+def _calendar_item(head, due_date: datetime, occurrence: int) -> dict:
+    # same shape as the JSON objects get_calendar_days builds in SQL
+    return {
+        "id": str(head.id), "title": head.title, "status": TaskStatus.pending.value, "due_date": due_date.isoformat(),
+        "preferred_time": head.preferred_time.isoformat() if head.preferred_time else None, "completed_at": None,
+        "is_recurring": True, "occurrence": occurrence,
+    }
+
+
+def _calendar_sort_key(item: dict) -> str:
+    return (item["completed_at"] if item["status"] == TaskStatus.completed.value else item["due_date"]) or ""
+
+
+# Tasks grouped into day buckets with per-day counts for the week/month views: one grouped
+# query, plus the upcoming occurrences of recurring tasks (not stored) added to their days.
+@router.get("/calendar", response_model=TaskCalendarOut)
+def get_task_calendar(
+    request: Request,
+    start: date = Query(...),
+    end: date = Query(...),
+    tz: str = Query("UTC", description="IANA timezone the days are counted in"),
+    expand_recurring: bool = Query(True),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    if end < start or (end - start).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"end must be on or after start, at most {MAX_CALENDAR_DAYS} days")
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    headers = validator_headers(request, *get_data_stamp(db, user.id, TASKS), user.id)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+
+    # the local days as a naive UTC window, like the stored times
+    window_start = datetime.combine(start, time.min, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    window_end = datetime.combine(end, time.max, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+
+    days = {
+        row.day.date(): {"day": row.day.date(), "pending": row.pending, "completed": row.completed, "tasks": row.tasks}
+        for row in app.crud.task.get_calendar_days(db, user.id, window_start, window_end, tz)
+    }
+
+    if expand_recurring:
+        heads = {row.id: row for row in app.crud.task.get_recurring_heads(db, user.id, window_end)}
+        touched = set()
+        for occurrence in occurrences_between(heads.values(), window_start, window_end):
+            day = occurrence.due_date.replace(tzinfo=timezone.utc).astimezone(zone).date()
+            bucket = days.setdefault(day, {"day": day, "pending": 0, "completed": 0, "tasks": []})
+            bucket["pending"] += 1
+            bucket["tasks"].append(_calendar_item(heads[occurrence.task_id], occurrence.due_date, occurrence.index))
+            touched.add(day)
+        for day in touched:
+            days[day]["tasks"].sort(key=_calendar_sort_key)
+
+    buckets = [days[day] for day in sorted(days)]
+    return ORJSONResponse({
+        "start": start,
+        "end": end,
+        "timezone": tz,
+        "pending": sum(bucket["pending"] for bucket in buckets),
+        "completed": sum(bucket["completed"] for bucket in buckets),
+        "days": buckets,
+    }, headers=headers)
+
+
 @router.get("/", response_model=List[TaskOut])
 def get_all_tasks(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
     """Get all tasks"""
     try:
         # Then return the tasks
-        return app.crud.task.get_all_tasks(db)
+        return rows_response(app.crud.task.get_all_tasks(db))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tasks: {str(e)}")
@@ -301,7 +411,7 @@ def create_task_from_text(
         current_datetime = datetime.now(est_tz)
         
         # Analyze the user input with current datetime context
-        analysis = analyze_task_input(user_input, current_datetime)
+        analysis = analyze_task_input(user_input, current_datetime, user_id=user.id)
         
         # Create task data
         task_data = TaskCreate(
@@ -432,15 +542,7 @@ def create_task_from_text(
         # Create recurrence rule if needed
         recurrence_rule = None
         if analysis["is_recurring"] and analysis["recurrence_pattern"]:
-            if analysis["recurrence_pattern"] == "daily":
-                recurrence_rule = f"RRULE:FREQ=DAILY;INTERVAL={analysis['recurrence_interval'] or 1}"
-                if analysis["recurrence_end_date"]:
-                    end_date = datetime.fromisoformat(analysis["recurrence_end_date"])
-                    recurrence_rule += f";UNTIL={end_date.strftime('%Y%m%d')}"
-            elif analysis["recurrence_pattern"] == "weekly":
-                recurrence_rule = f"RRULE:FREQ=WEEKLY;INTERVAL={analysis['recurrence_interval'] or 1}"
-            elif analysis["recurrence_pattern"] == "monthly":
-                recurrence_rule = f"RRULE:FREQ=MONTHLY;INTERVAL={analysis['recurrence_interval'] or 1}"
+            recurrence_rule = to_rrule(task.recurrence_pattern, task.recurrence_interval, task.recurrence_end_date)
         
         # Create calendar event using task title and description
         calendar_event = calendar_service.create_event(
@@ -462,15 +564,156 @@ def create_task_from_text(
             task.calendar_event_id = calendar_event['id']
             
             # Save the updated task
+            bump_data_version(db, user.id, TASKS)
             db.commit()
             db.refresh(task)
         
         return task
         
+    except LLMBudgetExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create task: {str(e)}")
 
 
+MAX_BRAIN_DUMP_LINES = 50
+_BULLET = re.compile(r"^\s*(?:[-*\u2022]|\[[ xX]?\]|\d+[.)])\s*")
+
+
+def split_brain_dump(text: str) -> list[str]:
+    """One task per non-empty line, list bullets and numbering stripped."""
+    lines = (_BULLET.sub("", line).strip() for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def _slot_request(analysis: dict, now: datetime, local_tz) -> SlotRequest:
+    # Same reading of due_date / preferred_time / timezone as create_task_from_text
+    try:
+        return _parse_slot_request(analysis, now, local_tz)
+    except (KeyError, TypeError, ValueError):
+        # like _task_from_analysis: an unusable analysis still gets a slot, today
+        return SlotRequest(now.date(), 60)
+
+
+def _parse_slot_request(analysis: dict, now: datetime, local_tz) -> SlotRequest:
+    day = date.fromisoformat(analysis["due_date"][:10]) if analysis.get("due_date") else now.date()
+    duration = int(analysis.get("duration_minutes") or 60)
+    if not analysis.get("preferred_time"):
+        return SlotRequest(day, duration)
+    at = datetime.strptime(analysis["preferred_time"], "%H:%M").time()
+    try:
+        source_tz = pytz.timezone(analysis["timezone"]) if analysis.get("timezone") else local_tz
+    except pytz.UnknownTimeZoneError:
+        source_tz = local_tz
+    start = source_tz.localize(datetime.combine(day, at)).astimezone(local_tz)
+    if analysis.get("due_date") and start.date() != day:
+        # keep the converted time on the day the user asked for
+        start = local_tz.localize(datetime.combine(day, start.time()))
+    if not analysis.get("due_date") and start < now:
+        start = local_tz.localize(datetime.combine(start.date() + timedelta(days=1), start.time()))
+    return SlotRequest(day, duration, start)
+
+
+def _task_from_analysis(analysis: dict, line: str) -> TaskCreate:
+    try:
+        return TaskCreate(
+            title=analysis["title"],
+            description=analysis["description"],
+            due_date=datetime.fromisoformat(analysis["due_date"]) if analysis["due_date"] else None,
+            preferred_time=datetime.strptime(analysis["preferred_time"], "%H:%M").time() if analysis["preferred_time"] else None,
+            is_recurring=analysis["is_recurring"],
+            recurrence_pattern=analysis["recurrence_pattern"],
+            recurrence_interval=analysis["recurrence_interval"],
+            recurrence_end_date=datetime.fromisoformat(analysis["recurrence_end_date"]) if analysis["recurrence_end_date"] else None,
+        )
+    except (KeyError, TypeError, ValueError):
+        # an unusable analysis still gives the user their task
+        return TaskCreate(title=line)
+
+
+# Brain dump: several tasks from one multi-line text. Lines are parsed concurrently,
+# the calendar is read once and all slots are planned together (so the new tasks don't
+# collide with each other), events go in one batched Calendar request and the tasks in
+# one INSERT. Calendar scheduling is best effort: if it fails the tasks are still created.
+@router.post("/create-from-text/batch", response_model=List[TaskOut], status_code=status.HTTP_201_CREATED)
+def create_tasks_from_text(
+    user_input: str = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """Create one task per line of natural language input"""
+    lines = split_brain_dump(user_input)
+    if not lines:
+        raise HTTPException(status_code=400, detail="No tasks found in input")
+    if len(lines) > MAX_BRAIN_DUMP_LINES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BRAIN_DUMP_LINES} tasks per request")
+    # fail fast instead of after a batch of half-charged calls
+    check_llm_budget(user.id)
+
+    calendar_service = None
+    event_ids: list = []
+    try:
+        local_tz = pytz.timezone('America/New_York')
+        now = datetime.now(local_tz)
+        analyses = analyze_task_inputs(lines, now, user_id=user.id)
+        tasks = [_task_from_analysis(analysis, line) for analysis, line in zip(analyses, lines)]
+
+        event_ids = [None] * len(tasks)
+        starts: list = [None] * len(tasks)
+        try:
+            requests = [_slot_request(analysis, now, local_tz) for analysis in analyses]
+            calendar_service = GoogleCalendarService()
+            first_day = min(min(r.day for r in requests), now.date())
+            last_day = max(r.start.date() if r.start else r.day for r in requests) + timedelta(days=MAX_DAYS_AHEAD + 1)
+            busy = calendar_service.list_busy(
+                local_tz.localize(datetime.combine(first_day, time.min)),
+                local_tz.localize(datetime.combine(last_day, time.min)),
+            )
+            starts = plan_slots(requests, busy, now, local_tz)
+            events = calendar_service.create_events([
+                {
+                    "title": task.title,
+                    "description": task.description or "",
+                    "start_time": start,
+                    "duration_minutes": request.duration_minutes,
+                    "recurring": task.is_recurring,
+                    "recurrence_rule": to_rrule(task.recurrence_pattern, task.recurrence_interval, task.recurrence_end_date)
+                    if task.is_recurring else None,
+                }
+                for task, request, start in zip(tasks, requests, starts)
+            ])
+            event_ids = [event.get("id") if event else None for event in events]
+        except Exception as e:
+            logger.warning("Calendar scheduling failed for brain dump: %s", e)
+
+        # A scheduled task takes its day and time from the event; an unscheduled one keeps
+        # what was parsed
+        rows = [
+            {
+                **task.model_dump(),
+                "due_date": datetime.combine(start.date(), time.min),
+                "preferred_time": start.time().replace(tzinfo=None),
+                "calendar_event_id": event_id,
+            } if event_id else {**task.model_dump(), "calendar_event_id": None}
+            for task, start, event_id in zip(tasks, starts, event_ids)
+        ]
+        created = app.crud.task.insert_tasks(db, rows, user_id=user.id)
+        return rows_response(created, status_code=status.HTTP_201_CREATED)
+
+    except LLMBudgetExceeded:
+        raise
+    except Exception as e:
+        db.rollback()
+        # no task was created, so take back the events made for them
+        created_events = [event_id for event_id in event_ids if event_id]
+        if created_events:
+            try:
+                calendar_service.delete_events(created_events)
+            except Exception as cleanup_error:
+                logger.warning("Failed to delete calendar events %s: %s", created_events, cleanup_error)
+        raise HTTPException(status_code=500, detail=f"Failed to create tasks: {str(e)}")
+
+
 @router.post("/reschedule-expired", response_model=List[dict])
 def reschedule_expired_calendar_events_endpoint(
     db: Session = Depends(get_db),
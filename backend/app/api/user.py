@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Dict, List, Any
 import app.crud.user
 from app.schemas.user import UserCreate, UserUpdate, UserOut
 from app.db.session import get_db
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta, timezone
 from app.models.mood import Mood
-from app.schemas.mood import MoodOut
+from app.crud.mood import MOOD_OUT_COLUMNS
 from app.models.symptom import Symptom
-from app.schemas.symptom import SymptomOut
-from app.core.security import create_access_token
+from app.crud.symptom import SYMPTOM_OUT_COLUMNS
+from app.core.responses import ORJSONResponse
+from app.core.conditional import validator_headers, is_not_modified, not_modified
+from app.crud.data_version import get_data_stamp, WELLNESS
+from app.core.security import create_access_token, PasswordHasherBusy
+from app.crud.rollup import get_daily_rollups
+from app.models.rollup import MOOD_COUNT_COLUMNS
+from app.schemas.rollup import DailyWellnessRollupOut
+from app.services.export import stream_export, EXPORT_FORMATS
+from app.core.dependencies import get_current_user
+from app.models.user import User
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -21,7 +31,10 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     existing_user = app.crud.user.get_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return app.crud.user.register_user(db, user)
+    try:
+        return app.crud.user.register_user(db, user)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
 # Login endpoint
 @router.post("/login")
@@ -30,7 +43,10 @@ def login(
     password: str = Body(...),
     db: Session = Depends(get_db)
 ):
-    user = app.crud.user.authenticate_user(db, email, password)
+    try:
+        user = app.crud.user.authenticate_user(db, email, password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     token = create_access_token({"user_id": str(user.id)})
@@ -70,24 +86,40 @@ def delete_user(user_id: UUID, db: Session = Depends(get_db)):
     return
 
 
+def get_period_start(period: str) -> datetime | None:
+    # "month" / "year" look back 30 / 365 days from the start of today (UTC), so the
+    # window only moves at midnight; "all" has no lower bound
+    today = datetime.combine(datetime.utcnow().date(), time.min)
+    if period == "month":
+        return today - timedelta(days=30)
+    elif period == "year":
+        return today - timedelta(days=365)
+    return None
+
+
 @router.get("/{user_id}/history", response_model=Dict[str, List[Any]])
 def get_user_history(
+    request: Request,
     user_id: UUID,
     period: str = Query("month", enum=["month", "year", "all"]),
     db: Session = Depends(get_db)
 ):
-    now = datetime.utcnow()
-    if period == "month":
-        start_date = now - timedelta(days=30)
-    elif period == "year":
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = None
-
-    # Query moods
-    mood_query = db.query(Mood).filter(Mood.user_id == user_id)
-    # Query symptoms
-    symptom_query = db.query(Symptom).filter(Symptom.user_id == user_id)
+    start_date = get_period_start(period)
+
+    # 304 from the wellness version alone when the client's copy is current. A windowed
+    # period also changes when the window moves, i.e. at midnight UTC.
+    version, updated_at = get_data_stamp(db, user_id, WELLNESS)
+    if start_date and updated_at:
+        window_moved_at = datetime.combine(datetime.utcnow().date(), time.min, tzinfo=timezone.utc)
+        updated_at = max(updated_at, window_moved_at)
+    headers = validator_headers(request, version, updated_at, start_date)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+
+    # Plain column rows encoded straight to JSON; no Mood/Symptom objects or per-row
+    # MoodOut/SymptomOut validation for a year of entries
+    mood_query = db.query(*MOOD_OUT_COLUMNS).filter(Mood.user_id == user_id)
+    symptom_query = db.query(*SYMPTOM_OUT_COLUMNS).filter(Symptom.user_id == user_id)
 
     if start_date:
         mood_query = mood_query.filter(Mood.created_at >= start_date)
@@ -96,11 +128,56 @@ def get_user_history(
     moods = mood_query.order_by(Mood.created_at).all()
     symptoms = symptom_query.order_by(Symptom.created_at).all()
 
-    # Use Pydantic models to serialize
-    moods_out = [MoodOut.model_validate(m) for m in moods]
-    symptoms_out = [SymptomOut.model_validate(s) for s in symptoms]
+    return ORJSONResponse({
+        "moods": [row._asdict() for row in moods],
+        "symptoms": [row._asdict() for row in symptoms],
+    }, headers=headers)
 
-    return {
-        "moods": moods_out,
-        "symptoms": symptoms_out
-    }
\ No newline at end of file
+
+# Per-day aggregates from daily_wellness_rollup: one row per day with entries,
+# so a year view reads at most ~365 rows instead of every mood/symptom.
+@router.get("/{user_id}/history/daily", response_model=List[DailyWellnessRollupOut])
+def get_user_daily_history(
+    user_id: UUID,
+    period: str = Query("month", enum=["month", "year", "all"]),
+    db: Session = Depends(get_db)
+):
+    start_date = get_period_start(period)
+
+    rollups = get_daily_rollups(db, user_id, start_date.date() if start_date else None)
+    return [
+        DailyWellnessRollupOut(
+            day=r.day,
+            mood_count=r.mood_count,
+            mood_type_counts={mood_type: getattr(r, column) for mood_type, column in MOOD_COUNT_COLUMNS.items()},
+            intensity_count=r.intensity_count,
+            intensity_sum=r.intensity_sum,
+            intensity_avg=round(r.intensity_sum / r.intensity_count, 2) if r.intensity_count else None,
+            intensity_min=r.intensity_min,
+            intensity_max=r.intensity_max,
+            symptom_count=r.symptom_count,
+        )
+        for r in rollups
+        if r.mood_count or r.symptom_count
+    ]
+
+
+# Streams moods, symptoms and tasks as NDJSON, CSV or Parquet in constant memory.
+# Only the user's own history.
+@router.get("/{user_id}/export")
+def export_user_history(
+    user_id: UUID,
+    format: str = Query("ndjson", enum=list(EXPORT_FORMATS)),
+    period: str = Query("all", enum=["month", "year", "all"]),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    if user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to export another user's history")
+    db.close()  # the export reads with its own session; don't hold this connection while streaming
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(user_id, format, get_period_start(period)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="wellness-history-{user_id}.{extension}"'},
+    )
@@ -0,0 +1,159 @@
+# Response compression (brotli or gzip, whichever the client prefers and we support).
+#
+# Pure ASGI like MetricsMiddleware: a complete body is compressed in one go when it is at
+# least COMPRESSION_MIN_SIZE bytes; a streamed body (exports) is compressed chunk by chunk
+# with a flush after each chunk, so the client still receives data as it is produced.
+# Event streams and formats that are already compressed pass through untouched.
+#
+# Brotli needs the optional `brotli` package; without it only gzip is offered.
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# 4 is a good trade-off for dynamic responses; 10-11 are only worth it for static assets
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+EXCLUDED_MEDIA_TYPES = (
+    "text/event-stream",  # SSE: per-event latency matters more than bytes
+    "application/vnd.apache.parquet",
+    "application/zip", "application/gzip", "application/pdf",
+    "image/", "audio/", "video/",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Highest-q encoding we support from an Accept-Encoding header; br wins ties."""
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    weights = []
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        weights.append((name, q))
+    # "*" only stands for codings not listed by name (RFC 9110 12.5.3), so "gzip;q=0, *" excludes gzip
+    listed = {name for name, _ in weights}
+    best, best_q = None, 0.0
+    for name, q in weights:
+        if name == "*":
+            candidates = tuple(encoding for encoding in supported if encoding not in listed)
+        else:
+            candidates = (name,) if name in supported else ()
+        for candidate in candidates:
+            if q > best_q or (q == best_q and q > 0 and candidate == "br"):
+                best, best_q = candidate, q
+    return best if best_q > 0 else None
+
+
+def make_encoder(encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+    return BrotliEncoder(brotli_quality) if encoding == "br" else GzipEncoder(gzip_level)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = next(
+            (value.decode("latin-1") for key, value in scope["headers"] if key == b"accept-encoding"), ""
+        )
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None      # held http.response.start until we know whether to compress
+        encoder = None    # set once compression has started
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = {key.lower(): value for key, value in message.get("headers", [])}
+                media_type = headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or media_type.startswith(EXCLUDED_MEDIA_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # small complete body: not worth the CPU
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = make_encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    compressed = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send({**start, "headers": headers})
+
+            if more_body:
+                await send({"type": "http.response.body", "body": encoder.compress(body, flush=True), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.compress(body) + encoder.finish()})
+
+        await self.app(scope, receive, send_wrapper)
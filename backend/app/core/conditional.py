@@ -0,0 +1,55 @@
+# Conditional GET from data version stamps.
+#
+# Read endpoints look up the (version, updated_at) stamp the CRUD layer bumps on every
+# change (app.crud.data_version) and derive ETag / Last-Modified from it. When the
+# client's If-None-Match / If-Modified-Since still match, they answer 304 before running
+# the main query; otherwise the same headers go on the full response.
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients may keep the response but must revalidate before every use; never in shared caches
+CACHE_CONTROL = "private, no-cache"
+
+
+def validator_headers(request: Request, version: int, updated_at: Optional[datetime], *key) -> dict:
+    """ETag for this URL at this version (`key` adds anything else the response depends
+    on, e.g. the user or a moving date window) plus Last-Modified (UTC) when known."""
+    tag = hashlib.sha1(
+        "|".join(map(str, (request.url.path, request.url.query, version, *key))).encode()
+    ).hexdigest()[:20]
+    headers = {"ETag": f'W/"{tag}"', "Cache-Control": CACHE_CONTROL}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: W/"x" and "x" match
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, headers: dict) -> bool:
+    # If-None-Match wins when both are sent (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers["ETag"])
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
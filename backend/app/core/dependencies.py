@@ -1,9 +1,11 @@
 # backend/app/core/dependencies.py
+import time
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from jose import jwt, JWTError
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.cache import TTLCache
 from app.db.session import get_db
 from app.models.user import User
 
@@ -11,18 +13,55 @@ from app.models.user import User
 # Read the JWT token from the request (usually from the Authorization header).
 # Decode the token to get the user_id.
 # Fetch the user from the database and return the user object.
+#
+# Both steps are cached per process: decoded tokens until they expire (at most 10 min),
+# and the user's columns for 60s. crud/user.py drops a user's entry on update/delete;
+# other workers may serve the old row until the TTL runs out.
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+token_cache = TTLCache(maxsize=10_000, ttl=600)  # token -> user_id
+user_cache = TTLCache(maxsize=10_000, ttl=60)    # user_id -> dict of User columns
+
+USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def invalidate_user(user_id) -> None:
+    user_cache.pop(str(user_id))
+
+
+def _decode_user_id(token: str) -> str:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user_id = payload.get("user_id")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(token, user_id, ttl=expires_in)
+    return user_id
+
+
+def get_user_from_token(token: str, db: Session) -> User:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.id == user_id).first()
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
+        user_id = _decode_user_id(token)
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    columns = user_cache.get(str(user_id))
+    if columns is not None:
+        # Attach a copy to this session without a SELECT; relationships still lazy-load
+        user = User(**columns)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    user_cache.set(str(user_id), {key: getattr(user, key) for key in USER_COLUMNS})
+    return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return get_user_from_token(token, db)
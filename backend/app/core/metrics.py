@@ -0,0 +1,139 @@
+# Prometheus metrics for the API: per-route request counts/latency/in-flight/errors,
+# per-request SQL query counts/time, SQLAlchemy pool and password-hasher pool gauges, and
+# LLM call metrics.
+# Exposed at GET /metrics (app/api/metrics.py).
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from starlette.routing import Match
+
+from app.db.session import engine
+from app.db.query_stats import track_queries, report_request
+from app.core.security import password_pool
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency (until the response is fully sent)",
+    ["method", "route"], buckets=REQUEST_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method", "route"]
+)
+http_request_exceptions_total = Counter(
+    "http_request_exceptions_total", "Requests that raised an unhandled exception", ["method", "route", "exception"]
+)
+
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL statements per request", ["method", "route"], buckets=REQUEST_BUCKETS
+)
+db_slow_queries_total = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_SECONDS", ["method", "route"])
+db_repeated_statements_total = Counter(
+    "db_repeated_statements_total", "Statements repeated N_PLUS_ONE_THRESHOLD+ times in one request (likely N+1)",
+    ["method", "route"],
+)
+
+llm_calls_total = Counter("llm_calls_total", "LLM calls", ["call_site", "model", "outcome"])
+llm_call_duration_seconds = Histogram(
+    "llm_call_duration_seconds", "LLM call latency", ["call_site", "model"], buckets=LLM_BUCKETS
+)
+llm_tokens_total = Counter("llm_tokens_total", "LLM tokens used", ["call_site", "model", "kind"])
+llm_cost_usd_total = Counter("llm_cost_usd_total", "Estimated LLM spend in USD", ["call_site", "model"])
+llm_retries_total = Counter("llm_retries_total", "LLM calls retried after a transient error", ["call_site"])
+llm_budget_rejections_total = Counter(
+    "llm_budget_rejections_total", "LLM calls refused because the user's daily token budget was used up"
+)
+llm_parse_failures_total = Counter(
+    "llm_parse_failures_total", "Structured LLM responses that did not validate against their output schema", ["call_site"]
+)
+llm_cache_lookups_total = Counter(
+    "llm_cache_lookups_total", "Lookups in caches of LLM results (memory / db hit, miss, bypass)", ["call_site", "result"]
+)
+
+
+class PoolCollector:
+    # Read on every scrape instead of being updated on every checkout
+    def collect(self):
+        pool = engine.pool
+        db_pool = GaugeMetricFamily("db_pool_connections", "SQLAlchemy pool connections", labels=["state"])
+        for state, read in (("size", pool.size), ("checked_in", pool.checkedin),
+                            ("checked_out", pool.checkedout), ("overflow", pool.overflow)):
+            try:
+                db_pool.add_metric([state], read())
+            except (AttributeError, NotImplementedError):
+                continue
+        yield db_pool
+
+        stats = password_pool.snapshot()
+        hasher = GaugeMetricFamily("password_hasher", "Password hashing pool", labels=["stat"])
+        for key, value in stats.items():
+            hasher.add_metric([key], value)
+        yield hasher
+
+
+REGISTRY.register(PoolCollector())
+
+
+def _route_template(app, scope) -> str:
+    # Label by route template (/tasks/{task_id}), never by raw path, to bound cardinality
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no response buffering), so streaming responses such as SSE and
+    exports are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope["app"], scope) if "app" in scope else scope["path"]
+        if route == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                http_request_exceptions_total.labels(method, route, type(e).__name__).inc()
+                raise
+            finally:
+                in_flight.dec()
+                http_request_duration_seconds.labels(method, route).observe(time.perf_counter() - start)
+                http_requests_total.labels(method, route, str(status["code"])).inc()
+                db_queries_per_request.labels(method, route).observe(queries.count)
+                db_time_per_request_seconds.labels(method, route).observe(queries.total_time)
+                db_slow_queries_total.labels(method, route).inc(queries.slow)
+                db_repeated_statements_total.labels(method, route).inc(len(queries.repeated()))
+                report_request(queries, method, route)
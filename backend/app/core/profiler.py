@@ -0,0 +1,160 @@
+# On-demand sampling profiler for the running API workers.
+#
+# Nothing runs until a capture is requested: a background thread then snapshots every
+# thread's Python stack (sys._current_frames) each interval for N seconds and the counts
+# are returned as a speedscope file (https://www.speedscope.app) or as collapsed stacks
+# for flamegraph.pl. Idle overhead is zero; while capturing it is one stack walk per
+# thread per interval.
+#
+# Two ways to trigger it, both opt-in:
+#   - GET /debug/profile?seconds=10 with the X-Profiler-Token header (PROFILER_TOKEN set),
+#     profiling the worker that serves the request
+#   - kill -USR2 <worker pids> (PROFILE_DIR set): every signalled worker writes
+#     PROFILE_DIR/profile-<pid>-<time>.speedscope.json after PROFILE_SIGNAL_SECONDS
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("profiler")
+
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_SIGNAL_SECONDS = float(os.getenv("PROFILE_SIGNAL_SECONDS", "10"))
+
+# Leaf frames of threads that are parked rather than running Python code (threadpool
+# workers waiting for a job, the event loop waiting in select). mode="cpu" drops them;
+# it's an approximation, as time blocked inside C calls (sockets, sleep) can't be seen.
+IDLE_FRAMES = {("wait", "threading.py"), ("select", "selectors.py"), ("_worker", "thread.py"), ("get", "queue.py")}
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def capture(self, seconds: float, interval: float = 0.005, mode: str = "wall") -> dict:
+        """Samples all threads for `seconds`; returns {(thread name, stack): count} plus timing."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being captured")
+        try:
+            return self._sample(seconds, interval, mode)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float, mode: str) -> dict:
+        own = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                leaf_name, leaf_file, _ = stack[0]
+                if mode == "cpu" and (leaf_name, os.path.basename(leaf_file)) in IDLE_FRAMES:
+                    continue
+                stack.reverse()  # root first
+                stacks[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+            samples += 1
+            time.sleep(interval)
+        return {
+            "stacks": stacks,
+            "samples": samples,
+            "interval": interval,
+            "duration": time.perf_counter() - started,
+            "mode": mode,
+        }
+
+
+profiler = SamplingProfiler()
+
+
+def _frame_label(frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(profile: dict) -> str:
+    # "thread;root;...;leaf count" lines, the input format of flamegraph.pl / speedscope
+    return "".join(
+        f"{thread};{';'.join(_frame_label(frame) for frame in stack)} {count}\n"
+        for (thread, stack), count in profile["stacks"].most_common()
+    )
+
+
+def to_speedscope(profile: dict, name: str = "pa-app") -> dict:
+    frames, frame_index = [], {}
+    per_thread = {}
+    weight = profile["interval"] * 1000
+    for (thread, stack), count in profile["stacks"].items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexes.append(frame_index[frame])
+        samples, weights = per_thread.setdefault(thread, ([], []))
+        samples.append(indexes)
+        weights.append(count * weight)
+
+    profiles = [
+        {
+            "type": "sampled",
+            "name": thread,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }
+        for thread, (samples, weights) in sorted(per_thread.items(), key=lambda item: -sum(item[1][1]))
+    ]
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"{name} pid {os.getpid()} ({profile['mode']}, {profile['duration']:.1f}s)",
+        "exporter": "app.core.profiler",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
+
+
+def _capture_to_file(seconds: float) -> None:
+    try:
+        profile = profiler.capture(seconds)
+    except ProfilerBusy:
+        logger.warning("Profile signal ignored, a capture is already running")
+        return
+    path = os.path.join(PROFILE_DIR, f"profile-{os.getpid()}-{int(time.time())}.speedscope.json")
+    with open(path, "w") as f:
+        json.dump(to_speedscope(profile), f)
+    logger.info("Wrote %s (%d samples)", path, profile["samples"])
+
+
+def install_signal_handler() -> None:
+    """SIGUSR2 starts a background capture written to PROFILE_DIR (no-op if it's unset)."""
+    if not PROFILE_DIR or not hasattr(signal, "SIGUSR2"):
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    def handler(signum, frame):
+        threading.Thread(target=_capture_to_file, args=(PROFILE_SIGNAL_SECONDS,), name="profiler", daemon=True).start()
+
+    signal.signal(signal.SIGUSR2, handler)
@@ -0,0 +1,33 @@
+# JSON responses encoded with orjson.
+#
+# ORJSONResponse is the app's default response class. rows_response() is the fast path
+# for large lists: it takes Row tuples from a select of plain columns (see
+# schema_columns) and encodes them straight to JSON, skipping ORM hydration, per-row
+# model_validate and jsonable_encoder. The output matches the Pydantic *Out schemas
+# (enums as values, UTC as "Z", times as "HH:MM:SS").
+from typing import Any, Iterable, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def schema_columns(model, schema: type[BaseModel]) -> list:
+    """The model's columns for each field of an *Out schema, in schema order."""
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def rows_response(rows: Iterable, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(
+        orjson.dumps([row._asdict() for row in rows], option=ORJSON_OPTIONS),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
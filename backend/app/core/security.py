@@ -1,21 +1,119 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 
 # user authentication, password management, and JWT (JSON Web Token) generation
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# min_rounds makes hashes with a lower work factor "need update", so they are rehashed on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 SECRET_KEY = "your-secret-key" # used in the create_access_token function to sign and encode JWT tokens
 ALGORITHM = "HS256" # algorithm used to sign and verify JWT tokens
 
-def hash_password(password: str) -> str: 
+
+# bcrypt is deliberately slow (~250ms per call), so it runs on its own process pool instead
+# of the request threadpool. At most max_pending calls may be queued or running; beyond that
+# PasswordHasherBusy is raised immediately (the API answers 503), so a login storm can't tie
+# up every request thread.
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _pool_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _pool_verify_and_update(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.stats = {"pending": 0, "completed": 0, "rejected": 0, "errors": 0, "wait_seconds": 0.0, "run_seconds": 0.0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking the threaded server can copy held locks into the
+                # worker, and the bcrypt workers need no state from the parent anyway
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _record(self, **changes):
+        with self._lock:
+            for key, value in changes.items():
+                self.stats[key] += value
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._record(rejected=1)
+            raise PasswordHasherBusy("Too many password operations in progress")
+        self._record(pending=1)
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(_timed, fn, *args)
+            result, run_seconds = future.result()
+            total = time.perf_counter() - submitted
+            self._record(completed=1, run_seconds=run_seconds, wait_seconds=max(total - run_seconds, 0.0))
+            return result
+        except Exception:
+            self._record(errors=1)
+            raise
+        finally:
+            self._record(pending=-1)
+            self._slots.release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_pending": self.max_pending, **self.stats}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+_workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+password_pool = PasswordHasherPool(
+    workers=_workers,
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(_workers * 4))),
+)
+
+
+def hash_password(password: str) -> str: 
+    return password_pool.run(_pool_hash, password)
 # hashes user passwords using bcrypt 
 
 def verify_password(plain_password, hashed_password): 
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = verify_and_update_password(plain_password, hashed_password)
+    return valid
 # Verifies a plain text password against a stored hash
 
+def verify_and_update_password(plain_password, hashed_password):
+    return password_pool.run(_pool_verify_and_update, plain_password, hashed_password)
+# Returns (valid, new_hash); new_hash is set when the stored hash uses an outdated work factor
+
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=72)):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
@@ -0,0 +1,103 @@
+# OpenTelemetry tracing: one trace per request with child spans for SQL statements, LLM
+# calls, the vector store, Google Calendar calls, PDF ingestion stages and the evaluation
+# graph nodes, so a request's critical path is visible.
+#
+# Off unless OTEL_TRACES_EXPORTER is set:
+#   otlp     OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (default http://localhost:4318)
+#   file     one JSON span per line appended to TRACE_FILE
+#   console  spans printed to stdout
+# Without a provider the tracer below is a no-op, so the spans cost next to nothing.
+import functools
+import inspect
+import os
+
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+
+TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "pa-app-backend")
+
+tracer = trace.get_tracer("pa-app")
+
+
+def traced(name: str):
+    """Runs the decorated function inside a span called `name` (exceptions are recorded)."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _trace_sql(engine) -> None:
+    # A client span per statement, parented to whatever span is current (request, LLM, ...)
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_span(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span(
+            f"db.{statement.split(None, 1)[0].lower()}" if statement else "db.query",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": engine.dialect.name, "db.statement": statement, "db.executemany": executemany},
+        )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_span(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def fail_span(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def setup_tracing(app, engine) -> None:
+    if TRACES_EXPORTER == "none":
+        return
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    if TRACES_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif TRACES_EXPORTER == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(TRACE_FILE, "a", buffering=1),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    # /metrics scrapes and long-lived SSE streams would only add noise
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics,events/stream")
+    _trace_sql(engine)
+
+
+def shutdown_tracing() -> None:
+    # flushes spans still queued in the batch processor
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
@@ -0,0 +1,62 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID
+from datetime import datetime, timezone
+from app.models.data_version import DataVersion, SharedDataVersion
+
+# resource names
+WELLNESS = "wellness"  # moods + symptoms
+TASKS = "tasks"
+RAG_FILES = "rag_files"  # shared: the embedded_files list
+
+
+def get_data_version(db: Session, user_id: UUID, resource: str) -> int:
+    version = db.query(DataVersion.version).filter(
+        DataVersion.user_id == user_id,
+        DataVersion.resource == resource
+    ).scalar()
+    return version or 0
+
+
+def _stamp(row) -> tuple[int, datetime | None]:
+    # (version, updated_at in UTC); (0, None) until the resource first changes
+    if row is None:
+        return 0, None
+    updated_at = row.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return row.version, updated_at.astimezone(timezone.utc)
+
+
+def get_data_stamp(db: Session, user_id: UUID, resource: str) -> tuple[int, datetime | None]:
+    return _stamp(db.query(DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.user_id == user_id,
+        DataVersion.resource == resource
+    ).first())
+
+
+def bump_data_version(db: Session, user_id: UUID, resource: str) -> None:
+    # Upsert inside the caller's transaction; committed together with the data change
+    now = datetime.now(timezone.utc)
+    stmt = insert(DataVersion).values(user_id=user_id, resource=resource, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.user_id, DataVersion.resource],
+        set_={"version": DataVersion.version + 1, "updated_at": now},
+    )
+    db.execute(stmt)
+
+
+def get_shared_data_stamp(db: Session, resource: str) -> tuple[int, datetime | None]:
+    return _stamp(db.query(SharedDataVersion.version, SharedDataVersion.updated_at).filter(
+        SharedDataVersion.resource == resource
+    ).first())
+
+
+def bump_shared_data_version(db: Session, resource: str) -> None:
+    now = datetime.now(timezone.utc)
+    stmt = insert(SharedDataVersion).values(resource=resource, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SharedDataVersion.resource],
+        set_={"version": SharedDataVersion.version + 1, "updated_at": now},
+    )
+    db.execute(stmt)
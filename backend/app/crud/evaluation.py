@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID
+from datetime import date, datetime, timezone
+from app.models.evaluation import EvaluationCache
+
+
+def get_cached_evaluation(db: Session, user_id: UUID, start_date: date, end_date: date, data_version: int) -> dict | None:
+    summary = db.query(EvaluationCache.summary).filter(
+        EvaluationCache.user_id == user_id,
+        EvaluationCache.start_date == start_date,
+        EvaluationCache.end_date == end_date,
+        EvaluationCache.data_version == data_version
+    ).scalar()
+    return summary
+
+
+def save_evaluation(db: Session, user_id: UUID, start_date: date, end_date: date, data_version: int, summary: dict) -> None:
+    now = datetime.now(timezone.utc)
+    stmt = insert(EvaluationCache).values(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        data_version=data_version,
+        summary=summary,
+        created_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_evaluation_cache_user_range",
+        set_={"data_version": data_version, "summary": summary, "created_at": now},
+    )
+    db.execute(stmt)
+    db.commit()
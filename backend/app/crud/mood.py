@@ -1,8 +1,12 @@
+from sqlalchemy import insert, select, Row
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 from app.models.mood import Mood
-from app.schemas.mood import MoodCreate, MoodUpdate
+from app.schemas.mood import MoodCreate, MoodUpdate, MoodOut
+from app.core.responses import schema_columns
 from datetime import datetime, timezone
+from app.crud.data_version import bump_data_version, WELLNESS
+from app.crud.rollup import add_mood_to_rollup, add_moods_to_rollup, refresh_mood_rollup, rollup_day
 
 
 def create_mood(db: Session, mood: MoodCreate, user_id: UUID) -> Mood:
@@ -14,13 +18,42 @@ def create_mood(db: Session, mood: MoodCreate, user_id: UUID) -> Mood:
         created_at=mood.date or datetime.now(timezone.utc)
     )
     db.add(db_mood)
+    add_mood_to_rollup(db, db_mood)
+    bump_data_version(db, user_id, WELLNESS)
     db.commit()
     db.refresh(db_mood)
     return db_mood
 
 
-def get_all_moods(db: Session) -> list[Mood]:
-    return db.query(Mood).all()
+def create_moods(db: Session, moods: list[MoodCreate], user_id: UUID) -> list[UUID]:
+    # One multi-row INSERT for the whole batch; ids are generated here so they can be
+    # returned in input order without reloading the rows
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "description": mood.description,
+            "mood_type": mood.mood_type,
+            "intensity": mood.intensity,
+            "created_at": mood.date or now,
+        }
+        for mood in moods
+    ]
+    db.execute(insert(Mood), rows)
+    add_moods_to_rollup(db, user_id, rows)
+    bump_data_version(db, user_id, WELLNESS)
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+# MoodOut's fields as plain columns: list reads return Row tuples for rows_response()
+# instead of hydrated Mood objects
+MOOD_OUT_COLUMNS = schema_columns(Mood, MoodOut)
+
+
+def get_all_moods(db: Session) -> list[Row]:
+    return db.execute(select(*MOOD_OUT_COLUMNS)).all()
 
 
 def get_mood(db: Session, mood_id: UUID) -> Mood | None:
@@ -37,6 +70,8 @@ def update_mood(db: Session, mood_id: UUID, mood_update: MoodUpdate) -> Mood | N
         return None
     for field, value in mood_update.model_dump(exclude_unset=True).items():
         setattr(db_mood, field, value)
+    refresh_mood_rollup(db, db_mood.user_id, rollup_day(db_mood.created_at))
+    bump_data_version(db, db_mood.user_id, WELLNESS)
     db.commit()
     db.refresh(db_mood)
     return db_mood
@@ -46,6 +81,8 @@ def delete_mood(db: Session, mood_id: UUID) -> bool:
     db_mood = get_mood(db, mood_id)
     if db_mood:
         db.delete(db_mood)
+        refresh_mood_rollup(db, db_mood.user_id, rollup_day(db_mood.created_at))
+        bump_data_version(db, db_mood.user_id, WELLNESS)
         db.commit()
         return True
     return False
@@ -1,7 +1,9 @@
+from sqlalchemy import select, Row
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.models.reminder import Reminder
-from app.schemas.reminder import ReminderCreate
+from app.schemas.reminder import ReminderCreate, ReminderOut
+from app.core.responses import schema_columns
 from datetime import datetime
 
 def create_reminder(db: Session, reminder: ReminderCreate, user_id: UUID) -> Reminder:
@@ -11,11 +13,15 @@ def create_reminder(db: Session, reminder: ReminderCreate, user_id: UUID) -> Rem
     db.refresh(db_reminder)
     return db_reminder
 
-def get_reminders_due_by_date(db: Session, user_id: UUID, due_by: datetime) -> list[Reminder]:
-    return db.query(Reminder).filter(
-        Reminder.user_id == user_id,
-        Reminder.remind_at <= due_by
-    ).order_by(Reminder.remind_at).all()
+# ReminderOut's fields as plain columns, for list reads serialized with rows_response()
+REMINDER_OUT_COLUMNS = schema_columns(Reminder, ReminderOut)
+
+def get_reminders_due_by_date(db: Session, user_id: UUID, due_by: datetime) -> list[Row]:
+    return db.execute(
+        select(*REMINDER_OUT_COLUMNS)
+        .where(Reminder.user_id == user_id, Reminder.remind_at <= due_by)
+        .order_by(Reminder.remind_at)
+    ).all()
 
 def delete_reminder(db: Session, reminder_id: UUID) -> None:
     db_reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
@@ -0,0 +1,129 @@
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID
+from datetime import date, datetime, timezone
+from app.models.rollup import DailyWellnessRollup, MOOD_COUNT_COLUMNS
+from app.models.mood import Mood
+
+# Keeps daily_wellness_rollup in step with moods/symptoms. All functions run inside
+# the caller's transaction and are committed together with the data change.
+
+rollup_table = DailyWellnessRollup.__table__
+MOOD_COLUMNS = ["mood_count", *MOOD_COUNT_COLUMNS.values(), "intensity_count", "intensity_sum", "intensity_min", "intensity_max"]
+
+
+def rollup_day(value: datetime) -> date:
+    # Rollups are bucketed by UTC day; naive datetimes are taken as UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _empty_row(user_id: UUID, day: date) -> dict:
+    row = {column: 0 for column in MOOD_COLUMNS}
+    row.update(user_id=user_id, day=day, intensity_min=None, intensity_max=None, symptom_count=0)
+    return row
+
+
+def add_moods_to_rollup(db: Session, user_id: UUID, moods: list[dict]) -> None:
+    """
+    Increments the daily counters for newly created moods. Each mood is a dict with
+    created_at, mood_type and intensity; the batch is pre-aggregated per day so a
+    single multi-row upsert covers it.
+    """
+    rows = {}
+    for mood in moods:
+        day = rollup_day(mood["created_at"])
+        row = rows.setdefault(day, _empty_row(user_id, day))
+        row["mood_count"] += 1
+        if mood.get("mood_type"):
+            row[MOOD_COUNT_COLUMNS[mood["mood_type"].value]] += 1
+        intensity = mood.get("intensity")
+        if intensity is not None:
+            row["intensity_count"] += 1
+            row["intensity_sum"] += intensity
+            row["intensity_min"] = intensity if row["intensity_min"] is None else min(row["intensity_min"], intensity)
+            row["intensity_max"] = intensity if row["intensity_max"] is None else max(row["intensity_max"], intensity)
+    if not rows:
+        return
+
+    stmt = insert(rollup_table).values(list(rows.values()))
+    set_ = {column: rollup_table.c[column] + stmt.excluded[column] for column in MOOD_COLUMNS}
+    # LEAST/GREATEST ignore NULLs, so days without intensities leave min/max untouched
+    set_["intensity_min"] = func.least(rollup_table.c.intensity_min, stmt.excluded.intensity_min)
+    set_["intensity_max"] = func.greatest(rollup_table.c.intensity_max, stmt.excluded.intensity_max)
+    db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=set_))
+
+
+def add_mood_to_rollup(db: Session, mood: Mood) -> None:
+    """Increments the day's counters for a newly created mood."""
+    add_moods_to_rollup(db, mood.user_id, [{
+        "created_at": mood.created_at,
+        "mood_type": mood.mood_type,
+        "intensity": mood.intensity,
+    }])
+
+
+def refresh_mood_rollup(db: Session, user_id: UUID, day: date) -> None:
+    """Recomputes the day's mood columns from the moods table (after an update or delete)."""
+    db.flush()
+    mood_day = func.date(func.timezone("UTC", Mood.created_at))
+    rows = db.query(
+        Mood.mood_type,
+        func.count(Mood.id),
+        func.count(Mood.intensity),
+        func.coalesce(func.sum(Mood.intensity), 0),
+        func.min(Mood.intensity),
+        func.max(Mood.intensity),
+    ).filter(
+        Mood.user_id == user_id,
+        mood_day == day
+    ).group_by(Mood.mood_type).all()
+
+    row = _empty_row(user_id, day)
+    for mood_type, count, n_intensity, s_intensity, lo, hi in rows:
+        row["mood_count"] += count
+        if mood_type:
+            row[MOOD_COUNT_COLUMNS[mood_type.value]] += count
+        row["intensity_count"] += n_intensity
+        row["intensity_sum"] += int(s_intensity)
+        if lo is not None:
+            row["intensity_min"] = lo if row["intensity_min"] is None else min(row["intensity_min"], lo)
+        if hi is not None:
+            row["intensity_max"] = hi if row["intensity_max"] is None else max(row["intensity_max"], hi)
+
+    stmt = insert(rollup_table).values(**row)
+    set_ = {column: stmt.excluded[column] for column in MOOD_COLUMNS}
+    db.execute(stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=set_))
+
+
+def add_symptoms_to_rollup(db: Session, user_id: UUID, day_counts: dict[date, int]) -> None:
+    """Adds newly created symptoms to the daily counts ({day: number of new symptoms})."""
+    if not day_counts:
+        return
+    rows = []
+    for day, count in day_counts.items():
+        row = _empty_row(user_id, day)
+        row["symptom_count"] = count
+        rows.append(row)
+    stmt = insert(rollup_table).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={"symptom_count": rollup_table.c.symptom_count + stmt.excluded.symptom_count},
+    ))
+
+
+def remove_symptom_from_rollup(db: Session, user_id: UUID, day: date) -> None:
+    db.execute(
+        update(rollup_table)
+        .where(rollup_table.c.user_id == user_id, rollup_table.c.day == day)
+        .values(symptom_count=func.greatest(rollup_table.c.symptom_count - 1, 0))
+    )
+
+
+def get_daily_rollups(db: Session, user_id: UUID, start_date: date | None = None) -> list[DailyWellnessRollup]:
+    query = db.query(DailyWellnessRollup).filter(DailyWellnessRollup.user_id == user_id)
+    if start_date:
+        query = query.filter(DailyWellnessRollup.day >= start_date)
+    return query.order_by(DailyWellnessRollup.day).all()
@@ -1,8 +1,13 @@
+from sqlalchemy import insert, select, Row
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
+from collections import Counter
 from app.models.symptom import Symptom
-from app.schemas.symptom import SymptomCreate, SymptomUpdate
+from app.schemas.symptom import SymptomCreate, SymptomUpdate, SymptomOut
+from app.core.responses import schema_columns
 from datetime import datetime, timezone
+from app.crud.data_version import bump_data_version, WELLNESS
+from app.crud.rollup import add_symptoms_to_rollup, remove_symptom_from_rollup, rollup_day
 
 
 def create_symptom(db: Session, symptom: SymptomCreate, user_id: UUID) -> Symptom:
@@ -12,13 +17,38 @@ def create_symptom(db: Session, symptom: SymptomCreate, user_id: UUID) -> Sympto
         created_at=symptom.date or datetime.now(timezone.utc)
     )
     db.add(db_symptom)
+    add_symptoms_to_rollup(db, user_id, {rollup_day(db_symptom.created_at): 1})
+    bump_data_version(db, user_id, WELLNESS)
     db.commit()
     db.refresh(db_symptom)
     return db_symptom
 
 
-def get_all_symptoms(db: Session) -> list[Symptom]:
-    return db.query(Symptom).all()
+def create_symptoms(db: Session, symptoms: list[SymptomCreate], user_id: UUID) -> list[UUID]:
+    # One multi-row INSERT for the whole batch, ids returned in input order
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "description": symptom.description,
+            "created_at": symptom.date or now,
+        }
+        for symptom in symptoms
+    ]
+    db.execute(insert(Symptom), rows)
+    add_symptoms_to_rollup(db, user_id, Counter(rollup_day(row["created_at"]) for row in rows))
+    bump_data_version(db, user_id, WELLNESS)
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+# SymptomOut's fields as plain columns (see MOOD_OUT_COLUMNS)
+SYMPTOM_OUT_COLUMNS = schema_columns(Symptom, SymptomOut)
+
+
+def get_all_symptoms(db: Session) -> list[Row]:
+    return db.execute(select(*SYMPTOM_OUT_COLUMNS)).all()
 
 
 def get_symptom(db: Session, symptom_id: UUID) -> Symptom | None:
@@ -35,6 +65,7 @@ def update_symptom(db: Session, symptom_id: UUID, symptom_update: SymptomUpdate)
         return None
     for field, value in symptom_update.model_dump(exclude_unset=True).items():
         setattr(db_symptom, field, value)
+    bump_data_version(db, db_symptom.user_id, WELLNESS)
     db.commit()
     db.refresh(db_symptom)
     return db_symptom
@@ -44,6 +75,8 @@ def delete_symptom(db: Session, symptom_id: UUID) -> bool:
     db_symptom = get_symptom(db, symptom_id)
     if db_symptom:
         db.delete(db_symptom)
+        remove_symptom_from_rollup(db, db_symptom.user_id, rollup_day(db_symptom.created_at))
+        bump_data_version(db, db_symptom.user_id, WELLNESS)
         db.commit()
         return True
     return False
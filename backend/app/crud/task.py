@@ -1,18 +1,87 @@
+from sqlalchemy import insert, select, Row, case, func, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from datetime import datetime
 from sqlalchemy.orm import Session
-from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
-from uuid import UUID
+from app.models.task import Task, TaskStatus
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
+from app.core.responses import schema_columns
+from app.crud.data_version import bump_data_version, TASKS
+from uuid import UUID, uuid4
 
 def create_task(db: Session, task: TaskCreate, user_id: UUID):
     db_task = Task(**task.model_dump(), user_id=user_id,)
     db.add(db_task)
+    bump_data_version(db, user_id, TASKS)
     db.commit()
     db.refresh(db_task)
     return db_task
 
 
-def get_all_tasks(db: Session) -> list[Task]:
-    return db.query(Task).all()
+def create_tasks(db: Session, tasks: list[TaskCreate], user_id: UUID) -> list[UUID]:
+    # One multi-row INSERT for the whole batch, ids returned in input order
+    rows = [{**task.model_dump(), "id": uuid4(), "user_id": user_id} for task in tasks]
+    db.execute(insert(Task), rows)
+    bump_data_version(db, user_id, TASKS)
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+# TaskOut's fields as plain columns, for list reads serialized with rows_response()
+TASK_OUT_COLUMNS = schema_columns(Task, TaskOut)
+
+def insert_tasks(db: Session, rows: list[dict], user_id: UUID) -> list[Row]:
+    # Like create_tasks, for rows that carry extra columns (calendar_event_id); returns
+    # the new tasks as TASK_OUT_COLUMNS rows in input order
+    rows = [{**row, "id": uuid4(), "user_id": user_id} for row in rows]
+    result = db.execute(insert(Task).returning(*TASK_OUT_COLUMNS, sort_by_parameter_order=True), rows).all()
+    bump_data_version(db, user_id, TASKS)
+    db.commit()
+    return result
+
+def get_all_tasks(db: Session) -> list[Row]:
+    return db.execute(select(*TASK_OUT_COLUMNS)).all()
+
+def get_calendar_days(db: Session, user_id: UUID, start: datetime, end: datetime, tz: str = "UTC") -> list[Row]:
+    # One grouped pass over the window: pending tasks bucketed by due day, completed ones by
+    # completion day (local days in `tz`; stored times are UTC). Each row is a day with
+    # its counts and its tasks as a JSON array, ordered by time.
+    at = case((Task.status == TaskStatus.completed, Task.completed_at), else_=Task.due_date)
+    day = func.date_trunc("day", func.timezone(tz, func.timezone("UTC", at))).label("day")
+    item = func.json_build_object(
+        "id", Task.id, "title", Task.title, "status", Task.status, "due_date", Task.due_date,
+        "preferred_time", Task.preferred_time, "completed_at", Task.completed_at,
+        "is_recurring", Task.is_recurring, "occurrence", literal_column("0"),
+    )
+    return db.execute(
+        select(
+            day,
+            func.count().filter(Task.status == TaskStatus.pending).label("pending"),
+            func.count().filter(Task.status == TaskStatus.completed).label("completed"),
+            func.json_agg(aggregate_order_by(item, at)).label("tasks"),
+        )
+        .where(
+            Task.user_id == user_id,
+            Task.status.in_([TaskStatus.pending, TaskStatus.completed]),
+            at >= start,
+            at <= end,
+        )
+        .group_by(day)
+        .order_by(day)
+    ).all()
+
+
+def get_recurring_heads(db: Session, user_id: UUID, due_by: datetime) -> list[Row]:
+    # pending recurring tasks that may have occurrences up to due_by (see app.services.recurrence)
+    return db.execute(
+        select(*TASK_OUT_COLUMNS).where(
+            Task.user_id == user_id,
+            Task.is_recurring.is_(True),
+            Task.status == TaskStatus.pending,
+            Task.recurrence_pattern.isnot(None),
+            Task.due_date <= due_by,
+        )
+    ).all()
+
 
 def get_task(db: Session, task_id: UUID) -> Task:
     return db.query(Task).filter(Task.id == task_id).first()
@@ -24,6 +93,7 @@ def update_task(db: Session, task_id: UUID, task_update: TaskUpdate) -> Task:
         return None
     for field, value in task_update.model_dump(exclude_unset=True).items():
         setattr(db_task, field, value)
+    bump_data_version(db, db_task.user_id, TASKS)
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -33,6 +103,7 @@ def delete_task(db: Session, task_id: UUID) -> bool:
     db_task = get_task(db, task_id)
     if db_task:
         db.delete(db_task)
+        bump_data_version(db, db_task.user_id, TASKS)
         db.commit()
         return True
     return False
\ No newline at end of file
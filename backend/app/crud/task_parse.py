@@ -0,0 +1,25 @@
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, timezone
+from app.models.task_parse import TaskParseCache
+
+
+def get_cached_analysis(db: Session, key: str) -> dict | None:
+    return db.query(TaskParseCache.analysis).filter(TaskParseCache.key == key).scalar()
+
+
+def save_analysis(db: Session, key: str, reference_date: date, analysis: dict) -> None:
+    # Concurrent misses for the same key produce equivalent results; the first one wins
+    stmt = insert(TaskParseCache).values(
+        key=key, reference_date=reference_date, analysis=analysis, created_at=datetime.now(timezone.utc)
+    ).on_conflict_do_nothing(index_elements=[TaskParseCache.key])
+    db.execute(stmt)
+    db.commit()
+
+
+def purge_analyses(db: Session, before: date) -> int:
+    # Entries keyed on past reference dates can't be hit again
+    deleted = db.execute(delete(TaskParseCache).where(TaskParseCache.reference_date < before)).rowcount
+    db.commit()
+    return deleted
@@ -2,7 +2,8 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password, verify_and_update_password
+from app.core.dependencies import invalidate_user
 
 def register_user(db: Session, user: UserCreate) -> User:
     hashed_pw = hash_password(user.password)
@@ -14,9 +15,16 @@ def register_user(db: Session, user: UserCreate) -> User:
 
 def authenticate_user(db: Session, email: str, password: str) -> User | None:
     user = get_user_by_email(db, email)
-    if user and verify_password(password, user.hashed_password):
-        return user
-    return None
+    if not user:
+        return None
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        # work factor changed since this hash was made: store the rehashed password
+        user.hashed_password = new_hash
+        db.commit()
+    return user
 
 
 def create_user(db: Session, user: UserCreate) -> User:
@@ -42,6 +50,7 @@ def update_user(db: Session, user_id: UUID, user_update: UserUpdate) -> User | N
             setattr(user, key, value)
         db.commit()
         db.refresh(user)
+        invalidate_user(user_id)
         return user
     return None
 
@@ -50,5 +59,6 @@ def delete_user(db: Session, user_id: UUID) -> bool:
     if user:
         db.delete(user)
         db.commit()
+        invalidate_user(user_id)
         return True
     return False
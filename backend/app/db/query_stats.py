@@ -0,0 +1,180 @@
+# SQL query instrumentation via SQLAlchemy engine events.
+#
+# Every statement executed while a QueryStats is active (one per HTTP request, set up by
+# MetricsMiddleware) is counted and timed. Statements slower than SLOW_QUERY_SECONDS are
+# logged with their EXPLAIN plan, and statements repeated N_PLUS_ONE_THRESHOLD+ times in
+# one request (the same SQL with different parameters, e.g. a lazy load inside a loop) are
+# reported as a likely N+1.
+#
+# Bound values (password hashes, mood notes, task text) stay out of the logs unless
+# LOG_QUERY_VALUES=1: slow queries are logged with their parameters' count and types only,
+# and the plan is a generic one (EXPLAIN (GENERIC_PLAN), PostgreSQL 16+) of the statement
+# with its placeholders, which contains no values.
+#
+# assert_max_queries() is for tests:
+#     with assert_max_queries(3):
+#         client.get("/tasks/due", headers=auth)
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("db.queries")
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+LOG_QUERY_VALUES = os.getenv("LOG_QUERY_VALUES", "0").lower() in ("1", "true", "yes")  # opt-in, for debugging only
+
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class QueryStats:
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent  # enclosing track_queries(), which counts the same statements
+        self.count = 0
+        self.total_time = 0.0
+        self.slow = 0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.statements[statement] += 1
+            if elapsed >= SLOW_QUERY_SECONDS:
+                self.slow += 1
+        if self.parent is not None:
+            self.parent.record(statement, elapsed)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    # Sync endpoints and dependencies run in the threadpool with a copy of this context,
+    # so they record into the same QueryStats object. Nested, the outer one counts too
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {n}x {statement}" for statement, n in stats.statements.most_common())
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.count}:\n{listing}")
+
+
+# psycopg2 placeholders: %(name)s, %s, and %% for a literal %
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def _numbered_placeholders(statement: str) -> str:
+    # EXPLAIN (GENERIC_PLAN) takes $1, $2, ... in place of the values; the statement is
+    # then sent without parameters, so %% becomes a plain %
+    numbers: dict = {}
+
+    def number(match) -> str:
+        if match.group(0) == "%%":
+            return "%"
+        name = match.group(1) if match.group(1) is not None else len(numbers)
+        return "$%d" % numbers.setdefault(name, len(numbers) + 1)
+
+    return _PLACEHOLDER.sub(number, statement)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    # with parameters, the plan for these values (psycopg2 inlines them into the EXPLAIN);
+    # without, the generic plan, which has no values in it
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    if parameters is None and (conn.dialect.server_version_info or (0,)) < (16,):
+        return None
+    # Raw DBAPI cursor so the EXPLAIN itself doesn't go through these hooks; inside a
+    # transaction it runs in a savepoint so a failure can't abort the caller's transaction
+    dbapi_conn = conn.connection.dbapi_connection
+    in_transaction = not getattr(dbapi_conn, "autocommit", False)
+    cursor = dbapi_conn.cursor()
+    try:
+        if in_transaction:
+            cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            if parameters is None:
+                cursor.execute("EXPLAIN (GENERIC_PLAN) " + _numbered_placeholders(statement))
+            else:
+                cursor.execute("EXPLAIN " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+        return plan
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed >= SLOW_QUERY_SECONDS:
+        if LOG_QUERY_VALUES:
+            plan = None if executemany else _explain(conn, statement, parameters)
+            logger.warning("Slow query (%.1f ms): %s\nparameters: %r\n%s",
+                           elapsed * 1000, statement, parameters, plan or "(no plan)")
+        else:
+            plan = None if executemany else _explain(conn, statement, None)
+            logger.warning("Slow query (%.1f ms): %s\nparameters: %s\n%s",
+                           elapsed * 1000, statement, _describe_parameters(parameters, executemany),
+                           plan or "(no plan)")
+
+
+def _describe_parameters(parameters: Any, executemany: bool) -> str:
+    # shape without values: "3 (int, str, datetime)", "500 rows x 4 (...)"
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} rows x {_describe_parameters(rows[0], False)}" if rows else "0 rows"
+    values = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or [])
+    return f"{len(values)} ({', '.join(type(v).__name__ for v in values)})"
+
+
+def report_request(stats: QueryStats, method: str, route: str) -> None:
+    """Logs per-request totals and likely N+1 patterns; called once the response is sent."""
+    logger.debug("%s %s: %d queries, %.1f ms in the database", method, route, stats.count, stats.total_time * 1000)
+    for statement, n in stats.repeated():
+        logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", method, route, n, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
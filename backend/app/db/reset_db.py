@@ -1,5 +1,5 @@
 # Import all models so Base.metadata knows about them
-from app.models import user, mood, task, reminder, symptom
+from app.models import user, mood, task, reminder, symptom, data_version, evaluation, rollup, task_parse
 from app.models.base import Base
 from app.db.session import engine
 
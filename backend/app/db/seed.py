@@ -0,0 +1,314 @@
+# Bulk synthetic data for scale testing: users with years of moods, symptoms, tasks
+# (some recurring) and reminders, loaded with COPY instead of INSERTs.
+#
+#   python -m app.db.seed --users 2000 --days 1095 --jobs 8
+#
+# Rows are generated per user with NumPy (vectorized per user, not per row) and streamed
+# to Postgres in COPY batches from --jobs worker processes. Afterwards the daily rollups
+# and data versions are filled for the new users and the tables are ANALYZEd.
+#
+# The NOTIFY triggers on tasks/reminders are disabled while loading (one notification per
+# copied row would flood the "user_events" channel), which needs the table owner's role.
+# Meant for scratch/benchmark databases only.
+import argparse
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.security import pwd_context
+from app.db.session import engine
+from app.models.mood import MoodType
+from app.models.rollup import MOOD_COUNT_COLUMNS
+
+SEED_PASSWORD = "seed-password"
+COPY_BATCH_ROWS = 200_000
+
+COLUMNS = {
+    "users": ["id", "name", "email", "hashed_password"],
+    "moods": ["id", "user_id", "description", "mood_type", "intensity", "created_at"],
+    "symptoms": ["id", "user_id", "description", "created_at"],
+    "tasks": [
+        "id", "user_id", "title", "description", "status", "due_date", "preferred_time", "created_at",
+        "completed_at", "is_recurring", "recurrence_pattern", "recurrence_interval", "recurrence_end_date",
+    ],
+    "reminders": [
+        "id", "user_id", "task_id", "title", "description", "remind_at", "method", "created_at",
+        "delivery_status", "delivery_attempts", "delivered_at",
+    ],
+}
+NOTIFY_TRIGGERS = {"tasks": "tasks_notify_user_event", "reminders": "reminders_notify_user_event"}
+
+MOOD_TYPES = [mood_type.value for mood_type in MoodType]
+# Dirichlet prior for each user's mood mix, and typical intensity per mood type
+MOOD_ALPHA = {"happy": 3.0, "sad": 1.5, "anxious": 1.5, "angry": 0.7, "neutral": 3.0, "tired": 2.0, "stressed": 2.0, "depressed": 0.5}
+MOOD_INTENSITY = {"happy": 7, "sad": 4, "anxious": 6, "angry": 6, "neutral": 5, "tired": 4, "stressed": 6, "depressed": 3}
+MOOD_NOTES = ["long day at work", "slept well", "argument with a friend", "great workout", "deadline stress", "quiet weekend"]
+SYMPTOMS = [
+    "mild headache after lunch", "trouble falling asleep", "tense shoulders and neck", "stomach ache in the morning",
+    "low energy all afternoon", "racing thoughts at night", "sore throat", "back pain after sitting all day",
+    "dizzy when standing up", "heart racing before meetings",
+]
+TASKS = [
+    "Pay rent", "Team standup", "Laundry", "Call the dentist", "Take vitamins", "Finish quarterly report",
+    "Grocery run", "Yoga class", "Review pull requests", "Water the plants", "Renew passport", "Meal prep",
+]
+RECURRENCE = (["daily", "weekly", "monthly"], [0.3, 0.5, 0.2])
+REMINDER_LEADS = np.array([10 * 60, 60 * 60, 24 * 3600])
+REMINDER_METHODS = (["push", "email", "sms"], [0.7, 0.2, 0.1])
+
+NULL = "\\N"
+DAY = 86400
+
+
+def _uuids(rng: np.random.Generator, n: int) -> list[str]:
+    raw = rng.bytes(16 * n).hex()
+    return [f"{raw[i:i + 8]}-{raw[i + 8:i + 12]}-{raw[i + 12:i + 16]}-{raw[i + 16:i + 20]}-{raw[i + 20:i + 32]}"
+            for i in range(0, 32 * n, 32)]
+
+
+def _timestamps(seconds: np.ndarray, tz: bool = False) -> list[str]:
+    # epoch seconds -> 'YYYY-MM-DD HH:MM:SS', vectorized
+    text = np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s")
+    suffix = "+00" if tz else ""
+    return [value.replace("T", " ") + suffix for value in text.tolist()]
+
+
+def _optional(values: list, mask: np.ndarray) -> list:
+    return [value if keep else NULL for value, keep in zip(values, mask.tolist())]
+
+
+def _times_of_day(rng: np.random.Generator, n: int) -> np.ndarray:
+    # people log in the morning and in the evening: two-peaked, in seconds after midnight
+    evening = rng.random(n) < 0.6
+    hours = np.where(evening, rng.normal(21, 1.5, n), rng.normal(8, 1.5, n))
+    return (np.clip(hours, 0, 23.99) * 3600).astype(np.int64)
+
+
+def generate_user(rng: np.random.Generator, user_id: str, args, now: int) -> dict[str, list[str]]:
+    """COPY text-format lines for one user's moods, symptoms, tasks and reminders."""
+    today = now - now % DAY
+    days = args.days
+    # some users log every day, others a couple of times a week
+    active = rng.random(days) < rng.beta(4, 2)
+    out = {}
+
+    # moods
+    counts = rng.poisson(args.moods_per_day * rng.lognormal(0, 0.4), days) * active
+    n = int(counts.sum())
+    created = np.minimum(today - np.repeat(np.arange(days), counts) * DAY + _times_of_day(rng, n), now)
+    preferences = rng.dirichlet([MOOD_ALPHA[t] for t in MOOD_TYPES])
+    types = rng.choice(len(MOOD_TYPES), n, p=preferences)
+    base = np.array([MOOD_INTENSITY[t] for t in MOOD_TYPES])[types]
+    intensity = np.clip(np.rint(base + rng.normal(0, 1.5, n)), 1, 10).astype(int)
+    notes = rng.choice(MOOD_NOTES, n)
+    out["moods"] = [
+        "\t".join(row) for row in zip(
+            _uuids(rng, n), [user_id] * n,
+            _optional(notes.tolist(), rng.random(n) < 0.4),
+            [MOOD_TYPES[t] for t in types.tolist()],
+            _optional([str(i) for i in intensity.tolist()], rng.random(n) < 0.9),
+            _timestamps(created, tz=True),
+        )
+    ]
+
+    # symptoms
+    counts = rng.poisson(args.symptoms_per_day, days) * active
+    n = int(counts.sum())
+    created = np.minimum(today - np.repeat(np.arange(days), counts) * DAY + _times_of_day(rng, n), now)
+    out["symptoms"] = [
+        "\t".join(row) for row in zip(
+            _uuids(rng, n), [user_id] * n, rng.choice(SYMPTOMS, n).tolist(), _timestamps(created, tz=True),
+        )
+    ]
+
+    # tasks: due over the history plus the next 30 days
+    horizon = days + 30
+    counts = rng.poisson(args.tasks_per_day, horizon)
+    n = int(counts.sum())
+    due = today + (30 - np.repeat(np.arange(horizon), counts)) * DAY + rng.integers(8, 21, n) * 3600 + rng.choice([0, 1800], n)
+    created = np.minimum(due - rng.exponential(3 * DAY, n).astype(np.int64), now)
+    past = due < now
+    outcome = rng.random(n)
+    status = np.where(~past, "pending", np.where(outcome < 0.8, "completed", np.where(outcome < 0.85, "cancelled", "pending")))
+    completed = status == "completed"
+    completed_at = np.minimum(due + rng.normal(-2 * 3600, 6 * 3600, n).astype(np.int64), now)
+    recurring = rng.random(n) < args.recurring_share
+    pattern = rng.choice(RECURRENCE[0], n, p=RECURRENCE[1])
+    interval = rng.choice([1, 2, 3], n, p=[0.7, 0.2, 0.1])
+    recurrence_end = due + rng.integers(30, 366, n) * DAY
+    has_end = recurring & (rng.random(n) < 0.5)
+    due_text = _timestamps(due)
+    task_ids = _uuids(rng, n)
+    titles = rng.choice(TASKS, n).tolist()
+    out["tasks"] = [
+        "\t".join(row) for row in zip(
+            task_ids, [user_id] * n, titles, [NULL] * n, status.tolist(), due_text,
+            _optional([text[11:] for text in due_text], rng.random(n) < 0.6),
+            _timestamps(created),
+            _optional(_timestamps(completed_at), completed),
+            ["t" if r else "f" for r in recurring.tolist()],
+            _optional(pattern.tolist(), recurring),
+            [str(i) if r else "1" for i, r in zip(interval.tolist(), recurring.tolist())],
+            _optional(_timestamps(recurrence_end), has_end),
+        )
+    ]
+
+    # reminders for a share of the tasks, some time before they're due
+    picked = np.flatnonzero(rng.random(n) < args.reminder_share)
+    m = len(picked)
+    remind_at = due[picked] - rng.choice(REMINDER_LEADS, m)
+    sent = remind_at < now
+    failed = sent & (rng.random(m) < 0.03)
+    delivery = np.where(~sent, "pending", np.where(failed, "failed", "delivered"))
+    attempts = np.where(~sent, 0, np.where(failed, 5, 1))
+    out["reminders"] = [
+        "\t".join(row) for row in zip(
+            _uuids(rng, m), [user_id] * m, [task_ids[i] for i in picked.tolist()],
+            [f"Reminder: {titles[i]}" for i in picked.tolist()], [NULL] * m,
+            _timestamps(remind_at), rng.choice(REMINDER_METHODS[0], m, p=REMINDER_METHODS[1]).tolist(),
+            _timestamps(np.minimum(created[picked], remind_at)),
+            delivery.tolist(), [str(a) for a in attempts.tolist()],
+            _optional(_timestamps(remind_at + rng.integers(0, 5, m)), delivery == "delivered"),
+        )
+    ]
+    return out
+
+
+def _copy(cursor, table: str, lines: list[str]) -> None:
+    if lines:
+        buffer = io.StringIO("\n".join(lines) + "\n")
+        cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN", buffer)
+
+
+def _seed_users(job) -> dict[str, int]:
+    """Worker: generates and COPYs the rows for a slice of the (already inserted) users."""
+    user_ids, args, seed, now = job
+    engine.dispose(close=False)  # don't share the parent's pooled connections
+    rng = np.random.default_rng(seed)
+    totals = dict.fromkeys(["moods", "symptoms", "tasks", "reminders"], 0)
+    pending = {table: [] for table in totals}
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET synchronous_commit = off")
+
+        def flush():
+            # tasks before reminders (foreign key)
+            for table in ("moods", "symptoms", "tasks", "reminders"):
+                _copy(cursor, table, pending[table])
+                totals[table] += len(pending[table])
+                pending[table] = []
+            conn.commit()
+
+        for user_id in user_ids:
+            for table, lines in generate_user(rng, user_id, args, now).items():
+                pending[table].extend(lines)
+            if sum(len(lines) for lines in pending.values()) >= COPY_BATCH_ROWS:
+                flush()
+        flush()
+    finally:
+        conn.close()
+    return totals
+
+
+def _set_notify_triggers(enabled: bool) -> None:
+    action = "ENABLE" if enabled else "DISABLE"
+    with engine.begin() as conn:
+        for table, trigger in NOTIFY_TRIGGERS.items():
+            exists = conn.exec_driver_sql("SELECT 1 FROM pg_trigger WHERE tgname = %s", (trigger,)).first()
+            if exists:
+                conn.exec_driver_sql(f"ALTER TABLE {table} {action} TRIGGER {trigger}")
+
+
+def _fill_derived(user_ids: list[str]) -> None:
+    # Same aggregation as the backfill in migration 8b21e4c0d953, for the seeded users only
+    mood_types = list(MOOD_COUNT_COLUMNS.values())
+    type_columns = ", ".join(mood_types)
+    type_sums = ", ".join(f"SUM({column})" for column in mood_types)
+    type_flags = ", ".join(f"COALESCE((mood_type = '{t}')::int, 0) AS {column}" for t, column in MOOD_COUNT_COLUMNS.items())
+    type_zeros = ", ".join(f"0 AS {column}" for column in mood_types)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"""
+            INSERT INTO daily_wellness_rollup (
+                user_id, day, mood_count, {type_columns},
+                intensity_count, intensity_sum, intensity_min, intensity_max, symptom_count
+            )
+            SELECT user_id, day, SUM(mood_count), {type_sums},
+                   COUNT(intensity), COALESCE(SUM(intensity), 0), MIN(intensity), MAX(intensity), SUM(symptom_count)
+            FROM (
+                SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day, 1 AS mood_count, {type_flags},
+                       intensity, 0 AS symptom_count
+                FROM moods WHERE user_id = ANY(%(ids)s::uuid[])
+                UNION ALL
+                SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day, 0 AS mood_count, {type_zeros},
+                       NULL AS intensity, 1 AS symptom_count
+                FROM symptoms WHERE user_id = ANY(%(ids)s::uuid[])
+            ) entries
+            GROUP BY user_id, day
+        """, {"ids": user_ids})
+        conn.exec_driver_sql(
+            "INSERT INTO data_versions (user_id, resource, version, updated_at) "
+            "SELECT user_id, resource, 1, now() FROM unnest(%(ids)s::uuid[]) AS user_id "
+            "CROSS JOIN (VALUES ('wellness'), ('tasks')) AS resources (resource)",
+            {"ids": user_ids},
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("users", "moods", "symptoms", "tasks", "reminders", "daily_wellness_rollup"):
+            conn.exec_driver_sql(f"ANALYZE {table}")
+
+
+def seed(args) -> dict[str, int]:
+    rng = np.random.default_rng(args.seed)
+    user_ids = _uuids(rng, args.users)
+    hashed = pwd_context.hash(SEED_PASSWORD)  # one bcrypt hash shared by every seeded user
+    conn = engine.raw_connection()
+    try:
+        _copy(conn.cursor(), "users", [
+            f"{user_id}\tSeed User {i}\tseed-{user_id[:13]}@example.com\t{hashed}" for i, user_id in enumerate(user_ids)
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+    now = int(datetime.now(timezone.utc).timestamp())
+    jobs = max(1, args.jobs)
+    slices = [(user_ids[i::jobs], args, args.seed + 1 + i, now) for i in range(jobs)]
+    totals = {"users": len(user_ids)}
+    _set_notify_triggers(enabled=False)
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for result in pool.map(_seed_users, slices):
+                for table, count in result.items():
+                    totals[table] = totals.get(table, 0) + count
+    finally:
+        _set_notify_triggers(enabled=True)
+    _fill_derived(user_ids)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic users and history with COPY")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=730, help="days of history per user")
+    parser.add_argument("--moods-per-day", type=float, default=2.0, help="mean on active days")
+    parser.add_argument("--symptoms-per-day", type=float, default=0.3)
+    parser.add_argument("--tasks-per-day", type=float, default=1.0)
+    parser.add_argument("--recurring-share", type=float, default=0.12)
+    parser.add_argument("--reminder-share", type=float, default=0.4)
+    parser.add_argument("--jobs", type=int, default=4, help="parallel COPY worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    totals = seed(args)
+    elapsed = time.perf_counter() - started
+    for table, count in totals.items():
+        print(f"{table:<10} {count:>12,}")
+    print(f"{sum(totals.values()):,} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
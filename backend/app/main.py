@@ -1,8 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import user, task, reminder, mood, symptom, evaluate, rag
+from app.api import user, task, reminder, mood, symptom, evaluate, rag, events, metrics, profiler
+from app.core.metrics import MetricsMiddleware
+from app.core.compression import CompressionMiddleware
+from app.services.event_stream import broker
+from app.core.security import password_pool
+from app.ai.llm_client import LLMBudgetExceeded
+from app.core.profiler import install_signal_handler
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.db.session import engine
+from app.core.responses import ORJSONResponse
 
-app = FastAPI()
+# orjson instead of the stdlib json encoder for every response
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # allow CORS (Cross-Origin Resource Sharing) for requests from your frontend.
 app.add_middleware(
@@ -13,10 +24,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# brotli/gzip for bodies over COMPRESSION_MIN_SIZE; SSE passes through uncompressed
+app.add_middleware(CompressionMiddleware)
+
+# per-route request count / latency / in-flight / errors, scraped at GET /metrics
+app.add_middleware(MetricsMiddleware)
+
+# request/SQL/LLM/Calendar spans when OTEL_TRACES_EXPORTER is set
+setup_tracing(app, engine)
+
+app.include_router(metrics.router)
 app.include_router(user.router)
 app.include_router(task.router)
 app.include_router(reminder.router)
 app.include_router(mood.router)
 app.include_router(symptom.router)
 app.include_router(evaluate.router)
-app.include_router(rag.router)
\ No newline at end of file
+app.include_router(rag.router)
+app.include_router(events.router)
+app.include_router(profiler.router)
+
+
+@app.exception_handler(LLMBudgetExceeded)
+def llm_budget_exceeded(request: Request, exc: LLMBudgetExceeded):
+    return JSONResponse(status_code=429, content={"detail": str(exc)})
+
+
+# kill -USR2 <worker pid> writes a profile to PROFILE_DIR (when set)
+@app.on_event("startup")
+def install_profiler_signal():
+    install_signal_handler()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    broker.stop()
+    password_pool.shutdown()
+    shutdown_tracing()
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+from app.models.base import Base
+
+
+# Per-user version counters, bumped by the CRUD layer whenever a resource changes.
+# Used to tell whether derived results (cached evaluations, clients' ETags) are still current.
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    resource = Column(String(50), primary_key=True)  # e.g. "wellness" (moods + symptoms), "tasks"
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+# Version counters for app-wide resources that don't belong to one user (e.g. the list of
+# files embedded for RAG).
+class SharedDataVersion(Base):
+    __tablename__ = "shared_data_versions"
+
+    resource = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from datetime import datetime, timezone
+from app.models.base import Base
+
+
+# Last evaluation result per (user, date range), valid while data_version matches
+# the user's current "wellness" DataVersion.
+class EvaluationCache(Base):
+    __tablename__ = "evaluation_cache"
+    __table_args__ = (
+        UniqueConstraint("user_id", "start_date", "end_date", name="uq_evaluation_cache_user_range"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    data_version = Column(Integer, nullable=False)
+    summary = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, func
+from sqlalchemy import Column, String, Text, Enum, DateTime, ForeignKey, Integer, Index, func, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -10,8 +10,20 @@ class ReminderMethod(enum.Enum):
     email = 'email'
     sms = 'sms'
 
+class ReminderDeliveryStatus(enum.Enum):
+    pending = 'pending'
+    delivered = 'delivered'
+    failed = 'failed'
+
 class Reminder(Base):
     __tablename__ = 'reminders'
+    __table_args__ = (
+        # lookahead query of the dispatcher: undelivered reminders ordered by time
+        Index(
+            'ix_reminders_pending_remind_at', 'remind_at',
+            postgresql_where=text("delivery_status = 'pending'"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -21,6 +33,9 @@ class Reminder(Base):
     remind_at = Column(DateTime, nullable=False)
     method = Column(Enum(ReminderMethod), default=ReminderMethod.push)
     created_at = Column(DateTime, default=func.now())
+    delivery_status = Column(Enum(ReminderDeliveryStatus), default=ReminderDeliveryStatus.pending, nullable=False)
+    delivery_attempts = Column(Integer, default=0, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
 
     task = relationship('Task', back_populates='reminders')
     user = relationship("User", back_populates="reminders")
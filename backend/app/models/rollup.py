@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.models.base import Base
+from app.models.mood import MoodType
+
+
+# One row per user per (UTC) day, maintained by app/crud/rollup.py on mood/symptom writes.
+# Lets history/chart views read ~365 rows for a year instead of every raw entry.
+class DailyWellnessRollup(Base):
+    __tablename__ = "daily_wellness_rollup"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    mood_count = Column(Integer, nullable=False, default=0)
+    happy_count = Column(Integer, nullable=False, default=0)
+    sad_count = Column(Integer, nullable=False, default=0)
+    anxious_count = Column(Integer, nullable=False, default=0)
+    angry_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    tired_count = Column(Integer, nullable=False, default=0)
+    stressed_count = Column(Integer, nullable=False, default=0)
+    depressed_count = Column(Integer, nullable=False, default=0)
+
+    intensity_count = Column(Integer, nullable=False, default=0)  # moods that have an intensity
+    intensity_sum = Column(Integer, nullable=False, default=0)
+    intensity_min = Column(Integer, nullable=True)
+    intensity_max = Column(Integer, nullable=True)
+
+    symptom_count = Column(Integer, nullable=False, default=0)
+
+
+# rollup column holding the count for each mood type value
+MOOD_COUNT_COLUMNS = {mood_type.value: f"{mood_type.value}_count" for mood_type in MoodType}
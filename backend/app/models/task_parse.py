@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
+from app.models.base import Base
+
+
+# analyze_task_input results by normalized input + reference date/timezone. Not per user:
+# the result depends only on the key, and a hit needs the exact same text.
+class TaskParseCache(Base):
+    __tablename__ = "task_parse_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 hex of the normalized key
+    reference_date = Column(Date, nullable=False, index=True)
+    analysis = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
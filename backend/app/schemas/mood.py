@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Optional, List
 
 
 class MoodTypeEnum(str, Enum):
@@ -25,6 +25,17 @@ class MoodCreate(MoodBase):
     # user_id: UUID
     date: datetime | None = None  # Optional custom date from frontend
 
+# Offline sync: many moods in one request. Feedback (pep talk + affirmation) is only
+# generated when requested, and then only for the most recent entry.
+class MoodBatchCreate(BaseModel):
+    items: List[MoodCreate] = Field(..., min_length=1, max_length=1000)
+    generate_feedback: bool = False
+
+class MoodBatchOut(BaseModel):
+    ids: List[UUID]
+    pep_talk: Optional[str] = None
+    affirmation: Optional[str] = None
+
 class MoodUpdate(BaseModel):
     description: Optional[str] = None
     mood_type: Optional[MoodTypeEnum] = None  # Keep this optional for PATCH
@@ -9,6 +9,11 @@ class ReminderMethodEnum(str, Enum):
     email = "email"
     sms = "sms"
 
+class ReminderDeliveryStatusEnum(str, Enum):
+    pending = "pending"
+    delivered = "delivered"
+    failed = "failed"
+
 class ReminderBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -29,6 +34,8 @@ class ReminderOut(ReminderBase):
     user_id: UUID
     task_id: Optional[UUID]
     created_at: datetime
+    delivery_status: Optional[ReminderDeliveryStatusEnum] = None
+    delivered_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional, Dict
+
+
+class DailyWellnessRollupOut(BaseModel):
+    day: date
+    mood_count: int
+    mood_type_counts: Dict[str, int]
+    intensity_count: int
+    intensity_sum: int
+    intensity_avg: Optional[float] = None
+    intensity_min: Optional[int] = None
+    intensity_max: Optional[int] = None
+    symptom_count: int
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 
 class SymptomBase(BaseModel):
@@ -13,6 +13,15 @@ class SymptomCreate(SymptomBase):
     description: str
     date: datetime | None = None  # Optional custom date from frontend
 
+# Offline sync: many symptoms in one request; advice is optional and only for the latest entry
+class SymptomBatchCreate(BaseModel):
+    items: List[SymptomCreate] = Field(..., min_length=1, max_length=1000)
+    generate_advice: bool = False
+
+class SymptomBatchOut(BaseModel):
+    ids: List[UUID]
+    advice: Optional[str] = None
+
 class SymptomUpdate(BaseModel):
     description: str
 
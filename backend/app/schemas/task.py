@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from uuid import UUID
-from datetime import datetime, time
+from datetime import date, datetime, time
 from enum import Enum
 from app.schemas.reminder import ReminderOut
 
@@ -31,6 +31,12 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     pass
 
+class TaskBatchCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=1000)
+
+class TaskBatchOut(BaseModel):
+    ids: List[UUID]
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -52,3 +58,36 @@ class TaskOut(TaskBase):
         from_attributes = True
 
 
+# TaskOut in views that expand recurring tasks: occurrence 0 is the stored task, 1, 2, ...
+# its upcoming occurrences (same id, due_date of that occurrence)
+class TaskOccurrenceOut(TaskOut):
+    occurrence: int = 0
+
+
+# Month/week calendar: tasks bucketed by day (pending by due date, completed by completion
+# date), upcoming occurrences of recurring tasks included
+class TaskCalendarItem(BaseModel):
+    id: UUID
+    title: str
+    status: str
+    due_date: Optional[datetime] = None
+    preferred_time: Optional[time] = None
+    completed_at: Optional[datetime] = None
+    is_recurring: bool = False
+    occurrence: int = 0
+
+
+class TaskCalendarDay(BaseModel):
+    day: date
+    pending: int
+    completed: int
+    tasks: List[TaskCalendarItem]
+
+
+class TaskCalendarOut(BaseModel):
+    start: date
+    end: date
+    timezone: str
+    pending: int
+    completed: int
+    days: List[TaskCalendarDay]
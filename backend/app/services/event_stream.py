@@ -0,0 +1,98 @@
+# Per-user change events pushed to clients (SSE), fed by Postgres LISTEN/NOTIFY.
+#
+# Triggers on the tasks and reminders tables (see migration d5a8f31b7c20) NOTIFY the
+# "user_events" channel on every insert/update/delete. One background thread per worker
+# LISTENs on a dedicated connection and fans each event out to the asyncio queues of that
+# user's open streams, so clients no longer need to poll /tasks/due or /reminders/due.
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+import psycopg2
+import psycopg2.extensions
+
+from app.db.session import DATABASE_URL
+
+logger = logging.getLogger("events")
+
+CHANNEL = "user_events"
+QUEUE_SIZE = 100
+
+
+class UserEventBroker:
+    def __init__(self, dsn: str = DATABASE_URL, channel: str = CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def subscribe(self, user_id) -> asyncio.Queue:
+        # The listener thread is started lazily with the first subscriber
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[str(user_id)].add(queue)
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.get_running_loop()
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._listen, name="user-event-listener", daemon=True)
+                self._thread.start()
+        return queue
+
+    def unsubscribe(self, user_id, queue: asyncio.Queue) -> None:
+        with self._lock:
+            queues = self._subscribers.get(str(user_id))
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[str(user_id)]
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _publish(self, payload: str) -> None:
+        # Runs on the event loop thread
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        with self._lock:
+            queues = list(self._subscribers.get(str(event.get("user_id")), ()))
+        for queue in queues:
+            if queue.full():
+                # slow client: drop its oldest event rather than block everyone else
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._loop.call_soon_threadsafe(self._publish, notify.payload)
+            except Exception as e:
+                logger.warning("Event listener connection lost, reconnecting in %ss: %s", backoff, e)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+broker = UserEventBroker()
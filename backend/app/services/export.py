@@ -0,0 +1,160 @@
+# Streaming export of a user's wellness history (moods, symptoms, tasks).
+# Rows are read through a server-side cursor as plain column tuples (no ORM objects or
+# Pydantic models) and written out chunk by chunk, so memory stays flat for any history size.
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.mood import Mood
+from app.models.symptom import Symptom
+from app.models.task import Task
+
+CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "record_type", "id", "created_at", "mood_type", "intensity", "description",
+    "title", "status", "due_date", "completed_at",
+]
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _export_queries(user_id: UUID, start_date: Optional[datetime]):
+    mood_q = select(Mood.id, Mood.created_at, Mood.mood_type, Mood.intensity, Mood.description).where(Mood.user_id == user_id)
+    symptom_q = select(Symptom.id, Symptom.created_at, Symptom.description).where(Symptom.user_id == user_id)
+    task_q = select(
+        Task.id, Task.created_at, Task.title, Task.description, Task.status, Task.due_date, Task.completed_at
+    ).where(Task.user_id == user_id)
+    if start_date:
+        mood_q = mood_q.where(Mood.created_at >= start_date)
+        symptom_q = symptom_q.where(Symptom.created_at >= start_date)
+        task_q = task_q.where(Task.created_at >= start_date)
+    return [
+        ("mood", mood_q.order_by(Mood.created_at)),
+        ("symptom", symptom_q.order_by(Symptom.created_at)),
+        ("task", task_q.order_by(Task.created_at)),
+    ]
+
+
+def iter_record_chunks(db: Session, user_id: UUID, start_date: Optional[datetime] = None) -> Iterator[list[dict]]:
+    """Yields lists of at most CHUNK_SIZE export records, one dict per row."""
+    for record_type, stmt in _export_queries(user_id, start_date):
+        # yield_per streams from a server-side cursor instead of buffering the whole result
+        result = db.execute(stmt.execution_options(yield_per=CHUNK_SIZE))
+        for partition in result.mappings().partitions():
+            yield [{"record_type": record_type, **row} for row in partition]
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _ndjson_chunks(chunks: Iterator[list[dict]]) -> Iterator[str]:
+    for records in chunks:
+        yield "".join(
+            json.dumps({column: _plain(record.get(column)) for column in EXPORT_COLUMNS}) + "\n"
+            for record in records
+        )
+
+
+def _csv_chunks(chunks: Iterator[list[dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for records in chunks:
+        writer.writerows([_plain(record.get(column)) for column in EXPORT_COLUMNS] for record in records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _DrainableSink(io.RawIOBase):
+    # Write-only file object whose accumulated bytes can be drained between row groups
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_chunks(chunks: Iterator[list[dict]]) -> Iterator[bytes]:
+    # pyarrow is only needed for this format
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    schema = pa.schema([
+        ("record_type", pa.string()),
+        ("id", pa.string()),
+        ("created_at", timestamp),
+        ("mood_type", pa.string()),
+        ("intensity", pa.int32()),
+        ("description", pa.string()),
+        ("title", pa.string()),
+        ("status", pa.string()),
+        ("due_date", timestamp),
+        ("completed_at", timestamp),
+    ])
+
+    def as_utc(value):
+        if value is None or value.tzinfo is not None:
+            return value
+        return value.replace(tzinfo=timezone.utc)
+
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for records in chunks:
+            columns = {column: [record.get(column) for record in records] for column in EXPORT_COLUMNS}
+            for column in ("id", "mood_type", "status"):
+                columns[column] = [_plain(v) for v in columns[column]]
+            for column in ("created_at", "due_date", "completed_at"):
+                columns[column] = [as_utc(v) for v in columns[column]]
+            # one row group per chunk, flushed to the client as soon as it's written
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(user_id: UUID, export_format: str, start_date: Optional[datetime] = None):
+    """
+    Generator for a StreamingResponse. Uses its own session so the cursor stays open
+    for as long as the response is being sent.
+    """
+    writers = {"ndjson": _ndjson_chunks, "csv": _csv_chunks, "parquet": _parquet_chunks}
+    db = SessionLocal()
+    try:
+        yield from writers[export_format](iter_record_chunks(db, user_id, start_date))
+    finally:
+        db.close()
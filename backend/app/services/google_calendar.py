@@ -1,3 +1,4 @@
+import logging
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List
@@ -10,9 +11,13 @@ import pytz
 from sqlalchemy.orm import Session
 from app.models.task import Task
 from sqlalchemy import and_
+from app.core.tracing import traced
+
+logger = logging.getLogger("calendar")
 
 # Google Calendar API scopes
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+CALENDAR_BATCH_SIZE = 50
 
 class GoogleCalendarService:
     def __init__(self, timezone_str: str = 'America/New_York'):
@@ -20,6 +25,7 @@ class GoogleCalendarService:
         self.timezone_str = timezone_str
         self._authenticate()
     
+    @traced("calendar.authenticate")
     def _authenticate(self):
         """Authenticate with Google Calendar API"""
         creds = None
@@ -47,6 +53,7 @@ class GoogleCalendarService:
         self.service = build('calendar', 'v3', credentials=creds)
     
     # List ALL available slots on ONE specific date
+    @traced("calendar.find_available_slots")
     def find_available_slots(self, date: datetime, duration_minutes: int = 60, start_hour: int = 11, end_hour: int = 21) -> List[datetime]:
         """Find available time slots for a given date with flexible hours"""
         # Make sure date is timezone-aware
@@ -105,6 +112,7 @@ class GoogleCalendarService:
         return available_slots
 
     # List the NEXT available slot across MULTIPLE days. Multiple days (up to 7 days ahead)
+    @traced("calendar.find_next_available_slot")
     def find_next_available_slot(self, after_time: datetime, duration_minutes: int = 60, 
                                 max_days_ahead: int = 7) -> Optional[datetime]:
         """Find the next available slot after a given time"""
@@ -130,10 +138,9 @@ class GoogleCalendarService:
         
         return None
     
-    def create_event(self, title: str, description: str, start_time: datetime, 
+    def _event_body(self, title: str, description: str, start_time: datetime,
                     duration_minutes: int = 60, recurring: bool = False,
                     recurrence_rule: Optional[str] = None) -> dict:
-        """Create a Google Calendar event"""
         end_time = start_time + timedelta(minutes=duration_minutes) 
         
         # Make sure datetime objects are timezone-aware
@@ -164,6 +171,14 @@ class GoogleCalendarService:
         
         if recurring and recurrence_rule:
             event['recurrence'] = [recurrence_rule]
+        return event
+
+    @traced("calendar.create_event")
+    def create_event(self, title: str, description: str, start_time: datetime, 
+                    duration_minutes: int = 60, recurring: bool = False,
+                    recurrence_rule: Optional[str] = None) -> dict:
+        """Create a Google Calendar event"""
+        event = self._event_body(title, description, start_time, duration_minutes, recurring, recurrence_rule)
         
         event = self.service.events().insert(
             calendarId='primary',
@@ -171,7 +186,69 @@ class GoogleCalendarService:
         ).execute()
         
         return event
+
+    # Many events in as few HTTP round trips as possible (Calendar batches hold up to 50
+    # calls). Takes create_event() keyword arguments per event; returns the created events
+    # in order, None where that insert failed.
+    @traced("calendar.create_events")
+    def create_events(self, events: List[dict]) -> List[Optional[dict]]:
+        created: List[Optional[dict]] = [None] * len(events)
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                created[int(request_id)] = response
+            else:
+                logger.warning("Failed to create event %s: %s", request_id, exception)
+
+        for offset in range(0, len(events), CALENDAR_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for i, spec in enumerate(events[offset:offset + CALENDAR_BATCH_SIZE], start=offset):
+                batch.add(self.service.events().insert(calendarId='primary', body=self._event_body(**spec)), request_id=str(i))
+            batch.execute()
+        return created
+
+    # Deletes events by id, batched like create_events; a failed delete is logged and skipped
+    @traced("calendar.delete_events")
+    def delete_events(self, event_ids: List[str]) -> None:
+        def collect(request_id, response, exception):
+            if exception is not None:
+                logger.warning("Failed to delete event %s: %s", request_id, exception)
+
+        for offset in range(0, len(event_ids), CALENDAR_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for event_id in event_ids[offset:offset + CALENDAR_BATCH_SIZE]:
+                batch.add(self.service.events().delete(calendarId='primary', eventId=event_id), request_id=event_id)
+            batch.execute()
+
+    # Busy intervals (timezone-aware start, end) between two times, in one events().list call
+    @traced("calendar.list_busy")
+    def list_busy(self, start: datetime, end: datetime) -> List[tuple]:
+        user_tz = pytz.timezone(self.timezone_str)
+        if start.tzinfo is None:
+            start = user_tz.localize(start)
+        if end.tzinfo is None:
+            end = user_tz.localize(end)
+        events = self.service.events().list(
+            calendarId='primary',
+            timeMin=start.isoformat(),
+            timeMax=end.isoformat(),
+            singleEvents=True,
+            orderBy='startTime'
+        ).execute().get('items', [])
+
+        busy = []
+        for event in events:
+            # all-day events ('date') block the whole day, as in find_available_slots
+            event_start = datetime.fromisoformat(event['start'].get('dateTime', event['start'].get('date')))
+            event_end = datetime.fromisoformat(event['end'].get('dateTime', event['end'].get('date')))
+            if event_start.tzinfo is None:
+                event_start = user_tz.localize(event_start)
+            if event_end.tzinfo is None:
+                event_end = user_tz.localize(event_end)
+            busy.append((event_start, event_end))
+        return busy
     
+    @traced("calendar.reschedule_expired_calendar_events")
     def reschedule_expired_calendar_events(self, user_id: str, db: Session) -> List[dict]:
         try:
             user_tz = pytz.timezone(self.timezone_str)
@@ -304,6 +381,7 @@ class GoogleCalendarService:
             print(f"Error rescheduling expired calendar events: {e}")
             return []
 
+    @traced("calendar.is_calendar_event_expired")
     def _is_calendar_event_expired(self, task: Task) -> bool:
         """Check if a task's calendar event time has passed"""
         if not task.preferred_time or not task.due_date:
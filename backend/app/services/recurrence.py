@@ -0,0 +1,222 @@
+# Recurrence expansion for recurring tasks.
+#
+# A recurring task is an RRULE in disguise: DTSTART = due_date, FREQ = recurrence_pattern
+# (DAILY / WEEKLY / MONTHLY), INTERVAL = recurrence_interval, UNTIL = recurrence_end_date.
+# expand() computes the occurrences of many such rules inside a window at once with NumPy
+# instead of materializing Task rows. Occurrence k is DTSTART advanced by k intervals;
+# k = 0 is the stored row itself. MONTHLY follows RFC 5545: a start on the 31st skips
+# months without a 31st rather than clamping to the last day.
+#
+# Only the pending head of a series is expanded: complete_task materializes the next
+# occurrence as a new pending row, so completed rows are history, not rules.
+#
+# occurrences_between() caches expansions per task version (the task's recurrence fields)
+# and calendar month, so repeated due/calendar views of the same month skip the math.
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.core.cache import TTLCache
+
+FREQUENCIES = {"daily": "DAILY", "weekly": "WEEKLY", "monthly": "MONTHLY"}
+_STEP_DAYS = {"daily": 1, "weekly": 7}
+# horizon for next_occurrence(): long enough for a monthly rule on Feb 29
+_NEXT_HORIZON_MONTHS = 12 * 8
+MAX_OCCURRENCES_PER_TASK = 1000  # per expansion window, a guard against absurd windows
+
+_DAY = np.timedelta64(1, "D")
+
+expansion_cache = TTLCache(maxsize=50_000, ttl=3600)  # (task version, month) -> occurrences
+
+
+class Occurrence(NamedTuple):
+    task_id: UUID
+    index: int  # k: 0 is the stored row, 1 the next occurrence, ...
+    due_date: datetime
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # due dates are stored naive and treated as UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _until(end_date: Optional[datetime]) -> Optional[datetime]:
+    # A date-only end ("until May 1", stored as midnight) includes that whole day
+    end_date = _naive_utc(end_date)
+    if end_date is not None and end_date.time() == time.min:
+        return end_date + timedelta(days=1) - timedelta(microseconds=1)
+    return end_date
+
+
+def to_rrule(pattern: Optional[str], interval: Optional[int] = 1, end_date: Optional[datetime] = None) -> Optional[str]:
+    """The RRULE (as used by Google Calendar events) for a task's recurrence fields."""
+    if pattern not in FREQUENCIES:
+        return None
+    rule = f"RRULE:FREQ={FREQUENCIES[pattern]};INTERVAL={max(interval or 1, 1)}"
+    if end_date is not None:
+        end_date = _naive_utc(end_date)
+        rule += f";UNTIL={end_date:%Y%m%d}" if end_date.time() == time.min else f";UNTIL={end_date:%Y%m%dT%H%M%SZ}"
+    return rule
+
+
+def _datetimes(values: Iterable[Optional[datetime]]) -> np.ndarray:
+    return np.array([np.datetime64(v, "us") if v is not None else np.datetime64("NaT") for v in values], dtype="M8[us]")
+
+
+def _ragged(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # (row index, position within row) for rows repeated counts[i] times
+    rows = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return rows, np.arange(counts.sum()) - starts[rows]
+
+
+def _ceil_div(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return -((-a) // b)
+
+
+def expand(
+    starts: np.ndarray,
+    patterns: np.ndarray,
+    intervals: np.ndarray,
+    untils: np.ndarray,
+    window_start: datetime,
+    window_end: datetime,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Occurrences of every rule within [window_start, window_end] (inclusive), for rules
+    given column-wise: starts/untils as datetime64[us] (NaT = no end), patterns as str,
+    intervals as int. Returns (rule index, k, datetime64[us]) arrays sorted by rule, k.
+    """
+    ws = np.datetime64(_naive_utc(window_start), "us")
+    we = np.datetime64(_naive_utc(window_end), "us")
+    intervals = np.maximum(np.nan_to_num(intervals.astype(float), nan=1).astype(np.int64), 1)
+    ends = np.where(np.isnat(untils), we, np.minimum(untils, we))
+    valid = ~np.isnat(starts) & (starts <= ends)
+
+    out_rows, out_k, out_when = [], [], []
+
+    # DAILY / WEEKLY: fixed steps, so the first and last k in the window are a division away
+    for pattern, days in _STEP_DAYS.items():
+        sel = np.flatnonzero(valid & (patterns == pattern))
+        if not len(sel):
+            continue
+        step = (intervals[sel] * days * _DAY).astype("m8[us]").astype(np.int64)
+        start = starts[sel]
+        k_lo = np.maximum(_ceil_div((ws - start).astype(np.int64), step), 0)
+        k_hi = (ends[sel] - start).astype(np.int64) // step
+        counts = np.clip(k_hi - k_lo + 1, 0, MAX_OCCURRENCES_PER_TASK)
+        rows, offset = _ragged(counts)
+        k = k_lo[rows] + offset
+        out_rows.append(sel[rows])
+        out_k.append(k)
+        out_when.append(start[rows] + (k * step[rows]).astype("m8[us]"))
+
+    # MONTHLY: step in calendar months, keeping day of month and time of day; candidates
+    # whose day doesn't exist in the target month are dropped
+    sel = np.flatnonzero(valid & (patterns == "monthly"))
+    if len(sel):
+        start = starts[sel]
+        start_month = start.astype("M8[M]")
+        offset_in_month = start - start_month.astype("M8[us]")
+        n = intervals[sel]
+        m0 = start_month.astype(np.int64)
+        k_lo = np.maximum(_ceil_div(ws.astype("M8[M]").astype(np.int64) - m0, n), 0)
+        k_hi = (ends[sel].astype("M8[M]").astype(np.int64) - m0) // n
+        counts = np.clip(k_hi - k_lo + 1, 0, MAX_OCCURRENCES_PER_TASK)
+        rows, offset = _ragged(counts)
+        k = k_lo[rows] + offset
+        month = (m0[rows] + k * n[rows]).astype("M8[M]")
+        when = month.astype("M8[us]") + offset_in_month[rows]
+        keep = (when.astype("M8[M]") == month) & (when >= ws) & (when <= ends[sel][rows])
+        out_rows.append(sel[rows][keep])
+        out_k.append(k[keep])
+        out_when.append(when[keep])
+
+    if not out_rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype="M8[us]")
+    rows, k, when = np.concatenate(out_rows), np.concatenate(out_k), np.concatenate(out_when)
+    order = np.lexsort((k, rows))
+    return rows[order], k[order], when[order]
+
+
+def next_occurrence(
+    due_date: datetime, pattern: Optional[str], interval: Optional[int] = 1, end_date: Optional[datetime] = None
+) -> Optional[datetime]:
+    """The occurrence after due_date, or None past the end date / for unknown patterns."""
+    if due_date is None or pattern not in FREQUENCIES:
+        return None
+    step = max(interval or 1, 1)
+    horizon = (
+        due_date + timedelta(days=_STEP_DAYS[pattern] * step)
+        if pattern in _STEP_DAYS
+        else due_date + timedelta(days=31 * _NEXT_HORIZON_MONTHS)
+    )
+    rows, k, when = expand(
+        _datetimes([_naive_utc(due_date)]), np.array([pattern]), np.array([step]), _datetimes([_until(end_date)]),
+        _naive_utc(due_date) + timedelta(microseconds=1), _naive_utc(horizon),
+    )
+    return when[0].astype(datetime) if len(when) else None
+
+
+def _task_version(task) -> tuple:
+    return (task.id, task.due_date, task.recurrence_pattern, task.recurrence_interval, task.recurrence_end_date)
+
+
+def _month_buckets(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    buckets = []
+    month = datetime(start.year, start.month, 1)
+    while month <= end:
+        following = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+        buckets.append((month, following - timedelta(microseconds=1)))
+        month = following
+    return buckets
+
+
+def occurrences_between(tasks, window_start: datetime, window_end: datetime, include_stored: bool = False) -> list[Occurrence]:
+    """
+    Occurrences in [window_start, window_end] of the given recurring tasks (rows or
+    objects with id, due_date and the recurrence_* fields), ordered by due date. Only
+    expanded occurrences (k >= 1) are returned unless include_stored is set.
+    """
+    window_start, window_end = _naive_utc(window_start), _naive_utc(window_end)
+    tasks = [t for t in tasks if t.due_date is not None and t.recurrence_pattern in FREQUENCIES]
+    if not tasks or window_start > window_end:
+        return []
+
+    found: dict[tuple, list] = {}
+    for bucket in _month_buckets(window_start, window_end):
+        missing = []
+        for task in tasks:
+            cached = expansion_cache.get((_task_version(task), bucket[0]))
+            if cached is None:
+                missing.append(task)
+            else:
+                found.setdefault(_task_version(task), []).extend(cached)
+        if not missing:
+            continue
+        rows, k, when = expand(
+            _datetimes(_naive_utc(t.due_date) for t in missing),
+            np.array([t.recurrence_pattern for t in missing]),
+            np.array([t.recurrence_interval or 1 for t in missing]),
+            _datetimes(_until(t.recurrence_end_date) for t in missing),
+            *bucket,
+        )
+        per_task = [[] for _ in missing]
+        for row, index, due in zip(rows.tolist(), k.tolist(), when.astype(datetime).tolist()):
+            per_task[row].append((index, due))
+        for task, occurrences in zip(missing, per_task):
+            expansion_cache.set((_task_version(task), bucket[0]), occurrences)
+            found.setdefault(_task_version(task), []).extend(occurrences)
+
+    result = [
+        Occurrence(version[0], index, due)
+        for version, occurrences in found.items()
+        for index, due in occurrences
+        if window_start <= due <= window_end and (include_stored or index > 0)
+    ]
+    result.sort(key=lambda o: o.due_date)
+    return result
@@ -0,0 +1,191 @@
+# Reminder dispatcher: a standalone process that delivers reminders when they're due.
+#
+# Upcoming reminders are loaded into an in-memory timing wheel from an indexed lookahead
+# query (pending reminders with remind_at inside the next few minutes), refilled every
+# refill_interval seconds. Between refills the process only advances the wheel, so the
+# database sees one small indexed query per refill instead of a scan every second.
+#
+# Run with:  python -m app.services.reminder_dispatcher [--file reminders.jsonl]
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select, or_, tuple_, func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.reminder import Reminder, ReminderMethod, ReminderDeliveryStatus
+from app.services.reminder_sinks import ReminderSink, LogSink, FileSink
+from app.services.timing_wheel import TimingWheel
+
+logger = logging.getLogger("reminders.dispatcher")
+
+
+def _timestamp(value: datetime) -> float:
+    # remind_at is stored naive and treated as UTC throughout the app
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ReminderDispatcher:
+    def __init__(
+        self,
+        sinks: dict[ReminderMethod, ReminderSink],
+        session_factory: Callable[[], Session] = SessionLocal,
+        lookahead: timedelta = timedelta(minutes=15),
+        refill_interval: float = 30.0,
+        batch_size: int = 5000,
+        max_attempts: int = 5,
+        retry_delay: float = 60.0,
+    ):
+        self.sinks = sinks
+        self.session_factory = session_factory
+        self.lookahead = lookahead
+        self.refill_interval = refill_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.wheel = TimingWheel(start=time.time())
+        self._watermark: Optional[datetime] = None  # remind_at bound of the last refill
+        self._last_refill: Optional[datetime] = None
+        self._next_refill = 0.0
+
+    def refill(self, now: datetime) -> int:
+        """Loads pending reminders due before now + lookahead that aren't in the wheel yet."""
+        horizon = now + self.lookahead
+        query = select(Reminder.id, Reminder.remind_at).where(
+            Reminder.delivery_status == ReminderDeliveryStatus.pending,
+            Reminder.remind_at <= horizon,
+        )
+        if self._watermark is not None:
+            # Only the slice that entered the window since the last refill, plus reminders
+            # created since then with an earlier remind_at (e.g. "remind me in 2 minutes").
+            # created_at is the database's func.now() stored naive in the session timezone,
+            # so it's compared on the database clock (localtimestamp), not our UTC one.
+            since_last_refill = (now - self._last_refill).total_seconds() + self.refill_interval
+            created_since = func.localtimestamp() - timedelta(seconds=since_last_refill)
+            query = query.where(or_(Reminder.remind_at > self._watermark, Reminder.created_at >= created_since))
+
+        loaded = 0
+        last_key = None
+        with self.session_factory() as db:
+            # Keyset pagination so a large backlog is read in bounded batches
+            while True:
+                page = query
+                if last_key is not None:
+                    page = page.where(tuple_(Reminder.remind_at, Reminder.id) > last_key)
+                rows = db.execute(page.order_by(Reminder.remind_at, Reminder.id).limit(self.batch_size)).all()
+                for reminder_id, remind_at in rows:
+                    if reminder_id not in self.wheel:
+                        self.wheel.add(reminder_id, _timestamp(remind_at))
+                        loaded += 1
+                if len(rows) < self.batch_size:
+                    break
+                last_key = (rows[-1].remind_at, rows[-1].id)
+
+        self._watermark = horizon
+        self._last_refill = now
+        return loaded
+
+    def dispatch_due(self, now: datetime) -> int:
+        """Delivers every reminder whose time has come; returns the number delivered."""
+        due_ids = [key for key, _ in self.wheel.advance(_timestamp(now))]
+        delivered = 0
+        for i in range(0, len(due_ids), self.batch_size):
+            delivered += self._deliver(due_ids[i:i + self.batch_size], now)
+        return delivered
+
+    def _deliver(self, reminder_ids: list, now: datetime) -> int:
+        delivered = 0
+        with self.session_factory() as db:
+            # SKIP LOCKED lets several dispatcher processes share the table safely
+            reminders = db.execute(
+                select(Reminder).where(
+                    Reminder.id.in_(reminder_ids),
+                    Reminder.delivery_status == ReminderDeliveryStatus.pending,
+                ).with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            for reminder in reminders:
+                if reminder.remind_at > now:
+                    self.wheel.add(reminder.id, _timestamp(reminder.remind_at))
+                    continue
+                sink = self.sinks.get(reminder.method or ReminderMethod.push)
+                reminder.delivery_attempts = (reminder.delivery_attempts or 0) + 1
+                try:
+                    if sink is None:
+                        raise RuntimeError(f"No sink configured for method {reminder.method}")
+                    sink.send({
+                        "id": str(reminder.id),
+                        "user_id": str(reminder.user_id),
+                        "task_id": str(reminder.task_id) if reminder.task_id else None,
+                        "title": reminder.title,
+                        "description": reminder.description,
+                        "method": reminder.method.value if reminder.method else None,
+                        "remind_at": reminder.remind_at.isoformat(),
+                    })
+                except Exception as e:
+                    if reminder.delivery_attempts >= self.max_attempts:
+                        reminder.delivery_status = ReminderDeliveryStatus.failed
+                        logger.error("Reminder %s failed permanently: %s", reminder.id, e)
+                    else:
+                        # exponential backoff, kept in memory only
+                        delay = self.retry_delay * 2 ** (reminder.delivery_attempts - 1)
+                        self.wheel.add(reminder.id, _timestamp(now) + delay)
+                        logger.warning("Reminder %s failed (attempt %s), retrying in %ss: %s",
+                                       reminder.id, reminder.delivery_attempts, delay, e)
+                    continue
+                reminder.delivery_status = ReminderDeliveryStatus.delivered
+                reminder.delivered_at = now
+                delivered += 1
+            db.commit()
+        return delivered
+
+    def run_once(self) -> int:
+        now = _utcnow()
+        if time.monotonic() >= self._next_refill:
+            self.refill(now)
+            self._next_refill = time.monotonic() + self.refill_interval
+        return self.dispatch_due(now)
+
+    def run_forever(self, stop: Optional[threading.Event] = None, tick: float = 1.0) -> None:
+        stop = stop or threading.Event()
+        logger.info("Reminder dispatcher started (lookahead %s, refill every %ss)", self.lookahead, self.refill_interval)
+        while not stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Reminder dispatch loop error")
+            stop.wait(tick)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver due reminders")
+    parser.add_argument("--file", help="append delivered reminders to this JSON-lines file instead of logging them")
+    parser.add_argument("--lookahead-minutes", type=float, default=15)
+    parser.add_argument("--refill-seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    sink = FileSink(args.file) if args.file else LogSink()
+    dispatcher = ReminderDispatcher(
+        sinks={method: sink for method in ReminderMethod},
+        lookahead=timedelta(minutes=args.lookahead_minutes),
+        refill_interval=args.refill_seconds,
+    )
+    try:
+        dispatcher.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Delivery backends for the reminder dispatcher. A sink receives a plain dict per
+# reminder and raises on failure; the dispatcher handles retries and delivery state.
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger("reminders")
+
+
+class ReminderSink:
+    def send(self, reminder: dict) -> None:
+        raise NotImplementedError
+
+
+class LogSink(ReminderSink):
+    """Writes each reminder to the "reminders" logger."""
+
+    def send(self, reminder: dict) -> None:
+        logger.info("Reminder %s for user %s (%s): %s", reminder["id"], reminder["user_id"],
+                    reminder["method"], reminder["title"])
+
+
+class FileSink(ReminderSink):
+    """Appends each reminder as a JSON line to a local file (useful for testing)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def send(self, reminder: dict) -> None:
+        line = json.dumps(reminder, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
@@ -0,0 +1,76 @@
+# Calendar slot planning for several new tasks at once.
+#
+# Scheduling tasks one by one (find_available_slots, then create_event) reads the calendar
+# for every task and lets two tasks from the same request land in the same free slot.
+# plan_slots() works from one list of busy intervals instead: tasks with a fixed time keep
+# it and block it, then the flexible ones take the first gap of their length, in input
+# order, each new slot counting as busy for the next.
+from bisect import insort
+from datetime import date, datetime, time, timedelta
+from typing import List, NamedTuple, Optional
+
+DAY_START = time(11, 0)  # same working window as GoogleCalendarService.find_available_slots
+DAY_END = time(22, 0)
+MAX_DAYS_AHEAD = 7
+SLOT_ROUNDING_MINUTES = 15
+
+
+class SlotRequest(NamedTuple):
+    day: date                         # preferred day (local)
+    duration_minutes: int
+    start: Optional[datetime] = None  # fixed, timezone-aware start time
+
+
+def _first_gap(busy: list, window_start: datetime, window_end: datetime, duration: timedelta) -> Optional[datetime]:
+    cursor = window_start
+    for busy_start, busy_end in busy:
+        if busy_end <= cursor:
+            continue
+        if busy_start >= window_end:
+            break
+        if busy_start - cursor >= duration:
+            return cursor
+        cursor = max(cursor, busy_end)
+    return cursor if window_end - cursor >= duration else None
+
+
+def _round_up(moment: datetime) -> datetime:
+    step = SLOT_ROUNDING_MINUTES * 60
+    seconds = moment.minute * 60 + moment.second + moment.microsecond / 1e6
+    rounded = -(-seconds // step) * step
+    return moment.replace(minute=0, second=0, microsecond=0) + timedelta(seconds=rounded)
+
+
+def plan_slots(requests: List[SlotRequest], busy: List[tuple], now: datetime, tz) -> List[datetime]:
+    """
+    Start times (timezone-aware, in `tz`, a pytz zone) for the requests, in order. `busy`
+    holds (start, end) intervals already taken. A flexible task with no gap within
+    MAX_DAYS_AHEAD days falls back to DAY_START on its preferred day.
+    """
+    busy = sorted(busy)
+    planned: List[Optional[datetime]] = [None] * len(requests)
+
+    for i, request in enumerate(requests):
+        if request.start is not None:
+            planned[i] = request.start
+            insort(busy, (request.start, request.start + timedelta(minutes=request.duration_minutes)))
+
+    earliest = _round_up(now)
+    for i, request in enumerate(requests):
+        if request.start is not None:
+            continue
+        duration = timedelta(minutes=request.duration_minutes)
+        for offset in range(MAX_DAYS_AHEAD + 1):
+            day = request.day + timedelta(days=offset)
+            window_start = max(tz.localize(datetime.combine(day, DAY_START)), earliest)
+            window_end = tz.localize(datetime.combine(day, DAY_END))
+            if window_start >= window_end:
+                continue
+            slot = _first_gap(busy, window_start, window_end, duration)
+            if slot is not None:
+                planned[i] = slot
+                insort(busy, (slot, slot + duration))
+                break
+        else:
+            planned[i] = tz.localize(datetime.combine(request.day, DAY_START))
+    return planned
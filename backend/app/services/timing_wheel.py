@@ -0,0 +1,94 @@
+import heapq
+import itertools
+import math
+from typing import Any, Hashable
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel. Adding and cancelling an entry is O(1); advancing the
+    clock only touches the slots that expire, plus an occasional cascade of a coarser
+    slot into the finer levels. With the defaults (1s tick, 60 x 60 x 24 slots) the
+    wheels cover one day; anything further out waits in an overflow heap.
+    """
+
+    def __init__(self, start: float, tick: float = 1.0, slots: tuple[int, ...] = (60, 60, 24)):
+        self.tick = tick
+        self.slots = slots
+        # ticks covered by one slot of each level: 1, 60, 3600, ...
+        self._slot_ticks = [math.prod(slots[:level]) for level in range(len(slots))]
+        self._span_ticks = math.prod(slots)
+        self._wheels = [[{} for _ in range(size)] for size in slots]
+        self._overflow = []  # heap of (due_tick, seq, key)
+        self._seq = itertools.count()
+        self._entries = {}  # key -> (due_tick, item)
+        self._current = self._to_tick(start)
+
+    def _to_tick(self, when: float) -> int:
+        return math.floor(when / self.tick)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def add(self, key: Hashable, when: float, item: Any = None) -> None:
+        """Schedules item under key at time `when` (replacing any earlier entry for key)."""
+        self.cancel(key)
+        # rounded up so nothing fires early; entries fire at most one tick late
+        due = max(math.ceil(when / self.tick), self._current)
+        self._entries[key] = (due, item)
+        self._place(key, due)
+
+    def cancel(self, key: Hashable) -> bool:
+        # Slot/heap references are dropped lazily: stale ones no longer match _entries
+        return self._entries.pop(key, None) is not None
+
+    def _place(self, key: Hashable, due: int) -> None:
+        delta = due - self._current
+        if delta >= self._span_ticks:
+            heapq.heappush(self._overflow, (due, next(self._seq), key))
+            return
+        for level in range(len(self.slots) - 1, -1, -1):
+            if level == 0 or delta >= self._slot_ticks[level]:
+                index = (due // self._slot_ticks[level]) % self.slots[level]
+                self._wheels[level][index][key] = due
+                return
+
+    def _take(self, level: int, index: int) -> list:
+        bucket = self._wheels[level][index]
+        self._wheels[level][index] = {}
+        return [(key, due) for key, due in bucket.items() if self._entries.get(key, (None,))[0] == due]
+
+    def advance(self, now: float) -> list[tuple[Hashable, Any]]:
+        """Moves the clock to `now` and returns the (key, item) pairs that became due."""
+        target = self._to_tick(now)
+        expired = []
+        while self._current <= target:
+            tick = self._current
+            # Cascade coarser slots whose period starts at this tick into finer levels
+            for level in range(len(self.slots) - 1, 0, -1):
+                if tick % self._slot_ticks[level] == 0:
+                    index = (tick // self._slot_ticks[level]) % self.slots[level]
+                    for key, due in self._take(level, index):
+                        self._place(key, due)
+            while self._overflow and self._overflow[0][0] - tick < self._span_ticks:
+                due, _, key = heapq.heappop(self._overflow)
+                if self._entries.get(key, (None,))[0] == due:
+                    self._place(key, due)
+            for key, due in self._take(0, tick % self.slots[0]):
+                if due <= tick:
+                    expired.append((key, self._entries.pop(key)[1]))
+                else:
+                    self._place(key, due)
+            if tick == target:
+                break
+            self._current += 1
+        return expired
+
+    def next_due(self) -> float | None:
+        """Earliest scheduled time, or None when empty (O(n); for idle sleeps only)."""
+        if not self._entries:
+            return None
+        return min(due for due, _ in self._entries.values()) * self.tick
@@ -0,0 +1,124 @@
+# CPU cost vs. bytes saved of the response compression settings (app/core/compression.py)
+# on payloads shaped like our typical responses:
+#
+#   history_year    /users/{id}/history?period=year (moods + symptoms JSON)
+#   tasks_due       /tasks/due?period=month
+#   export_ndjson   /users/{id}/export?format=ndjson, compressed as streamed (flush per chunk)
+#   rag_answer      a markdown answer from /rag/ask/
+#
+#   python -m benchmarks.compression
+#   python -m benchmarks.compression --json compression.json
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+
+from app.core.compression import brotli, make_encoder
+from app.services.export import CHUNK_SIZE, _ndjson_chunks
+
+MOOD_TYPES = ["happy", "sad", "anxious", "angry", "neutral", "tired", "stressed", "depressed"]
+NOTES = ["", "long day at work", "slept well", "argument with a friend", "went for a run", "deadline stress"]
+SYMPTOMS = ["mild headache after lunch", "trouble falling asleep", "tense shoulders and neck", "low energy all afternoon"]
+TASKS = ["Pay rent", "Team standup", "Laundry", "Call the dentist", "Finish quarterly report", "Grocery run"]
+
+
+def _moods(rng, user_id, now, days):
+    return [
+        {"description": rng.choice(NOTES) or None, "mood_type": rng.choice(MOOD_TYPES), "intensity": rng.randint(1, 10),
+         "id": str(uuid.uuid4()), "user_id": user_id, "created_at": (now - timedelta(minutes=rng.randint(0, days * 1440))).isoformat()}
+        for _ in range(days * 2)
+    ]
+
+
+def _symptoms(rng, user_id, now, days):
+    return [
+        {"description": rng.choice(SYMPTOMS), "id": str(uuid.uuid4()), "user_id": user_id,
+         "created_at": (now - timedelta(minutes=rng.randint(0, days * 1440))).isoformat()}
+        for _ in range(days // 2)
+    ]
+
+
+def _tasks(rng, user_id, now, n):
+    return [
+        {"title": rng.choice(TASKS), "description": None, "status": rng.choice(["pending", "completed"]),
+         "due_date": (now + timedelta(hours=rng.randint(-500, 500))).isoformat(), "preferred_time": None,
+         "is_recurring": False, "recurrence_pattern": None, "recurrence_interval": 1, "recurrence_end_date": None,
+         "id": str(uuid.uuid4()), "user_id": user_id, "created_at": now.isoformat(), "completed_at": None}
+        for _ in range(n)
+    ]
+
+
+def payloads(seed: int = 42) -> dict[str, list[bytes]]:
+    """Payload name -> body chunks (one chunk unless the endpoint streams)."""
+    rng = random.Random(seed)
+    user_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    history = orjson.dumps({"moods": _moods(rng, user_id, now, 365), "symptoms": _symptoms(rng, user_id, now, 365)})
+    tasks = orjson.dumps(_tasks(rng, user_id, now, 150))
+
+    records = [{"record_type": "mood", **m} for m in _moods(rng, user_id, now, 365)]
+    records += [{"record_type": "task", **t} for t in _tasks(rng, user_id, now, 500)]
+    export = [chunk.encode() for chunk in _ndjson_chunks(
+        records[i:i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)
+    )]
+
+    paragraphs = [
+        "## Vacation policy\n\nFull-time employees accrue **1.5 vacation days per month**, up to 18 days a year. "
+        "Unused days carry over to the next year, capped at 5 days.",
+        "- Requests go through your manager at least two weeks in advance.\n"
+        "- Days taken during the notice period are paid out only if approved.\n"
+        "- Public holidays are not counted as vacation days.",
+        "See *Employee Handbook, section 4.2* for part-time accrual and the carry-over exceptions.",
+    ]
+    answer = orjson.dumps({"answer": "\n\n".join(paragraphs * 2)})
+    return {"history_year": [history], "tasks_due": [tasks], "export_ndjson": export, "rag_answer": [answer]}
+
+
+def compress(encoding: str, level: int, chunks: list[bytes]) -> bytes:
+    encoder = make_encoder(encoding, gzip_level=level, brotli_quality=level)
+    if len(chunks) == 1:
+        return encoder.compress(chunks[0]) + encoder.finish()
+    # streamed like the middleware does it: flush after every chunk
+    return b"".join(encoder.compress(chunk, flush=True) for chunk in chunks) + encoder.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compression CPU cost vs bytes saved on typical responses")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    settings = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if brotli is not None:
+        settings += [("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+    else:
+        print("brotli is not installed, gzip only")
+
+    results = []
+    print(f"{'payload':14} {'raw KiB':>8} {'encoding':>9} {'KiB':>8} {'ratio':>6} {'ms':>8} {'MB/s':>7}")
+    for name, chunks in payloads().items():
+        raw = sum(len(chunk) for chunk in chunks)
+        for encoding, level in settings:
+            times, body = [], b""
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                body = compress(encoding, level, chunks)
+                times.append(time.perf_counter() - started)
+            ms = statistics.median(times) * 1000
+            results.append({"payload": name, "raw_bytes": raw, "encoding": encoding, "level": level,
+                            "bytes": len(body), "ms": ms})
+            print(f"{name:14} {raw / 1024:8.1f} {f'{encoding}-{level}':>9} {len(body) / 1024:8.1f} "
+                  f"{raw / len(body):6.1f} {ms:8.2f} {raw / 1e6 / (ms / 1000):7.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
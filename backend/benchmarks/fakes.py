@@ -0,0 +1,223 @@
+# In-process stand-ins for the external services (OpenAI, Pinecone, Google Calendar), so
+# the benchmark measures this app and not someone else's API. Each one sleeps for a
+# configurable latency to keep the request shapes realistic.
+#
+# install_fakes() must run before app.main (or any app.ai module) is imported: the AI
+# modules build their clients and connect to Pinecone at import time.
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import ValidationError
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers every prompt with a canned reply of the shape its call site expects."""
+
+    model_name: str = "gpt-4o-mini"
+    latency: float = 0.5
+    output_tokens: int = 150
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-openai"
+
+    def _reply(self, prompt: str) -> str:
+        if "Analyze this task input" in prompt:
+            tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+            return json.dumps({
+                "title": "Benchmark task", "description": "", "due_date": tomorrow,
+                "preferred_time": "15:00", "timezone": None, "duration_minutes": 30,
+                "is_recurring": False, "recurrence_pattern": None, "recurrence_interval": None,
+                "recurrence_end_date": None,
+            })
+        if "wellness analysis assistant" in prompt:
+            return json.dumps({
+                "patterns": "Mood dips mid-week.", "correlations": "Headaches co-occur with stress.",
+                "possible_causes": "Work load.", "recommendations": ["Take short breaks", "Sleep earlier"],
+            })
+        return "You've got this. " * max(1, self.output_tokens // 4)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        prompt = "\n".join(str(m.content) for m in messages)
+        prompt_tokens = max(1, len(prompt) // 4)
+        usage = {"input_tokens": prompt_tokens, "output_tokens": self.output_tokens,
+                 "total_tokens": prompt_tokens + self.output_tokens}
+        content = self._reply(prompt)
+        if kwargs.get("response_schema") is not None and not content.startswith("{"):
+            content = json.dumps({"text": content})  # SupportMessage
+        message = AIMessage(content=content, usage_metadata=usage)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"model_name": self.model_name},
+        )
+
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        # OpenAI's json_schema mode without the API: the canned reply, validated against schema
+        def respond(value):
+            message = self.invoke(value, response_schema=schema)
+            try:
+                parsed, error = schema.model_validate_json(message.content), None
+            except ValidationError as e:
+                parsed, error = None, e
+            return {"raw": message, "parsed": parsed, "parsing_error": error} if include_raw else parsed
+        return RunnableLambda(respond)
+
+
+class FakeVectorStore:
+    def __init__(self, latency: float = 0.05, **kwargs):
+        self.latency = latency
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        time.sleep(self.latency)
+        return [
+            Document(page_content=f"Benefit excerpt {i} relevant to: {query}",
+                     metadata={"filename": "benefits.pdf", "page_label": str(i + 1)})
+            for i in range(k)
+        ]
+
+    def add_documents(self, documents, **kwargs):
+        return [str(uuid.uuid4()) for _ in documents]
+
+
+class _FakeIndexList(list):
+    def names(self):
+        return list(self)
+
+
+class FakeIndex:
+    def upsert(self, vectors, **kwargs):
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, **kwargs):
+        return {}
+
+    def query(self, **kwargs):
+        return {"matches": []}
+
+
+class FakePinecone:
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        pass
+
+    def list_indexes(self):
+        return _FakeIndexList(["benefits-embeddings"])
+
+    def create_index(self, **kwargs):
+        pass
+
+    def Index(self, name: str):
+        return FakeIndex()
+
+
+class _FakeRequest:
+    def __init__(self, latency: float, result: Any):
+        self.latency = latency
+        self.result = result
+
+    def execute(self):
+        time.sleep(self.latency)
+        return self.result
+
+
+class FakeCalendarEvents:
+    """The slice of the googleapiclient events() resource that GoogleCalendarService uses."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def list(self, calendarId, timeMin, timeMax, **kwargs):
+        start, end = datetime.fromisoformat(timeMin), datetime.fromisoformat(timeMax)
+        with self._lock:
+            items = [
+                event for event in self._events.values()
+                if start <= datetime.fromisoformat(event["start"]["dateTime"]) <= end
+            ]
+        items.sort(key=lambda event: event["start"]["dateTime"])
+        return _FakeRequest(self.latency, {"items": items})
+
+    def insert(self, calendarId, body):
+        event = {**body, "id": uuid.uuid4().hex}
+        with self._lock:
+            self._events[event["id"]] = event
+        return _FakeRequest(self.latency, event)
+
+    def get(self, calendarId, eventId):
+        with self._lock:
+            return _FakeRequest(self.latency, self._events.get(eventId, {"id": eventId, "status": "cancelled"}))
+
+    def delete(self, calendarId, eventId):
+        with self._lock:
+            self._events.pop(eventId, None)
+        return _FakeRequest(self.latency, "")
+
+
+class _FakeBatch:
+    # googleapiclient BatchHttpRequest: one round trip for all added requests
+    def __init__(self, latency: float, callback):
+        self.latency = latency
+        self.callback = callback
+        self._requests = []
+
+    def add(self, request, request_id=None):
+        self._requests.append((request_id or str(len(self._requests)), request))
+
+    def execute(self):
+        time.sleep(self.latency)
+        for request_id, request in self._requests:
+            self.callback(request_id, request.result, None)
+
+
+class FakeCalendarAPI:
+    def __init__(self, latency: float = 0.15):
+        self.latency = latency
+        self._events = FakeCalendarEvents(latency)
+
+    def events(self):
+        return self._events
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatch(self.latency, callback)
+
+
+def install_fakes(
+    llm_latency: float = 0.5,
+    llm_output_tokens: int = 150,
+    vector_latency: float = 0.05,
+    calendar_latency: float = 0.15,
+) -> None:
+    import langchain_pinecone
+    import pinecone
+    import app.ai.llm_client
+    import app.services.google_calendar
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("PINECONE_API_KEY", "benchmark")
+
+    def chat_model(callbacks=None, model="gpt-4o-mini", **kwargs):
+        return FakeChatModel(model_name=model, latency=llm_latency, output_tokens=llm_output_tokens, callbacks=callbacks)
+
+    # The real callback handler stays attached, so LLM metrics and budgets are exercised too
+    app.ai.llm_client.ChatOpenAI = chat_model
+    pinecone.Pinecone = FakePinecone
+    langchain_pinecone.PineconeVectorStore = lambda **kwargs: FakeVectorStore(latency=vector_latency)
+
+    calendar = FakeCalendarAPI(latency=calendar_latency)
+
+    def authenticate(self):
+        self.service = calendar
+
+    app.services.google_calendar.GoogleCalendarService._authenticate = authenticate
@@ -0,0 +1,246 @@
+# End-to-end load test: migrates and seeds a local Postgres database, starts the API
+# under uvicorn with OpenAI, Pinecone and Google Calendar faked (benchmarks/server.py),
+# drives a weighted mix of requests from concurrent clients and reports RPS and
+# p50/p95/p99 latency per endpoint.
+#
+#   createdb pa_bench
+#   python -m benchmarks.loadtest --database-url postgresql://localhost/pa_bench \
+#       --users 50 --concurrency 32 --duration 60 --json results.json
+#
+# With --baseline results.json the run fails (exit code 1) when an endpoint's p95 is more
+# than --max-regression slower than in the baseline, so it can gate a deploy.
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # (user_id, rng) -> (path, json body or None)
+    build: Callable
+
+
+def _mood_body(rng):
+    return {"mood_type": rng.choice(["happy", "sad", "anxious", "tired", "neutral"]),
+            "intensity": rng.randint(1, 10), "description": "benchmark entry"}
+
+
+SCENARIOS = {
+    s.name: s for s in [
+        Scenario("tasks_due", "GET", lambda uid, rng: (f"/tasks/due?due_by={datetime.now().isoformat()}&period=week", None)),
+        Scenario("reminders_due", "GET", lambda uid, rng: (f"/reminders/due?due_by={datetime.now().isoformat()}", None)),
+        Scenario("history_month", "GET", lambda uid, rng: (f"/users/{uid}/history?period=month", None)),
+        Scenario("history_daily_year", "GET", lambda uid, rng: (f"/users/{uid}/history/daily?period=year", None)),
+        Scenario("export_ndjson", "GET", lambda uid, rng: (f"/users/{uid}/export?format=ndjson&period=month", None)),
+        Scenario("rag_list_files", "GET", lambda uid, rng: ("/rag/list_files/", None)),
+        Scenario("mood_create", "POST", lambda uid, rng: ("/moods/", _mood_body(rng))),
+        Scenario("symptom_create", "POST", lambda uid, rng: ("/symptoms/", {"description": "headache and tired eyes"})),
+        Scenario("task_create", "POST", lambda uid, rng: ("/tasks/", {
+            "title": "Benchmark task", "due_date": (datetime.now() + timedelta(days=rng.randint(0, 7))).isoformat()})),
+        Scenario("task_from_text", "POST", lambda uid, rng: ("/tasks/create-from-text", {
+            "user_input": "call mom tomorrow at 3pm for half an hour"})),
+        Scenario("evaluate", "POST", lambda uid, rng: ("/evaluate/", {
+            "start_date": str(date.today() - timedelta(days=rng.choice([7, 30, 90]))), "end_date": str(date.today())})),
+        Scenario("rag_ask", "POST", lambda uid, rng: ("/rag/ask/", {"question": "How many vacation days do I get?"})),
+    ]
+}
+
+# relative weights per workload
+MIXES = {
+    "reads": {"tasks_due": 35, "reminders_due": 20, "history_month": 20, "history_daily_year": 20, "rag_list_files": 5},
+    "writes": {"mood_create": 40, "symptom_create": 25, "task_create": 35},
+    "ai": {"task_from_text": 35, "evaluate": 25, "rag_ask": 40},
+    "mixed": {
+        "tasks_due": 25, "reminders_due": 15, "history_month": 10, "history_daily_year": 10, "export_ndjson": 2,
+        "rag_list_files": 3, "mood_create": 10, "symptom_create": 5, "task_create": 8, "task_from_text": 5,
+        "evaluate": 3, "rag_ask": 4,
+    },
+}
+
+
+def migrate(database_url: str) -> None:
+    subprocess.run(["alembic", "upgrade", "head"], cwd=BACKEND_DIR, check=True,
+                   env={**os.environ, "DATABASE_URL": database_url})
+
+
+def seed(n_users: int, days: int) -> list:
+    # imported late: app.db.session reads DATABASE_URL at import time
+    from app.db.session import SessionLocal
+    from benchmarks.seed import seed_users
+
+    with SessionLocal() as db:
+        return seed_users(db, n_users, days)
+
+
+def existing_users(limit: int) -> list:
+    from sqlalchemy import select
+    from app.db.session import SessionLocal
+    from app.models.user import User
+
+    with SessionLocal() as db:
+        return list(db.scalars(select(User.id).where(User.email.like("bench-%")).limit(limit)))
+
+
+def start_server(args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "BENCH_LLM_LATENCY": str(args.llm_latency),
+        "BENCH_LLM_OUTPUT_TOKENS": str(args.llm_tokens),
+        "BENCH_VECTOR_LATENCY": str(args.vector_latency),
+        "BENCH_CALENDAR_LATENCY": str(args.calendar_latency),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.server:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/metrics", timeout=1.0)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("API server did not start within 60s")
+
+
+async def drive(base_url: str, tokens: dict, mix: dict, concurrency: int, duration: float, warmup: float):
+    """Runs `concurrency` closed-loop clients; returns {scenario: [(latency, status), ...]}."""
+    names, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)
+    user_ids = list(tokens)
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def client(worker: int):
+        rng = random.Random(worker)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as http:
+            while time.perf_counter() < stop_at:
+                scenario = SCENARIOS[rng.choices(names, weights)[0]]
+                user_id = rng.choice(user_ids)
+                path, body = scenario.build(user_id, rng)
+                headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+                t0 = time.perf_counter()
+                try:
+                    response = await http.request(scenario.method, path, json=body, headers=headers)
+                    await response.aread()
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 0
+                t1 = time.perf_counter()
+                if t0 >= measure_from:
+                    samples[scenario.name].append((t1 - t0, status))
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return samples
+
+
+def summarize(samples: dict, duration: float) -> dict:
+    report = {}
+    for name, rows in sorted(samples.items()):
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        errors = sum(1 for _, status in rows if status == 0 or status >= 500)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[name] = {
+            "requests": len(rows), "errors": errors, "rps": round(len(rows) / duration, 2),
+            "p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1), "p99_ms": round(float(p99), 1),
+        }
+    return report
+
+
+def print_report(report: dict, duration: float) -> None:
+    print(f"\n{'endpoint':<22}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in report.items():
+        print(f"{name:<22}{row['requests']:>10}{row['errors']:>8}{row['rps']:>9}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    total = sum(row["requests"] for row in report.values())
+    print(f"{'total':<22}{total:>10}{sum(r['errors'] for r in report.values()):>8}{round(total / duration, 2):>9}")
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    found = []
+    for name, row in report.items():
+        before = baseline.get(name)
+        if before and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            found.append(f"{name}: p95 {before['p95_ms']} ms -> {row['p95_ms']} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against a local Postgres with faked external services")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), required=not os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--mix", choices=list(MIXES), default="mixed")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--history-days", type=int, default=90)
+    parser.add_argument("--skip-setup", action="store_true", help="reuse the users seeded by an earlier run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-tokens", type=int, default=150)
+    parser.add_argument("--vector-latency", type=float, default=0.05)
+    parser.add_argument("--calendar-latency", type=float, default=0.15)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="report from an earlier run to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    if args.skip_setup:
+        user_ids = existing_users(args.users)
+    else:
+        migrate(args.database_url)
+        user_ids = seed(args.users, args.history_days)
+    if not user_ids:
+        sys.exit("No benchmark users; run without --skip-setup first")
+
+    from app.core.security import create_access_token
+    tokens = {str(user_id): create_access_token({"user_id": str(user_id)}) for user_id in user_ids}
+
+    server = start_server(args)
+    try:
+        samples = asyncio.run(drive(f"http://127.0.0.1:{args.port}", tokens, MIXES[args.mix],
+                                    args.concurrency, args.duration, args.warmup))
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = summarize(samples, args.duration)
+    print_report(report, args.duration)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"mix": args.mix, "concurrency": args.concurrency, "endpoints": report}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f)["endpoints"], args.max_regression)
+        if found:
+            print("\np95 regressions beyond {:.0%}:".format(args.max_regression))
+            print("\n".join("  " + line for line in found))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
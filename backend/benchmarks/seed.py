@@ -0,0 +1,69 @@
+# Seeds benchmark users with a realistic amount of history: a few moods and symptoms a
+# day and a steady stream of tasks, written through the same batch crud functions the API
+# uses so rollups and data versions are populated too.
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import app.crud.mood
+import app.crud.symptom
+import app.crud.task
+from app.core.security import pwd_context
+from app.models.user import User
+from app.schemas.mood import MoodCreate, MoodTypeEnum
+from app.schemas.symptom import SymptomCreate
+from app.schemas.task import TaskCreate
+
+BENCH_PASSWORD = "benchmark-password"
+SYMPTOMS = [
+    "mild headache after lunch", "trouble falling asleep", "tense shoulders and neck",
+    "stomach ache in the morning", "low energy all afternoon", "racing thoughts at night",
+    "sore throat", "back pain after sitting all day",
+]
+TASKS = [
+    "Pay rent", "Team standup", "Laundry", "Call the dentist", "Take vitamins",
+    "Finish quarterly report", "Grocery run", "Yoga class", "Review pull requests",
+]
+
+
+def seed_users(db: Session, n_users: int, days: int, seed: int = 42) -> list[uuid.UUID]:
+    """Creates n_users users with `days` days of history each; returns their ids."""
+    rng = random.Random(seed)
+    # one bcrypt hash shared by every benchmark user
+    hashed = pwd_context.hash(BENCH_PASSWORD)
+    user_ids = [uuid.uuid4() for _ in range(n_users)]
+    db.execute(insert(User), [
+        {"id": user_id, "name": f"Bench User {i}", "email": f"bench-{user_id.hex[:12]}@example.com", "hashed_password": hashed}
+        for i, user_id in enumerate(user_ids)
+    ])
+    db.commit()
+
+    now = datetime.now(timezone.utc)
+    for user_id in user_ids:
+        moods, symptoms, tasks = [], [], []
+        for day in range(days):
+            date = now - timedelta(days=day)
+            for _ in range(rng.randint(1, 3)):
+                moods.append(MoodCreate(
+                    mood_type=rng.choice(list(MoodTypeEnum)),
+                    intensity=rng.randint(1, 10),
+                    description=rng.choice(["", "long day at work", "slept well", "argument with a friend"]),
+                    date=date - timedelta(minutes=rng.randint(0, 12 * 60)),
+                ))
+            if rng.random() < 0.4:
+                symptoms.append(SymptomCreate(description=rng.choice(SYMPTOMS), date=date))
+            if rng.random() < 0.7:
+                due = (now + timedelta(days=rng.randint(-days // 2, 14))).replace(tzinfo=None)
+                tasks.append(TaskCreate(title=rng.choice(TASKS), due_date=due))
+
+        # batches stay under the API's 1000-item limit
+        for i in range(0, len(moods), 1000):
+            app.crud.mood.create_moods(db, moods[i:i + 1000], user_id=user_id)
+        for i in range(0, len(symptoms), 1000):
+            app.crud.symptom.create_symptoms(db, symptoms[i:i + 1000], user_id=user_id)
+        for i in range(0, len(tasks), 1000):
+            app.crud.task.create_tasks(db, tasks[i:i + 1000], user_id=user_id)
+    return user_ids
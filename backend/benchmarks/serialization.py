@@ -0,0 +1,116 @@
+# Compares the two ways a list endpoint can build a large JSON response:
+#
+#   orm     ORM objects -> per-row *Out.model_validate -> jsonable_encoder -> json.dumps
+#           (what FastAPI does for a response_model list)
+#   rows    select of the *Out columns -> Row tuples -> orjson (app.core.responses)
+#
+# Both are timed end to end (query + serialization) on --rows tasks and moods and their
+# decoded output is checked to be identical.
+#
+#   python -m benchmarks.serialization --rows 10000
+#   python -m benchmarks.serialization --database-url postgresql://localhost/pa_bench
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, time as dtime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.responses import rows_response
+from app.crud.mood import MOOD_OUT_COLUMNS
+from app.crud.task import TASK_OUT_COLUMNS
+from app.models import user, mood, task, reminder, symptom, data_version, evaluation, rollup  # noqa: F401 (mappers)
+from app.models.mood import Mood, MoodType
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.schemas.mood import MoodOut
+from app.schemas.task import TaskOut
+
+
+def seed(db: Session, n_rows: int) -> uuid.UUID:
+    rng = random.Random(42)
+    user_id = uuid.uuid4()
+    db.execute(insert(User), [{"id": user_id, "name": "Serialization Bench", "email": f"serial-{user_id.hex[:12]}@example.com", "hashed_password": "x"}])
+    now = datetime.utcnow()
+    db.execute(insert(Task), [
+        {
+            "id": uuid.uuid4(), "user_id": user_id, "title": f"Task {i}", "description": "benchmark task" if i % 2 else None,
+            "status": rng.choice(list(TaskStatus)), "due_date": now + timedelta(minutes=rng.randint(-50000, 50000)),
+            "preferred_time": dtime(rng.randint(7, 20), rng.choice([0, 30])) if i % 3 == 0 else None,
+            "is_recurring": i % 10 == 0, "recurrence_pattern": "weekly" if i % 10 == 0 else None,
+            "recurrence_interval": 1, "created_at": now - timedelta(days=rng.randint(0, 365)),
+        }
+        for i in range(n_rows)
+    ])
+    db.execute(insert(Mood), [
+        {
+            "id": uuid.uuid4(), "user_id": user_id, "mood_type": rng.choice(list(MoodType)), "intensity": rng.randint(1, 10),
+            "description": "slept well" if i % 2 else None, "created_at": now - timedelta(minutes=rng.randint(0, 500000)),
+        }
+        for i in range(n_rows)
+    ])
+    db.commit()
+    return user_id
+
+
+def orm_path(db: Session, model, schema, user_id) -> bytes:
+    objects = db.query(model).filter(model.user_id == user_id).all()
+    content = jsonable_encoder([schema.model_validate(obj) for obj in objects])
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def rows_path(db: Session, model, columns, user_id) -> bytes:
+    rows = db.execute(select(*columns).where(model.user_id == user_id)).all()
+    return rows_response(rows).body
+
+
+def timed(fn, repeat: int) -> tuple[list[float], bytes]:
+    times, body = [], b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        times.append(time.perf_counter() - started)
+    return times, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM + Pydantic + json vs column rows + orjson on large list responses")
+    parser.add_argument("--database-url", default="sqlite://", help="defaults to an in-memory SQLite database")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.database_url.startswith("sqlite"):
+        engine = create_engine(args.database_url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        for model in (User, Task, Mood):
+            model.__table__.create(engine)
+    else:
+        # expects a migrated database (alembic upgrade head)
+        engine = create_engine(args.database_url)
+
+    with Session(engine) as db:
+        user_id = seed(db, args.rows)
+        try:
+            for name, model, schema, columns in [("tasks", Task, TaskOut, TASK_OUT_COLUMNS), ("moods", Mood, MoodOut, MOOD_OUT_COLUMNS)]:
+                orm_times, orm_body = timed(lambda: orm_path(db, model, schema, user_id), args.repeat)
+                rows_times, rows_body = timed(lambda: rows_path(db, model, columns, user_id), args.repeat)
+                assert json.loads(orm_body) == json.loads(rows_body), f"{name}: outputs differ"
+                orm_ms = statistics.median(orm_times) * 1000
+                rows_ms = statistics.median(rows_times) * 1000
+                print(f"{name:6} {args.rows} rows   orm {orm_ms:8.1f} ms   rows {rows_ms:8.1f} ms   "
+                      f"speedup {orm_ms / rows_ms:4.1f}x   {len(rows_body) / 1024:.0f} KiB")
+        finally:
+            db.execute(delete(Task).where(Task.user_id == user_id))
+            db.execute(delete(Mood).where(Mood.user_id == user_id))
+            db.execute(delete(User).where(User.id == user_id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# ASGI entry point for benchmark runs: the real app with the external services faked.
+#   uvicorn benchmarks.server:app
+# Fake latencies come from BENCH_* environment variables (set by benchmarks/loadtest.py).
+import os
+
+from benchmarks.fakes import install_fakes
+
+install_fakes(
+    llm_latency=float(os.getenv("BENCH_LLM_LATENCY", "0.5")),
+    llm_output_tokens=int(os.getenv("BENCH_LLM_OUTPUT_TOKENS", "150")),
+    vector_latency=float(os.getenv("BENCH_VECTOR_LATENCY", "0.05")),
+    calendar_latency=float(os.getenv("BENCH_CALENDAR_LATENCY", "0.15")),
+)
+
+from app.main import app
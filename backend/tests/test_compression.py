@@ -0,0 +1,24 @@
+import pytest
+
+from app.core import compression
+from app.core.compression import choose_encoding
+
+brotli_only = pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+
+
+def test_star_does_not_override_an_excluded_coding():
+    assert choose_encoding("gzip;q=0, *") == ("br" if compression.brotli is not None else None)
+
+
+@brotli_only
+def test_star_covers_unlisted_codings_only():
+    assert choose_encoding("br;q=0, *") == "gzip"
+    assert choose_encoding("br;q=0.2, *;q=0.5") == "gzip"
+    assert choose_encoding("*") == "br"
+
+
+def test_listed_codings():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+    assert choose_encoding("gzip;q=0") is None
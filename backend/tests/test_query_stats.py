@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.query_stats import _numbered_placeholders, assert_max_queries, track_queries
+
+
+@pytest.fixture
+def engine():
+    return create_engine("sqlite://")
+
+
+def test_assert_max_queries_counts_nested_tracking(engine):
+    with assert_max_queries(3) as stats:
+        with track_queries(), engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+    assert stats.count == 3
+
+
+def test_assert_max_queries_raises_over_limit(engine):
+    with pytest.raises(AssertionError, match="at most 1 queries, got 2"):
+        with assert_max_queries(1), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+
+def test_numbered_placeholders():
+    statement = "SELECT * FROM t WHERE a = %(a)s AND b LIKE 'x%%' AND c = %(a)s AND d = %(d)s"
+    assert _numbered_placeholders(statement) == "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $1 AND d = $2"
+    assert _numbered_placeholders("INSERT INTO t VALUES (%s, %s)") == "INSERT INTO t VALUES ($1, $2)"
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # the module builds its chat model at import
+
+from app.ai.task_helper import parse_cache_key
+
+
+@pytest.mark.parametrize("user_input", [
+    "call mom in two hours",
+    "stretch in 30m",
+    "in 1h",
+    "take a break in 45 min",
+    "reply to Sam in a couple of hours",
+    "call bob tonight",
+    "walk later today",
+    "nap this afternoon",
+    "pay rent now",
+])
+def test_time_of_day_relative_inputs_are_not_cached(user_input):
+    assert parse_cache_key(user_input, "2026-10-19", "America/New_York") is None
+
+
+@pytest.mark.parametrize("user_input", [
+    "dentist tomorrow at 3pm",
+    "gym every monday",
+    "submit report friday",
+    "read 20 pages",
+])
+def test_other_inputs_are_cached(user_input):
+    assert parse_cache_key(user_input, "2026-10-19", "America/New_York") is not None
+
+
+def test_key_ignores_case_and_spacing():
+    assert parse_cache_key("Buy  milk", "2026-10-19", "UTC") == parse_cache_key("buy milk", "2026-10-19", "UTC")